@@ -0,0 +1,365 @@
+import argparse
+import asyncio
+import csv
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+import mock_youtube_api
+import mock_youtubers
+import synthgen
+
+# Get the absolute path of the script's directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Repository root, holding one directory per category
+REPO_DIR = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+BENCH_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), 'data', 'benchmarks')
+HISTORY_FILE = os.path.join(BENCH_DIR, 'history.json')
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+
+# Categories with every benchmarked stage; jsontocsv.py only exists in animals
+CATEGORIES = ['animals']
+# Number of videos at each scale; the API stages crawl one channel per 100 videos
+SCALES = {'1k': 1000, '100k': 100000, '1M': 1000000}
+VIDEOS_PER_CHANNEL = 100
+# Snapshot date jsontocsv.py and cleancsv.py read by default
+SNAPSHOT = '2024-10-15'
+
+# A stage regresses when its throughput drops, or its peak memory grows, by more than this
+REGRESSION_THRESHOLD = 0.2
+
+# Start-up budgets in seconds, on top of a bare interpreter start. --help and
+# short stages should not wait on imports they don't use (scipy, matplotlib,
+# googleapiclient); scripts without a command line are timed by importing them
+STARTUP_BUDGETS = [
+    # (name, 'category' or 'all' src_py, argv, budget)
+    ('channel --help', 'category', ['channel.py', '--help'], 0.25),
+    ('playlist --help', 'category', ['playlist.py', '--help'], 0.25),
+    ('stats --help', 'category', ['stats.py', '--help'], 0.4),
+    ('main --help', 'category', ['main.py', '--help'], 0.15),
+    ('ranking --help', 'category', ['ranking.py', '--help'], 0.6),
+    ('import combine', 'category', ['-c', 'import combine'], 0.15),
+    ('import youtube_client', 'category', ['-c', 'import youtube_client'], 0.15),
+    ('import transcripts', 'category', ['-c', 'import transcripts'], 0.15),
+    # pandas alone accounts for most of these
+    ('cleancsv --help', 'all', ['cleancsv.py', '--help'], 0.8),
+    ('joincsv --help', 'all', ['joincsv.py', '--help'], 0.8)
+]
+STARTUP_REPEATS = 3
+
+def copy_tree(root, category):
+    """Lay out the category's and all/ scripts under root, the way the repo does"""
+    ignore = shutil.ignore_patterns('__pycache__', '*.log', 'txt', 'log', 'Collaboration Spreadsheet')
+    for name in (category, 'all'):
+        shutil.copytree(os.path.join(REPO_DIR, name, 'src_py'), os.path.join(root, name, 'src_py'), ignore=ignore)
+    for sub in ('data_csv', 'data_json'):
+        os.makedirs(os.path.join(root, category, sub), exist_ok=True)
+    os.makedirs(os.path.join(root, 'all', 'data', 'data_csv'), exist_ok=True)
+
+def count_csv_rows(path):
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        return max(0, sum(1 for _ in csv.reader(f)) - 1)
+
+def count_lines(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return sum(1 for line in f if line.strip())
+
+def count_batch_videos(batch_dir):
+    total = 0
+    for name in os.listdir(batch_dir):
+        if name.startswith('videos_batch_'):
+            with open(os.path.join(batch_dir, name), 'r') as f:
+                total += sum(len(videos) for videos in json.load(f).values())
+    return total
+
+def run_script(argv, cwd, env, log_path):
+    """
+    Run a pipeline script in a child process.
+
+    Returns:
+        (seconds, peak RSS of the child in MB, exit code)
+    """
+    start = time.perf_counter()
+    with open(log_path, 'w') as log:
+        process = subprocess.Popen([sys.executable, *argv], cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 reports the resource usage of this child alone
+        _, status, rusage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    peak_mb = rusage.ru_maxrss / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+    return elapsed, peak_mb, process.returncode
+
+def time_startup(argv, cwd, repeats=STARTUP_REPEATS):
+    """Best wall time of a short command over a few runs, or None if it fails"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, *argv], cwd=cwd, capture_output=True)
+        elapsed = time.perf_counter() - start
+        if completed.returncode != 0:
+            return None
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def startup_dirs(category):
+    """Where the STARTUP_BUDGETS commands run: the real tree, since --help and imports write nothing"""
+    return {'category': os.path.join(REPO_DIR, category, 'src_py'), 'all': SCRIPT_DIR}
+
+def bench_startup(category):
+    """Time --help and imports of the stage scripts against STARTUP_BUDGETS"""
+    dirs = startup_dirs(category)
+    interpreter = time_startup(['-c', 'pass'], SCRIPT_DIR)
+    print(f"[startup] Bare interpreter start {interpreter * 1000:.0f} ms")
+    results = {}
+    for name, where, argv, budget in STARTUP_BUDGETS:
+        seconds = time_startup(argv, dirs[where])
+        if seconds is None:
+            results[name] = {'seconds': None, 'budget': budget, 'status': 'failed'}
+            print(f"  {name}... failed")
+            continue
+        overhead = max(0.0, seconds - interpreter)
+        status = 'ok' if overhead <= budget else 'over_budget'
+        results[name] = {'seconds': round(seconds, 3), 'overhead': round(overhead, 3), 'budget': budget,
+                         'status': status}
+        print(f"  {name}... {status} in {seconds * 1000:.0f} ms "
+              f"({overhead * 1000:.0f} ms of {budget * 1000:.0f} ms budget)")
+    return results
+
+class FixtureThread:
+    """Runs the youtubers.me fixture site on its own event loop in a background thread"""
+
+    def __init__(self, site):
+        self.loop = asyncio.new_event_loop()
+        self.runner, self.base_url = self.loop.run_until_complete(mock_youtubers.start_site(site))
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+def api_stages(root, category):
+    """Stages that fetch from the network, as (name, script dir, argv, unit, item counter)"""
+    src = os.path.join(root, category, 'src_py')
+    data_csv = os.path.join(root, category, 'data_csv')
+    batch_dir = os.path.join(root, category, 'data_json', f"batch_{datetime.now().strftime('%Y-%m-%d')}")
+    channels = lambda: count_lines(os.path.join(data_csv, 'channel_id.csv'))
+    return [
+        ('ranking', src, ['ranking.py'], 'channels', channels),
+        ('channel', src, ['channel.py'], 'channels', channels),
+        ('findplaylist', src, ['findplaylist.py'], 'channels',
+         lambda: count_lines(os.path.join(data_csv, 'playlist_id.csv'))),
+        ('playlist', src, ['playlist.py'], 'videos', lambda: count_batch_videos(batch_dir))
+    ]
+
+def data_stages(root, category, videos, channels):
+    """Stages that transform files, as (name, script dir, argv, unit, item counter)"""
+    src = os.path.join(root, category, 'src_py')
+    all_src = os.path.join(root, 'all', 'src_py')
+    timestamp = datetime.now().strftime('%Y-%m-%d')
+    json_dir = os.path.join(root, category, 'data_json')
+    videos_detail = os.path.join(root, category, 'data_csv', 'videos_detail.csv')
+    cleancsv_input = os.path.join(root, 'all', 'data', 'data_csv',
+                                  f"videos_detail_{category}_{SNAPSHOT.replace('-', '')}.csv")
+
+    def combined():
+        # jsontocsv.py reads a fixed snapshot name
+        os.replace(os.path.join(json_dir, f'videos_{timestamp}.json'),
+                   os.path.join(json_dir, f'videos_{SNAPSHOT}.json'))
+        return videos
+
+    def converted():
+        shutil.copyfile(videos_detail, cleancsv_input)
+        return count_csv_rows(videos_detail)
+
+    return [
+        ('combine', src, ['combine.py'], 'videos', combined),
+        ('jsontocsv', src, ['jsontocsv.py'], 'videos', converted),
+        ('cleancsv', all_src, ['cleancsv.py', '--category', category], 'videos',
+         lambda: count_csv_rows(os.path.join(os.path.dirname(cleancsv_input),
+                                             f'normalized_{os.path.basename(cleancsv_input)}'))),
+        ('joincsv', all_src, ['joincsv.py'], 'videos',
+         lambda: count_csv_rows(os.path.join(root, 'all', 'data', 'data_csv', 'combined_videos_detail.csv'))),
+        ('stats', src, ['stats.py', '--categories', category, '--workers', '1'], 'channels',
+         lambda: channels)
+    ]
+
+def run_stages(stages, env, log_dir):
+    """Run stages in order; a failed stage stops the rest, which depend on its output"""
+    results = {}
+    for name, cwd, argv, unit, count_items in stages:
+        print(f"  {name}...", end=' ', flush=True)
+        seconds, peak_mb, code = run_script(argv, cwd, env, os.path.join(log_dir, f'{name}.log'))
+        items = None
+        if code == 0:
+            try:
+                items = count_items()
+            except (OSError, ValueError) as e:
+                print(f"no output ({e})", end=' ')
+        result = {'seconds': round(seconds, 3), 'peak_rss_mb': round(peak_mb, 1), 'unit': unit,
+                  'items': items, 'status': 'ok' if items is not None else 'failed'}
+        if items:
+            result['items_per_sec'] = round(items / seconds, 1)
+        results[name] = result
+        print(f"{result['status']} in {seconds:.2f}s, {items} {unit}, peak {peak_mb:.0f} MB")
+        if items is None:
+            print(f"  Stopping: see {os.path.join(log_dir, f'{name}.log')}")
+            break
+    return results
+
+def bench_scale(scale, category, seed=0, only=None, keep=False):
+    """Benchmark every stage at one scale in fresh temporary trees"""
+    videos = SCALES[scale]
+    channels = max(10, videos // VIDEOS_PER_CHANNEL)
+    results = {}
+    tmp = tempfile.mkdtemp(prefix=f'bench_{scale}_')
+    log_dir = os.path.join(tmp, 'logs')
+    os.makedirs(log_dir)
+    # The stages call stand-in servers, so nothing they do belongs in the quota ledger
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1', MPLBACKEND='Agg', ACCOUNTING_DISABLED='1')
+
+    try:
+        if only in (None, 'api'):
+            # ranking.py writes to ~/YouTube/<category>, so the tree lives under a fake HOME
+            home = os.path.join(tmp, 'home')
+            root = os.path.join(home, 'YouTube')
+            copy_tree(root, category)
+            api = mock_youtube_api.start_server(seed=seed)
+            site = FixtureThread(mock_youtubers.FixtureSite(channels=channels, seed=seed))
+            api_env = dict(env, HOME=home, YOUTUBE_API_BASE_URL=api.base_url, API_KEY='benchmark',
+                           YOUTUBERS_BASE_URL=site.base_url, RANKING_REQUEST_DELAY='0')
+            print(f"[{scale}] API stages, {channels} channels")
+            try:
+                results.update(run_stages(api_stages(root, category), api_env, log_dir))
+            finally:
+                site.close()
+                api.shutdown()
+                api.server_close()
+
+        if only in (None, 'data'):
+            root = os.path.join(tmp, 'data')
+            copy_tree(root, category)
+            print(f"[{scale}] Generating {videos} videos and {channels} channels")
+            synthgen.generate_category(root, category, videos, channels, seed, snapshot=SNAPSHOT,
+                                       layouts=('json',))
+            print(f"[{scale}] Data stages")
+            results.update(run_stages(data_stages(root, category, videos, channels), env, log_dir))
+    finally:
+        if keep:
+            print(f"[{scale}] Kept benchmark tree at {tmp}")
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_json(path, default):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+def save_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+def find_regressions(run, baseline, threshold=REGRESSION_THRESHOLD):
+    """List the stages that got slower or hungrier than the baseline run"""
+    regressions = []
+    for scale, stages in run['scales'].items():
+        for stage, result in stages.items():
+            base = baseline.get('scales', {}).get(scale, {}).get(stage)
+            if not base or base.get('status') != 'ok' or result.get('status') != 'ok':
+                continue
+            if base.get('items_per_sec') and result.get('items_per_sec', 0) < base['items_per_sec'] * (1 - threshold):
+                regressions.append(f"{scale}/{stage}: {result.get('items_per_sec', 0)} {result['unit']}/s "
+                                   f"vs baseline {base['items_per_sec']}")
+            if result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + threshold):
+                regressions.append(f"{scale}/{stage}: peak {result['peak_rss_mb']} MB "
+                                   f"vs baseline {base['peak_rss_mb']} MB")
+    return regressions
+
+def startup_violations(run):
+    """List the start-up checks that failed or went over their budget"""
+    return [f"startup/{name}: " + (f"{result['overhead'] * 1000:.0f} ms over a {result['budget'] * 1000:.0f} ms budget"
+                                   if result['status'] == 'over_budget' else 'failed')
+            for name, result in run.get('startup', {}).items() if result['status'] != 'ok']
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the pipeline stages offline at several scales')
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=['1k', '100k'],
+                        help='Scales to run (1M needs several GB of memory for jsontocsv)')
+    parser.add_argument('--category', choices=CATEGORIES, default='animals', help='Category scripts to benchmark')
+    parser.add_argument('--only', choices=['api', 'data', 'startup'], default=None,
+                        help='Only run the API stages, the data stages or the start-up checks')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic data and stand-in servers')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='Relative change against the baseline that counts as a regression')
+    parser.add_argument('--save-baseline', action='store_true', help='Make this run the new baseline')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit with status 1 on regressions')
+    parser.add_argument('--keep', action='store_true', help='Keep the temporary trees for inspection')
+    args = parser.parse_args()
+
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'machine': f'{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs',
+        'category': args.category,
+        'scales': {}
+    }
+    if args.only in (None, 'startup'):
+        run['startup'] = bench_startup(args.category)
+    if args.only != 'startup':
+        for scale in args.scales:
+            run['scales'][scale] = bench_scale(scale, args.category, args.seed, args.only, args.keep)
+
+    history = load_json(HISTORY_FILE, [])
+    history.append(run)
+    save_json(HISTORY_FILE, history)
+    print(f"\nResults appended to {HISTORY_FILE}")
+
+    over_budget = startup_violations(run)
+    if over_budget:
+        print("\nStart-up budget exceeded:")
+        for violation in over_budget:
+            print(f"  {violation}")
+
+    baseline = load_json(BASELINE_FILE, None)
+    regressions = find_regressions(run, baseline, args.threshold) if baseline else []
+    if baseline is None:
+        print("No baseline yet; run with --save-baseline to set one")
+    elif regressions:
+        print(f"\nRegressions against the baseline from {baseline['timestamp']} ({baseline.get('commit')}):")
+        for regression in regressions:
+            print(f"  {regression}")
+    else:
+        print(f"No regressions against the baseline from {baseline['timestamp']} ({baseline.get('commit')})")
+
+    if args.save_baseline:
+        save_json(BASELINE_FILE, run)
+        print(f"Baseline saved to {BASELINE_FILE}")
+
+    if (regressions or over_budget) and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
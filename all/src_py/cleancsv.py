@@ -1,173 +1,625 @@
 import pandas as pd
-import os
+import numpy as np
+import argparse
 import csv
+import hashlib
+import io
+import os
+from collections import Counter, deque
 import logging
 import time
 from datetime import datetime
+import metrics
+import profiling
 
-# Start timing the process
-start_time = time.time()
-
-# Set up logging
-log_filename = f"normalize_csv_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_filename),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
-# Increase CSV field size limit to handle large cells
-csv.field_size_limit(500000000)
-
-# Define file paths - these are already set for your specific file
+# Define file paths
 data_path = '../data/'
-input_file = f"{data_path}data_csv/videos_detail_animals_20241015.csv"
-output_file = f"{data_path}data_csv/normalized_videos_detail_animals_20241015.csv"
-
-logger.info("=" * 80)
-logger.info("YOUTUBE CSV NORMALIZER")
-logger.info("=" * 80)
-logger.info(f"Processing file: {input_file}")
-
-# Ensure output directory exists
-os.makedirs(os.path.dirname(output_file), exist_ok=True)
-
-try:
-    # Read the CSV with forgiving settings
-    # Note: Removed low_memory parameter as it's not supported with python engine
-    logger.info("Reading CSV file...")
-    df = pd.read_csv(
-        input_file, 
-        engine='python',
-        on_bad_lines='skip',
-        dtype={
-            'video_id': 'string',
-            'title': 'string',
-            'description': 'string',
-            'title_description': 'string',
-            'label1': 'string',
-            'label2': 'string',
-            'channel_id': 'string',
-            'privacy_status': 'string',
-            'topic_categories': 'string'
-        }
+
+CATEGORIES = ['animals', 'blogs', 'comedy', 'entertainment', 'gaming']
+
+# Columns read as strings; everything else is left to the parser
+READ_DTYPES = {
+    'video_id': 'string',
+    'title': 'string',
+    'description': 'string',
+    'title_description': 'string',
+    'label1': 'string',
+    'label2': 'string',
+    'channel_id': 'string',
+    'privacy_status': 'string',
+    'topic_categories': 'string'
+}
+
+STRING_COLUMNS = ['video_id', 'title', 'description', 'title_description',
+                  'channel_id', 'privacy_status', 'topic_categories']
+NUMERIC_COLUMNS = ['view_count', 'like_count', 'comment_count']
+
+# A record still inside an open quote after this many bytes is treated as a
+# stray quote rather than a long description
+MAX_RECORD_BYTES = 1 << 20
+# Bytes checked at a time before they are handed to the parser. Blocks
+# shrink towards MIN_BLOCK_BYTES while broken quotes keep throwing the check
+# out of step, and grow back while the data is clean
+BLOCK_BYTES = 1 << 20
+MIN_BLOCK_BYTES = 1 << 14
+
+QUARANTINE_HEADER = ['byte_offset', 'line_number', 'reason', 'expected_fields', 'actual_fields', 'record']
+
+QUOTE, COMMA, NEWLINE, CARRIAGE_RETURN = b'"', b',', b'\n', b'\r'
+# Lookup tables of the bytes that may precede a quote opening a field and
+# follow one closing it. A quote anywhere else is read literally by the parser
+FIELD_START = np.zeros(256, dtype=bool)
+FIELD_START[list(COMMA + NEWLINE + QUOTE)] = True
+FIELD_END = np.zeros(256, dtype=bool)
+FIELD_END[list(COMMA + NEWLINE + CARRIAGE_RETURN + QUOTE)] = True
+
+class QuarantiningReader(io.RawIOBase):
+    """
+    Binary stream over a CSV file that only passes through well-formed records.
+
+    The file is read in blocks that end on a record boundary. Each block is
+    checked in one vectorised pass: double-quote parity gives the record
+    boundaries, and the commas outside quotes give each record's width. Runs
+    of records with the header's width are streamed unchanged to pandas,
+    which can then stay on the C engine.
+
+    From a record that fails the check, physical lines are read one at a
+    time and joined into logical records by quote parity, until the file is
+    back on a record boundary of the checked block. Records with the wrong
+    number of fields, or a quote that is never closed, are written to a
+    quarantine CSV together with their byte offset and line number instead
+    of being handed to the parser. A broken quote leaves the rest of its
+    record behind as fragments, so rejected lines that directly follow a
+    record still short of the expected width are added to its entry: each
+    entry is one record.
+    """
+
+    def __init__(self, path, quarantine_file, max_record_bytes=MAX_RECORD_BYTES, block_bytes=BLOCK_BYTES):
+        self.source = open(path, 'rb')
+        self.quarantine = open(quarantine_file, 'w', encoding='utf-8', newline='')
+        self.writer = csv.writer(self.quarantine)
+        self.writer.writerow(QUARANTINE_HEADER)
+        self.max_record_bytes = max_record_bytes
+        self.block_bytes = block_bytes
+        self.reasons = Counter()
+        # Last quarantine entry, kept open while its record is short of fields
+        self._entry = None
+        self._entry_end = None
+        self._entry_fields = None
+        # Byte offset and line number of the first byte not handed on yet
+        self._offset = 0
+        self._line_number = 1
+        self._replay = deque()
+        # Last checked block: where it sits in the file, where its records
+        # start, which of them need reading line by line, and how far it
+        # has been handed on
+        self._block = None
+        self._block_offset = 0
+        self._block_position = 0
+        self._record_starts = None
+        self._bad_starts = None
+        self._line_by_line = False
+        self._block_size = block_bytes
+        # Bytes ready to be read, and how many of them already were
+        self._piece = self._read_header()
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while self._position == len(self._piece):
+            piece = self._next_piece()
+            if piece is None:
+                return 0
+            self._piece, self._position = piece, 0
+        n = min(len(b), len(self._piece) - self._position)
+        b[:n] = memoryview(self._piece)[self._position:self._position + n]
+        self._position += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._flush_entry()
+            self.source.close()
+            self.quarantine.close()
+        super().close()
+
+    @property
+    def quarantined(self):
+        return sum(self.reasons.values())
+
+    def _read_header(self):
+        """Read the header, which defines the expected width"""
+        self.expected_fields = None
+        while True:
+            first = self._next_line()
+            if first is None:
+                return b''
+            line = first[2]
+            if line.strip():
+                break
+        self.expected_fields = self._count_fields(line) or line.count(b',') + 1
+        return line if line.endswith(b'\n') else line + b'\n'
+
+    def _next_piece(self):
+        """Return the next well-formed records as bytes, or None at end of file"""
+        if self.expected_fields is None:
+            return None
+        if self._line_by_line:
+            record = self._next_record()
+            if record is not None and not self._replay:
+                self._resume_block()
+            return record
+        if self._block is None and not self._read_block():
+            return None
+        return self._next_run()
+
+    def _read_block(self):
+        """Read and check the next block of whole records, returning False at end of file"""
+        parts = [self.source.read(self._block_size)]
+        if not parts[0]:
+            return False
+        if not parts[0].endswith(b'\n'):
+            parts.append(self.source.readline())
+        # Carry on to the end of a quoted field the block stopped inside
+        quotes = sum(part.count(QUOTE) for part in parts)
+        size = 0
+        while quotes % 2 and size <= self.max_record_bytes:
+            line = self.source.readline()
+            if not line:
+                break
+            parts.append(line)
+            size += len(line)
+            quotes += line.count(QUOTE)
+
+        self._block = b''.join(parts)
+        self._block_offset = self._offset
+        self._block_position = 0
+        self._record_starts, self._bad_starts = self._check_block(self._block)
+        return True
+
+    def _check_block(self, block):
+        """
+        Find the records of a block and the ones that do not have the expected width.
+
+        Returns:
+            Tuple of the record start positions and the start positions of
+            the records that need reading line by line
+        """
+        data = np.frombuffer(block, dtype=np.uint8)
+        quotes = np.flatnonzero(data == ord(QUOTE))
+
+        def outside_quotes(byte):
+            # Positions of a byte with an even number of quotes before it
+            positions = np.flatnonzero(data == ord(byte))
+            return positions[np.searchsorted(quotes, positions) % 2 == 0]
+
+        ends = outside_quotes(NEWLINE)
+        starts = np.concatenate(([0], ends + 1))
+        commas = outside_quotes(COMMA)
+        fields = np.searchsorted(commas, ends) - np.searchsorted(commas, starts[:-1]) + 1
+        # Empty lines are skipped by the parser
+        bad = (fields != self.expected_fields) & (ends > starts[:-1])
+
+        # A quote in the middle of a field is read literally, which changes
+        # the width: leave those records to the line by line check
+        opening, closing = quotes[0::2], quotes[1::2]
+        opening = opening[opening > 0]
+        closing = closing[closing + 1 < len(data)]
+        misplaced = np.concatenate((opening[~FIELD_START[data[opening - 1]]],
+                                    closing[~FIELD_END[data[closing + 1]]]))
+        records = np.searchsorted(ends, misplaced)
+        bad[records[records < len(ends)]] = True
+
+        bad_starts = starts[:-1][bad]
+        if starts[-1] < len(data):
+            # The block ends inside a quote that never closed, or the file
+            # does not end with a newline
+            bad_starts = np.append(bad_starts, starts[-1])
+        return starts, bad_starts
+
+    def _next_run(self):
+        """Hand on the checked records up to the next one that needs reading line by line"""
+        start = self._block_position
+        index = np.searchsorted(self._bad_starts, start)
+        end = int(self._bad_starts[index]) if index < len(self._bad_starts) else len(self._block)
+        if end == start:
+            self._line_by_line = True
+            self.source.seek(self._offset)
+            return self._next_piece()
+
+        run = self._block[start:end]
+        self._block_position = end
+        self._offset += len(run)
+        self._line_number += run.count(NEWLINE)
+        if end == len(self._block):
+            self._block = None
+            self._block_size = min(self._block_size * 2, self.block_bytes)
+        return run
+
+    def _resume_block(self):
+        """Go back to the checked block once reading line by line has reached one of its records"""
+        self._line_by_line = False
+        if self._block is None:
+            return
+        position = self._offset - self._block_offset
+        index = np.searchsorted(self._record_starts, position)
+        if position < len(self._block) and index < len(self._record_starts) and self._record_starts[index] == position:
+            self._block_position = position
+            self.source.seek(self._block_offset + len(self._block))
+        else:
+            # Past the block, or out of step with its quotes: check afresh
+            # from here
+            if position < len(self._block):
+                self._block_size = max(self._block_size // 2, MIN_BLOCK_BYTES)
+            self._block = None
+
+    def _next_line(self):
+        if self._replay:
+            return self._replay.popleft()
+        line = self.source.readline()
+        if not line:
+            return None
+        part = (self._offset, self._line_number, line)
+        self._offset += len(line)
+        self._line_number += 1
+        return part
+
+    def _next_record(self):
+        """Return the next well-formed record as bytes, or None at end of file"""
+        while True:
+            first = self._next_line()
+            if first is None:
+                return None
+            line = first[2]
+            if not line.strip():
+                if self._continues_entry(first[1]):
+                    # A blank line inside a broken record stays with it
+                    self._entry[-1] += line
+                    self._entry_end = first[1]
+                continue
+
+            pending = [first]
+            size = len(line)
+            quotes = line.count(QUOTE)
+            while quotes % 2 and size <= self.max_record_bytes:
+                following = self._next_line()
+                if following is None:
+                    break
+                pending.append(following)
+                size += len(following[2])
+                quotes += following[2].count(QUOTE)
+
+            if quotes % 2:
+                # The quote never closed: drop the first line and re-read the
+                # lines it swallowed as records of their own
+                self._quarantine(pending[:1], 'unterminated_quote', None)
+                self._replay.extendleft(reversed(pending[1:]))
+                continue
+
+            record = b''.join(part[2] for part in pending)
+            fields = self._count_fields(record)
+            if fields is None and len(pending) > 1:
+                # The lines do not parse as one row, so the quote that joined
+                # them ran on into the next record: it is unterminated within
+                # its own record. Drop the first line and re-read the rest
+                self._quarantine(pending[:1], 'stray_quote', None)
+                self._replay.extendleft(reversed(pending[1:]))
+                continue
+            elif fields != self.expected_fields:
+                # One row, just the wrong width: quarantine all of its lines
+                # as one record
+                reason = 'stray_quote' if fields is None else 'field_count'
+                self._quarantine(pending, reason, fields)
+                continue
+
+            return record if record.endswith(NEWLINE) else record + NEWLINE
+
+    def _count_fields(self, record):
+        if b'"' not in record:
+            return record.count(b',') + 1
+        try:
+            text = record.decode('utf-8')
+        except UnicodeDecodeError:
+            return None
+        rows = list(csv.reader(io.StringIO(text, newline='')))
+        # Anything that does not parse as exactly one row is malformed
+        return len(rows[0]) if len(rows) == 1 else None
+
+    def _continues_entry(self, line_number, width=1):
+        """Whether a rejected line of the given width is the rest of the open entry's record"""
+        if self._entry is None or line_number != self._entry_end + 1:
+            return False
+        # Only a record short of fields has anything left over, and only as
+        # many fields as it is missing
+        return self._entry_fields < self.expected_fields and self._entry_fields + width - 1 <= self.expected_fields
+
+    def _quarantine(self, parts, reason, fields):
+        """Quarantine the given (offset, line number, line) parts as one record"""
+        offset, line_number, _ = parts[0]
+        record = b''.join(part[2] for part in parts)
+        width = fields if fields is not None else self._loose_fields(record)
+        if self._continues_entry(line_number, width):
+            # What is left of the same record. The line break it follows
+            # split a field in two, so one field is shared
+            self._entry[-1] += record
+            self._entry_fields += width - 1
+        else:
+            self._flush_entry()
+            self.reasons[reason] += 1
+            self._entry = [offset, line_number, reason, self.expected_fields, fields, record]
+            self._entry_fields = width
+        self._entry_end = parts[-1][1]
+
+    @staticmethod
+    def _loose_fields(record):
+        """Number of fields in a line that does not parse, counted as leniently as csv does"""
+        try:
+            return len(next(csv.reader([record.decode('utf-8', errors='replace')]), []))
+        except csv.Error:
+            return record.count(b',') + 1
+
+    def _flush_entry(self):
+        if self._entry is not None:
+            *columns, record = self._entry
+            self.writer.writerow(columns + [record.decode('utf-8', errors='replace')])
+            self._entry = None
+
+def setup_logging():
+    log_filename = f"normalize_csv_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_filename),
+            logging.StreamHandler()
+        ]
     )
-    
-    original_row_count = len(df)
-    original_column_count = len(df.columns)
-    logger.info(f"Successfully read file with {original_row_count} rows and {original_column_count} columns")
-    
-    # Display column information
-    logger.info("\nOriginal columns and data types:")
-    for col, dtype in df.dtypes.items():
-        non_null = df[col].count()
-        logger.info(f"  {col}: {dtype} - {non_null} non-null values ({non_null/len(df):.1%})")
-    
+
+def normalize_chunk(df, category):
+    """
+    Normalize one chunk of the video detail table.
+
+    Args:
+        df: Chunk as read from the raw CSV
+        category: Category name stored in the 'category' column
+
+    Returns:
+        The normalized chunk
+    """
     # Standardize column names
     df.columns = [col.lower().strip() for col in df.columns]
-    logger.info("\nStandardized column names to lowercase")
-    
+
     # Process string columns
-    string_columns = ['video_id', 'title', 'description', 'title_description', 
-                      'channel_id', 'privacy_status', 'topic_categories']
-    
-    for col in string_columns:
+    for col in STRING_COLUMNS:
         if col in df.columns:
-            logger.info(f"Processing string column: {col}")
-            df[col] = df[col].fillna("").astype(str)
-            if df[col].str.contains('nan').any():
-                df[col] = df[col].replace('nan', '')
-                logger.info(f"  Replaced 'nan' strings in {col}")
-    
+            df[col] = df[col].fillna("").replace('nan', '')
+
     # Process numeric columns
-    numeric_columns = ['view_count', 'like_count', 'comment_count']
-    
-    for col in numeric_columns:
+    for col in NUMERIC_COLUMNS:
         if col in df.columns:
-            logger.info(f"Processing numeric column: {col}")
             df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-    
+
     # Process date columns
     if 'upload_date' in df.columns:
-        logger.info("Processing upload_date column")
-        before_valid = df['upload_date'].notna().sum()
-        
-        # Convert to datetime
         df['upload_date'] = pd.to_datetime(df['upload_date'], errors='coerce')
-        after_valid = df['upload_date'].notna().sum()
-        
-        logger.info(f"  Valid dates: {before_valid} before conversion, {after_valid} after conversion")
-        
-        # Add month column
-        df['upload_month'] = df['upload_date'].dt.month
-        df['upload_year'] = df['upload_date'].dt.year
-        
-        month_counts = df['upload_month'].value_counts().sort_index()
-        logger.info(f"  Monthly distribution: {month_counts.to_dict()}")
-    else:
-        logger.warning("No upload_date column found")
-    
+        # Nullable ints keep the month/year format identical across chunks
+        df['upload_month'] = df['upload_date'].dt.month.astype('Int64')
+        df['upload_year'] = df['upload_date'].dt.year.astype('Int64')
+
     # Process collaborator data
-    logger.info("Processing collaborator data")
     if 'label2' in df.columns:
-        df['label2'] = df['label2'].fillna("").astype(str)
-        # Replace 'nan' text with empty string
-        df['label2'] = df['label2'].replace('nan', '')
-        
-        # Create label2_list column
-        df['label2_list'] = df['label2'].apply(lambda x: x.split(',') if x and x != 'nan' else [])
-        
-        # Fix empty lists where split creates ['']
-        df.loc[df['label2'] == '', 'label2_list'] = df.loc[df['label2'] == '', 'label2_list'].apply(lambda x: [])
-        
-        # Calculate collaborator count
-        df['collaborator_count'] = df['label2_list'].apply(len)
-        
-        # Count videos with collaborators
-        collab_count = (df['collaborator_count'] > 0).sum()
-        logger.info(f"  Videos with collaborators: {collab_count} ({collab_count/len(df):.1%})")
+        label2 = df['label2'].fillna("").replace('nan', '')
+        has_collaborators = label2 != ''
+        df['label2'] = label2
+        df['label2_list'] = label2.str.split(',')
+        # Splitting an empty string gives [''], so store an empty list instead
+        df.loc[~has_collaborators, 'label2_list'] = pd.Series(
+            [[] for _ in range((~has_collaborators).sum())],
+            index=df.index[~has_collaborators], dtype=object
+        )
+        df['collaborator_count'] = np.where(has_collaborators, label2.str.count(',') + 1, 0)
     else:
-        logger.warning("No label2 column found")
         df['label2'] = ""
         df['label2_list'] = [[] for _ in range(len(df))]
         df['collaborator_count'] = 0
-    
+
     # Add category
-    df['category'] = 'animals'
-    
-    # Save the normalized file
-    logger.info(f"Saving normalized file to: {output_file}")
-    df.to_csv(output_file, index=False)
-    
-    # Verify the saved file
+    df['category'] = category
+    return df
+
+def file_checksum(path):
+    """SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def normalize_csv(input_file, output_file, category, chunksize=100000, quarantine_file=None):
+    """
+    Normalize a video detail CSV in chunks with bounded memory.
+
+    Malformed records are moved to a quarantine CSV instead of being skipped
+    silently.
+
+    Args:
+        input_file: Raw videos_detail CSV
+        output_file: Path of the normalized CSV
+        category: Category name stored in the 'category' column
+        chunksize: Number of rows processed at a time
+        quarantine_file: Where malformed records go (defaults to
+            quarantine_<input name> next to the output)
+
+    Returns:
+        Dictionary with row counts, column lists, quarantine counts and the
+        output checksum
+    """
+    # Ensure output directory exists
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    if quarantine_file is None:
+        quarantine_file = os.path.join(os.path.dirname(output_file),
+                                       f"quarantine_{os.path.basename(input_file)}")
+
+    # Only well-formed records reach the parser, so it can use the C engine.
+    # Quoted multiline descriptions are handled by the C parser as long as
+    # the file is read with standard double-quote quoting
+    source = QuarantiningReader(input_file, quarantine_file)
+    reader = pd.read_csv(
+        io.BufferedReader(source),
+        engine='c',
+        quotechar='"',
+        doublequote=True,
+        # The reader has already removed every record of the wrong width, so
+        # a bad line here is a bug to surface, not a row to drop
+        on_bad_lines='error',
+        dtype=READ_DTYPES,
+        chunksize=chunksize
+    )
+
+    rows_read = 0
+    rows_written = 0
+    collab_count = 0
+    valid_dates = 0
+    non_null = None
+    original_columns = []
+    final_columns = []
+    month_counts = pd.Series(dtype='int64')
+    digest = hashlib.sha256()
+
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        for chunk_number, chunk in enumerate(reader):
+            rows_read += len(chunk)
+            if chunk_number == 0:
+                original_columns = list(chunk.columns)
+                dtypes = chunk.dtypes
+                non_null = chunk.count()
+            else:
+                non_null = non_null.add(chunk.count(), fill_value=0)
+
+            chunk = normalize_chunk(chunk, category)
+            if 'upload_month' in chunk.columns:
+                valid_dates += int(chunk['upload_date'].notna().sum())
+                month_counts = month_counts.add(chunk['upload_month'].value_counts(), fill_value=0)
+            collab_count += int((chunk['collaborator_count'] > 0).sum())
+
+            # Hash exactly what is written so the output can be verified cheaply
+            data = chunk.to_csv(index=False, header=(chunk_number == 0), date_format='%Y-%m-%d')
+            encoded = data.encode('utf-8')
+            digest.update(encoded)
+            f.write(data)
+
+            rows_written += len(chunk)
+            final_columns = list(chunk.columns)
+            metrics.inc('rows_written', len(chunk))
+            metrics.inc('bytes_written', len(encoded))
+            logger.info(f"Processed chunk {chunk_number + 1}: {rows_read} rows so far")
+    reader.close()
+    source.close()
+    metrics.inc('rows_quarantined', source.quarantined)
+
+    if source.quarantined:
+        logger.warning(f"Quarantined {source.quarantined} malformed records to {quarantine_file}: "
+                       f"{dict(source.reasons)}")
+    else:
+        logger.info("No malformed records found")
+    logger.info(f"Successfully read file with {rows_read} rows and {len(original_columns)} columns")
+    if non_null is not None and rows_read:
+        logger.info("\nOriginal columns and data types:")
+        for col in original_columns:
+            logger.info(f"  {col}: {dtypes[col]} - {int(non_null[col])} non-null values ({non_null[col]/rows_read:.1%})")
+    if month_counts.empty:
+        logger.warning("No upload_date column found")
+    else:
+        logger.info(f"Valid upload dates: {valid_dates}")
+        monthly = {int(month): int(count) for month, count in month_counts.sort_index().items()}
+        logger.info(f"Monthly distribution: {monthly}")
+    if rows_read:
+        logger.info(f"Videos with collaborators: {collab_count} ({collab_count/rows_read:.1%})")
+
+    return {
+        'rows_read': rows_read,
+        'rows_written': rows_written,
+        'original_columns': original_columns,
+        'final_columns': final_columns,
+        'quarantined': source.quarantined,
+        'quarantine_reasons': dict(source.reasons),
+        'quarantine_file': quarantine_file,
+        'checksum': digest.hexdigest()
+    }
+
+def verify_output(output_file, summary):
+    """Check the written file against the row count and checksum recorded while writing"""
+    if summary['rows_written'] != summary['rows_read']:
+        logger.error(f"Verification failed - read {summary['rows_read']} rows but wrote {summary['rows_written']}")
+        return False
+    if file_checksum(output_file) != summary['checksum']:
+        logger.error("Verification failed - checksum of the saved file does not match what was written")
+        return False
+    logger.info(f"Verification successful - saved file has {summary['rows_written']} rows and "
+                f"{len(summary['final_columns'])} columns (sha256 {summary['checksum'][:12]})")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Normalize a category videos_detail CSV')
+    parser.add_argument('--category', choices=CATEGORIES, default='animals', help='Category to normalize')
+    parser.add_argument('--date', default='20241015', help='Snapshot date in the file name (YYYYMMDD)')
+    parser.add_argument('--chunksize', type=int, default=100000, help='Rows processed at a time')
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+
+    input_name = f"videos_detail_{args.category}_{args.date}.csv"
+    input_file = f"{data_path}data_csv/{input_name}"
+    output_file = f"{data_path}data_csv/normalized_{input_name}"
+
+    setup_logging()
+
+    # Start timing the process
+    start_time = time.time()
+
+    logger.info("=" * 80)
+    logger.info("YOUTUBE CSV NORMALIZER")
+    logger.info("=" * 80)
+    logger.info(f"Processing file: {input_file}")
+
+    metrics.init_metrics('cleancsv', args.category)
     try:
-        test_df = pd.read_csv(output_file)
-        logger.info(f"Verification successful - saved file has {len(test_df)} rows and {len(test_df.columns)} columns")
+        with profiling.profile_stage('cleancsv', os.path.dirname(output_file), args.profile):
+            with metrics.span('normalize') as span:
+                summary = normalize_csv(input_file, output_file, args.category, args.chunksize)
+                span['rows'] = summary['rows_read']
+            logger.info(f"Saved normalized file to: {output_file}")
+            with metrics.span('verify'):
+                if not verify_output(output_file, summary):
+                    raise ValueError(f"{output_file} does not match its input, see the log above")
+
+        # Calculate processing time
+        elapsed_time = time.time() - start_time
+        logger.info(f"\nProcessing completed in {elapsed_time:.2f} seconds")
+
+        # Provide summary of changes
+        logger.info("\nNORMALIZATION SUMMARY")
+        logger.info(f"Original rows: {summary['rows_read']}")
+        logger.info(f"Final rows: {summary['rows_written']}")
+        logger.info(f"Quarantined records: {summary['quarantined']} ({summary['quarantine_file']})")
+        logger.info(f"Original columns: {len(summary['original_columns'])}")
+        logger.info(f"Final columns: {len(summary['final_columns'])}")
+        added = [col for col in summary['final_columns'] if col not in summary['original_columns']]
+        logger.info(f"Added columns: {', '.join(added)}")
+
+        logger.info("\nThe normalized CSV file is ready to use!")
+        logger.info(f"To use the normalized file in your code, replace:")
+        logger.info(f"videos = pd.read_csv(f\"{{data_path}}data_csv/{input_name}\", engine='python')")
+        logger.info(f"with:")
+        logger.info(f"videos = pd.read_csv(f\"{{data_path}}data_csv/normalized_{input_name}\")")
+
     except Exception as e:
-        logger.error(f"Verification failed - could not read saved file: {str(e)}")
-    
-    # Calculate processing time
-    elapsed_time = time.time() - start_time
-    logger.info(f"\nProcessing completed in {elapsed_time:.2f} seconds")
-    
-    # Provide summary of changes
-    logger.info("\nNORMALIZATION SUMMARY")
-    logger.info(f"Original rows: {original_row_count}")
-    logger.info(f"Final rows: {len(df)}")
-    logger.info(f"Original columns: {original_column_count}")
-    logger.info(f"Final columns: {len(df.columns)}")
-    logger.info(f"Added columns: {', '.join(set(df.columns) - set(df.columns[:original_column_count]))}")
-    
-    logger.info("\nThe normalized CSV file is ready to use!")
-    logger.info(f"To use the normalized file in your code, replace:")
-    logger.info(f"videos = pd.read_csv(f\"{{data_path}}data_csv/videos_detail_animals_20241015.csv\", engine='python')")
-    logger.info(f"with:")
-    logger.info(f"videos = pd.read_csv(f\"{{data_path}}data_csv/normalized_videos_detail_animals_20241015.csv\")")
-
-except Exception as e:
-    logger.error(f"Error normalizing CSV file: {str(e)}", exc_info=True)
-    print(f"Error: {str(e)}")
\ No newline at end of file
+        logger.error(f"Error normalizing CSV file: {str(e)}", exc_info=True)
+        print(f"Error: {str(e)}")
+        metrics.event('stage_failed', error=str(e))
+
+if __name__ == "__main__":
+    main()
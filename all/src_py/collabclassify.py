@@ -0,0 +1,256 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import accounting
+import metrics
+from collabfilter import ChannelMatcher, filter_candidates, load_known_channels
+from videoframe import load_videos
+
+# Get the absolute path of the script's directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), 'data')
+DEFAULT_INPUT = os.path.join(DATA_DIR, 'data_csv', 'videos_detail_20241015.csv')
+DEFAULT_OUTPUT = os.path.join(DATA_DIR, 'data_csv', 'collab_labels.csv')
+CACHE_FILE = os.path.join(DATA_DIR, 'collab_cache.jsonl')
+
+BATCH_SIZE = 10
+MAX_WORKERS = 4
+# Descriptions are cut to this many characters in the prompt
+MAX_DESCRIPTION_CHARS = 1000
+
+PROMPT = """You label YouTube videos with the other YouTube channels or creators that collaborate in them.
+The host channel itself is not a collaborator. Mentions of sponsors, music credits and
+channels that are only linked or recommended are not collaborations.
+
+For every video below, reply with its video_id and the list of collaborator names
+(empty if there are none), as JSON of the form
+{"results": [{"video_id": "...", "collaborators": ["...", ...]}, ...]}"""
+
+# Changing the prompt changes this hash; entries labelled with another prompt
+# are only relabelled when asked to (--relabel-stale)
+PROMPT_HASH = hashlib.sha1(PROMPT.encode('utf-8')).hexdigest()[:12]
+
+def content_key(video_id, title, description):
+    """Cache key of one video: changes whenever its ID, title or description does"""
+    digest = hashlib.sha1()
+    for value in (video_id, title, description):
+        digest.update(('' if pd.isna(value) else str(value)).encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+def format_batch(videos):
+    """User message listing a batch of videos"""
+    parts = []
+    for video in videos:
+        description = (video['description'] or '')[:MAX_DESCRIPTION_CHARS]
+        parts.append(f"video_id: {video['video_id']}\ntitle: {video['title'] or ''}\n"
+                     f"description: {description}")
+    return '\n\n---\n\n'.join(parts)
+
+def parse_response(text, videos):
+    """
+    Map a model reply back to the batch.
+
+    Returns:
+        Dictionary mapping video ID to collaborator list, for the videos the
+        reply covers; videos it leaves out are retried on the next run
+    """
+    match = re.search(r'\{.*\}', text, re.DOTALL)
+    if not match:
+        return {}
+    try:
+        results = json.loads(match.group(0)).get('results', [])
+    except (json.JSONDecodeError, AttributeError):
+        return {}
+    wanted = {video['video_id'] for video in videos}
+    labels = {}
+    for result in results:
+        if isinstance(result, dict) and result.get('video_id') in wanted:
+            labels[result['video_id']] = [str(name) for name in result.get('collaborators') or []]
+    return labels
+
+class OpenAIBackend:
+    """Chat completions backend; the openai package is only needed when this is used"""
+
+    name = 'openai'
+
+    def __init__(self, model=None):
+        from openai import OpenAI
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        self.client = OpenAI()
+        self.model = model or os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+
+    def classify(self, videos):
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {'role': 'system', 'content': PROMPT},
+                {'role': 'user', 'content': format_batch(videos)}
+            ],
+            response_format={'type': 'json_object'},
+            temperature=0
+        )
+        if response.usage is not None:
+            cost = accounting.record_llm_call(response.model or self.model, response.usage.prompt_tokens,
+                                              response.usage.completion_tokens)
+            metrics.inc('llm_tokens', response.usage.prompt_tokens + response.usage.completion_tokens,
+                        model=self.model)
+            if cost is not None:
+                metrics.inc('llm_cost_usd', cost, model=self.model)
+        metrics.inc('llm_calls', model=self.model)
+        return parse_response(response.choices[0].message.content, videos)
+
+class StubBackend:
+    """Offline backend for dry runs: @handles in the title and description are collaborators"""
+
+    name = 'stub'
+    HANDLE = re.compile(r'@([\w.\-]+)')
+
+    def __init__(self, model=None):
+        self.calls = 0
+
+    def classify(self, videos):
+        self.calls += 1
+        return {
+            video['video_id']: list(dict.fromkeys(
+                self.HANDLE.findall(f"{video['title'] or ''} {video['description'] or ''}")))
+            for video in videos
+        }
+
+BACKENDS = {
+    'openai': OpenAIBackend,
+    'stub': StubBackend
+}
+
+def load_cache(path=CACHE_FILE):
+    """Read the JSONL cache; later lines win over earlier ones for the same key"""
+    cache = {}
+    if not os.path.exists(path):
+        return cache
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a run interrupted mid-write leaves a partial last line
+            cache[entry['key']] = entry
+    return cache
+
+def classify_videos(videos_df, backend, cache_path=CACHE_FILE, batch_size=BATCH_SIZE,
+                    max_workers=MAX_WORKERS, relabel_stale=False):
+    """
+    Label collaborators for every video, only calling the backend for videos
+    that are not in the cache.
+
+    Uncached videos are packed batch_size to a prompt and up to max_workers
+    prompts are in flight at a time. Each answer is appended to the cache as
+    soon as it arrives, so an interrupted run loses at most the batches in
+    flight.
+
+    Args:
+        videos_df: DataFrame with video_id, title and description
+        backend: Object with a classify(videos) method (see BACKENDS)
+        cache_path: JSONL cache of labels keyed by content hash
+        batch_size: Videos per prompt
+        max_workers: Maximum number of concurrent requests
+        relabel_stale: Also relabel videos labelled with a different prompt
+
+    Returns:
+        Dictionary mapping video ID to its list of collaborators
+    """
+    cache = load_cache(cache_path)
+    labels = {}
+    pending = []
+
+    for video in videos_df[['video_id', 'title', 'description']].to_dict('records'):
+        video = {k: (None if pd.isna(v) else v) for k, v in video.items()}
+        key = content_key(video['video_id'], video['title'], video['description'])
+        entry = cache.get(key)
+        if entry is not None and not (relabel_stale and entry['prompt'] != PROMPT_HASH):
+            labels[video['video_id']] = entry['collaborators']
+        else:
+            pending.append((key, video))
+
+    print(f"{len(labels)} videos cached, {len(pending)} to classify "
+          f"in batches of {batch_size} with the {backend.name} backend")
+    if not pending:
+        return labels
+
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+
+    def run(batch):
+        try:
+            return batch, backend.classify([video for _, video in batch]), None
+        except Exception as e:
+            return batch, {}, e
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, 'a', encoding='utf-8') as cache_file, \
+            ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for number, (batch, result, error) in enumerate(executor.map(run, batches), 1):
+            if error is not None:
+                print(f"Error classifying batch {number}/{len(batches)}: {error}")
+                continue
+            for key, video in batch:
+                if video['video_id'] not in result:
+                    continue
+                collaborators = result[video['video_id']]
+                labels[video['video_id']] = collaborators
+                cache_file.write(json.dumps({
+                    'key': key,
+                    'video_id': video['video_id'],
+                    'prompt': PROMPT_HASH,
+                    'backend': backend.name,
+                    'collaborators': collaborators
+                }, ensure_ascii=False) + '\n')
+            cache_file.flush()
+            print(f"Classified batch {number}/{len(batches)}")
+
+    return labels
+
+def main():
+    parser = argparse.ArgumentParser(description='Label collaborators in videos with an LLM, with caching')
+    parser.add_argument('--input', default=DEFAULT_INPUT, help='Video details CSV')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Where to write the labels CSV')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='openai', help='Classifier backend')
+    parser.add_argument('--model', default=None, help='Model name for the openai backend')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Videos per prompt')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='Concurrent requests')
+    parser.add_argument('--limit', type=int, default=None, help='Only classify the first N videos')
+    parser.add_argument('--no-prefilter', action='store_true',
+                        help='Send every video to the classifier, not only pre-filter candidates')
+    parser.add_argument('--relabel-stale', action='store_true',
+                        help='Relabel videos that were labelled with a different prompt')
+    args = parser.parse_args()
+
+    metrics.init_metrics('collabclassify')
+    videos_df = load_videos(args.input, columns=['video_id', 'channel_id', 'title', 'description'],
+                            nrows=args.limit)
+    candidates = videos_df
+    if not args.no_prefilter:
+        # Videos without a collaboration marker or another known channel's
+        # name are labelled as having no collaborators without a model call
+        candidates = filter_candidates(videos_df, ChannelMatcher(load_known_channels()))
+
+    backend = BACKENDS[args.backend](args.model)
+    skipped = videos_df.loc[~videos_df.index.isin(candidates.index), 'video_id']
+    labels = {video_id: [] for video_id in skipped}
+    labels.update(classify_videos(candidates, backend, batch_size=args.batch_size,
+                                  max_workers=args.workers, relabel_stale=args.relabel_stale))
+
+    result_df = videos_df[['video_id', 'channel_id']].copy()
+    collaborators = result_df['video_id'].map(labels)
+    result_df['num_collaborators'] = collaborators.map(lambda names: len(names) if isinstance(names, list) else None)
+    result_df['collaborators'] = collaborators.map(lambda names: json.dumps(names) if isinstance(names, list) else None)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    result_df.to_csv(args.output, index=False)
+    print(f"Labels for {collaborators.notna().sum()}/{len(result_df)} videos saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
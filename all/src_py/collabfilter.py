@@ -0,0 +1,175 @@
+import argparse
+import glob
+import os
+import re
+import pandas as pd
+
+# Get the absolute path of the script's directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Repository root, holding one directory per category
+BASE_DIR = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+CATEGORIES = ['animals', 'blogs', 'comedy', 'entertainment', 'gaming']
+
+# Wording that announces another creator: "ft.", "feat", "featuring",
+# "with @someone", "collab" and "A x B" style titles
+MARKERS = re.compile(
+    r'(?:\b(?:ft|feat)\b\.?|\bfeaturing\b|\bwith\s+@\w|\bcollab|\S\s+[x×]\s+\S)',
+    re.IGNORECASE
+)
+HANDLE_IN_LINK = re.compile(r'youtube\.com/(@[\w.\-]+)', re.IGNORECASE)
+CHANNEL_ID_IN_LINK = re.compile(r'/channel/([\w\-]+)')
+
+# Shorter names ("Tom", "Dog") match ordinary words far too often
+MIN_NAME_LENGTH = 4
+
+def has_pyahocorasick():
+    try:
+        import ahocorasick  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def load_known_channels(base_dir=BASE_DIR, categories=CATEGORIES, snapshot=None):
+    """
+    Collect the names and handles of every ranked channel.
+
+    Args:
+        base_dir: Repository root with one directory per category
+        categories: Categories whose channels_<date>.csv snapshots are read
+        snapshot: Only read this date (YYYY-MM-DD) if given
+
+    Returns:
+        Dictionary mapping lowercased name or @handle to channel ID (or to the
+        name itself when the snapshot has no ID for it)
+    """
+    pattern = f'channels_{snapshot}.csv' if snapshot else 'channels_*.csv'
+    known = {}
+    for category in categories:
+        for csv_path in sorted(glob.glob(os.path.join(base_dir, category, 'data_csv', pattern))):
+            channels = pd.read_csv(csv_path, usecols=lambda col: col in ('Youtuber', 'Channel Link', 'Channel ID'),
+                                   dtype='string')
+            for row in channels.itertuples(index=False):
+                row = row._asdict()
+                name = row.get('Youtuber')
+                link = row.get('Channel Link')
+                channel_id = row.get('Channel ID')
+                if pd.isna(channel_id) and pd.notna(link):
+                    match = CHANNEL_ID_IN_LINK.search(link)
+                    channel_id = match.group(1) if match else None
+                keys = [name] if pd.notna(name) else []
+                if pd.notna(link):
+                    keys.extend(HANDLE_IN_LINK.findall(link))
+                for key in keys:
+                    key = key.strip().lower()
+                    if len(key.lstrip('@')) >= MIN_NAME_LENGTH:
+                        known[key] = channel_id if pd.notna(channel_id) else key
+    return known
+
+class ChannelMatcher:
+    """
+    Finds known channel names in text in a single pass.
+
+    Uses an Aho-Corasick automaton when pyahocorasick is installed and one
+    compiled alternation regex otherwise. Matches must start and end on a
+    word boundary.
+    """
+
+    def __init__(self, known):
+        self.known = known
+        self.automaton = None
+        self.pattern = None
+        if not known:
+            return
+        if has_pyahocorasick():
+            import ahocorasick
+            self.automaton = ahocorasick.Automaton()
+            for name, channel_id in known.items():
+                self.automaton.add_word(name, (len(name), channel_id))
+            self.automaton.make_automaton()
+        else:
+            # Longest names first so "mr beast gaming" wins over "mr beast"
+            names = sorted(known, key=len, reverse=True)
+            self.pattern = re.compile(r'(?<!\w)(?:' + '|'.join(map(re.escape, names)) + r')(?!\w)')
+
+    def find(self, text):
+        """Return the set of channel IDs mentioned in the text"""
+        if not text or not self.known:
+            return set()
+        text = text.lower()
+        if self.automaton is not None:
+            found = set()
+            for end, (length, channel_id) in self.automaton.iter(text):
+                start = end - length + 1
+                if (start == 0 or not text[start - 1].isalnum()) and \
+                        (end + 1 == len(text) or not text[end + 1].isalnum()):
+                    found.add(channel_id)
+            return found
+        return {self.known[name] for name in self.pattern.findall(text)}
+
+def candidate_mask(videos_df, matcher=None, text_column='title_description'):
+    """
+    Flag videos that may feature another channel.
+
+    A video is a candidate when its text has a collaboration marker or
+    mentions a known channel other than its own host channel. Marker
+    matching runs vectorized over the whole column; the dictionary pass only
+    looks at the videos without a marker.
+
+    Args:
+        videos_df: Videos with title_description (or title and description)
+            and optionally channel_id
+        matcher: ChannelMatcher over known channels, or None for markers only
+        text_column: Column holding the searchable text
+
+    Returns:
+        Boolean Series aligned with videos_df
+    """
+    if text_column in videos_df.columns:
+        text = videos_df[text_column].astype('string').fillna('')
+    else:
+        text = (videos_df['title'].astype('string').fillna('') + ' ' +
+                videos_df['description'].astype('string').fillna(''))
+
+    mask = text.str.contains(MARKERS, regex=True).fillna(False).astype(bool)
+    if matcher is None or not matcher.known:
+        return mask
+
+    hosts = videos_df['channel_id'].astype(object) if 'channel_id' in videos_df.columns \
+        else pd.Series(None, index=videos_df.index, dtype=object)
+    unmarked = ~mask
+    mask[unmarked] = [
+        bool(matcher.find(value) - {host})
+        for value, host in zip(text[unmarked], hosts[unmarked])
+    ]
+    return mask
+
+def filter_candidates(videos_df, matcher=None, text_column='title_description'):
+    """Keep only the candidate videos and report how many were dropped"""
+    mask = candidate_mask(videos_df, matcher, text_column)
+    kept = int(mask.sum())
+    share = kept / len(videos_df) if len(videos_df) else 0
+    print(f"Pre-filter kept {kept}/{len(videos_df)} videos ({share:.1%}) as collaboration candidates")
+    return videos_df[mask]
+
+def main():
+    parser = argparse.ArgumentParser(description='Keep only videos that may feature another channel')
+    parser.add_argument('input', help='videos_detail CSV from jsontocsv.py (or the combined table)')
+    parser.add_argument('--output', required=True, help='Where to write the candidate videos')
+    parser.add_argument('--snapshot', default=None, help='Ranking snapshot date for known channels')
+    parser.add_argument('--markers-only', action='store_true', help='Skip the known-channel dictionary')
+    args = parser.parse_args()
+
+    matcher = None
+    if not args.markers_only:
+        known = load_known_channels(snapshot=args.snapshot)
+        engine = 'Aho-Corasick' if has_pyahocorasick() else 'regex'
+        print(f"Loaded {len(known)} known channel names and handles ({engine} matcher)")
+        matcher = ChannelMatcher(known)
+
+    videos_df = pd.read_csv(args.input, dtype='string')
+    candidates = filter_candidates(videos_df, matcher)
+    candidates.to_csv(args.output, index=False)
+    print(f"Candidates saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from txtanalysis import EDGE_HEADERS, OUTPUT_DIR, TXT_DIR, load_edges, parse_log
+
+# Get the absolute path of the script's directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), 'data', 'graph_cache')
+
+# Bump when the cached graph layout changes
+CACHE_VERSION = 1
+
+class CollabGraph:
+    """
+    Channel x channel collaboration graph stored as a sparse CSR matrix.
+
+    Channel IDs are interned to integer node indices; `nodes[i]` is the
+    channel ID (or collaborator name, when the log has no ID) of node i.
+    `adjacency[i, j]` counts how often host channel i featured channel j,
+    and `undirected` is adjacency + adjacency.T.
+    """
+
+    def __init__(self, nodes, adjacency):
+        self.nodes = np.asarray(nodes, dtype=object)
+        self.adjacency = adjacency.tocsr()
+        self.undirected = (self.adjacency + self.adjacency.T).tocsr()
+
+    @property
+    def num_nodes(self):
+        return len(self.nodes)
+
+    @property
+    def num_edges(self):
+        """Number of distinct undirected channel pairs"""
+        upper = sparse.triu(self.undirected, k=1)
+        return upper.nnz + int((self.undirected.diagonal() > 0).sum())
+
+    @classmethod
+    def from_edges(cls, edges_df):
+        """
+        Build the graph from a long-format edge table (see txtanalysis.py).
+
+        Collaborators without an ID are keyed by name; rows without a host
+        channel (overflow collaborators) cannot form an edge and are skipped.
+        """
+        targets = edges_df['collaborator_id'].astype(object).where(
+            edges_df['collaborator_id'].notna(), edges_df['collaborator'].astype(object))
+        usable = edges_df['host_channel_id'].notna() & targets.notna()
+        sources = edges_df.loc[usable, 'host_channel_id'].astype(object).to_numpy()
+        targets = targets[usable].to_numpy()
+
+        # Intern every channel key to a dense integer ID in one pass
+        codes, nodes = pd.factorize(np.concatenate([sources, targets]))
+        src, dst = codes[:len(sources)], codes[len(sources):]
+        n = len(nodes)
+        adjacency = sparse.coo_matrix(
+            (np.ones(len(src), dtype=np.float64), (src, dst)), shape=(n, n)
+        ).tocsr()  # duplicate pairs are summed into edge weights
+        return cls(nodes, adjacency)
+
+    def degree(self):
+        """Number of distinct collaborators of each node"""
+        return np.diff(self.undirected.indptr)
+
+    def weighted_degree(self):
+        """Total number of collaborations of each node"""
+        return np.asarray(self.undirected.sum(axis=1)).ravel()
+
+    def components(self):
+        """Return (number of components, component label of each node)"""
+        return connected_components(self.undirected, directed=False)
+
+    def pagerank(self, damping=0.85, tol=1e-10, max_iter=100):
+        """Weighted PageRank on the undirected graph by power iteration"""
+        n = self.num_nodes
+        if n == 0:
+            return np.array([])
+        out_weight = self.weighted_degree()
+        dangling = out_weight == 0
+        inv_weight = np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)
+        # Column-stochastic transition matrix
+        transition = (sparse.diags(inv_weight) @ self.undirected).T.tocsr()
+
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            new_rank = damping * (transition @ rank + rank[dangling].sum() / n) + (1 - damping) / n
+            if np.abs(new_rank - rank).sum() < tol:
+                return new_rank
+            rank = new_rank
+        return rank
+
+    def node_metrics(self):
+        """DataFrame with degree, weighted degree, component and PageRank per node"""
+        _, labels = self.components()
+        return pd.DataFrame({
+            'channel': self.nodes,
+            'degree': self.degree(),
+            'weighted_degree': self.weighted_degree(),
+            'component': labels,
+            'pagerank': self.pagerank()
+        })
+
+    def save(self, path):
+        sparse.save_npz(f'{path}.npz', self.adjacency)
+        with open(f'{path}.nodes.json', 'w', encoding='utf-8') as f:
+            json.dump(self.nodes.tolist(), f)
+
+    @classmethod
+    def load(cls, path):
+        adjacency = sparse.load_npz(f'{path}.npz')
+        with open(f'{path}.nodes.json', 'r', encoding='utf-8') as f:
+            nodes = json.load(f)
+        return cls(nodes, adjacency)
+
+def _inputs_key(paths):
+    """Cache key from the inputs' paths, sizes and modification times"""
+    digest = hashlib.sha1(str(CACHE_VERSION).encode('utf-8'))
+    for path in sorted(paths):
+        stat = os.stat(path)
+        digest.update(f'{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}'.encode('utf-8'))
+    return digest.hexdigest()
+
+def read_edges(paths):
+    """Concatenate edge tables; .txt logs are parsed, other files loaded with load_edges"""
+    frames = []
+    for path in paths:
+        if path.endswith('.txt'):
+            _, _, edges = parse_log(path)
+            frames.append(pd.DataFrame(edges, columns=EDGE_HEADERS))
+        else:
+            frames.append(load_edges(path))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=EDGE_HEADERS)
+
+def build_graph(paths, cache_dir=CACHE_DIR, use_cache=True):
+    """
+    Build the collaboration graph from edge tables or logs, with a disk cache.
+
+    Args:
+        paths: Edge tables (.parquet/.csv from txtanalysis.py) or raw .txt logs,
+            from any mix of categories and snapshots
+        cache_dir: Where built graphs are cached
+        use_cache: Reuse a cached graph when the inputs are unchanged
+
+    Returns:
+        A CollabGraph
+    """
+    cache_path = os.path.join(cache_dir, f'collab_{_inputs_key(paths)}')
+    if use_cache and os.path.exists(f'{cache_path}.npz'):
+        print(f"Loaded cached graph from {cache_path}.npz")
+        return CollabGraph.load(cache_path)
+
+    graph = CollabGraph.from_edges(read_edges(paths))
+    os.makedirs(cache_dir, exist_ok=True)
+    graph.save(cache_path)
+    print(f"Built graph from {len(paths)} inputs and cached it to {cache_path}.npz")
+    return graph
+
+def default_inputs():
+    """The edge table if txtanalysis.py has written one, otherwise the raw logs"""
+    for name in ('collaboration_edges.parquet', 'collaboration_edges.csv'):
+        path = os.path.join(OUTPUT_DIR, name)
+        if os.path.exists(path):
+            return [path]
+    return sorted(glob.glob(os.path.join(TXT_DIR, '*.txt')))
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the channel collaboration graph and its metrics')
+    parser.add_argument('inputs', nargs='*', help='Edge tables or .txt logs (defaults to the txtanalysis output)')
+    parser.add_argument('--output', default=os.path.join(OUTPUT_DIR, 'channel_metrics.csv'),
+                        help='Where to write the per-channel metrics')
+    parser.add_argument('--top', type=int, default=10, help='Number of top channels to print')
+    parser.add_argument('--no-cache', action='store_true', help='Rebuild the graph even if cached')
+    args = parser.parse_args()
+
+    inputs = args.inputs or default_inputs()
+    if not inputs:
+        print("No edge tables or collaboration logs found")
+        return
+
+    graph = build_graph(inputs, use_cache=not args.no_cache)
+    metrics = graph.node_metrics()
+    num_components, _ = graph.components()
+
+    print(f"\nChannels (nodes): {graph.num_nodes}")
+    print(f"Collaboration pairs (edges): {graph.num_edges}")
+    print(f"Connected components: {num_components}")
+    print(f"\nTop {args.top} channels by PageRank:")
+    print(metrics.sort_values('pagerank', ascending=False).head(args.top).to_string(index=False))
+
+    metrics.to_csv(args.output, index=False)
+    print(f"\nChannel metrics saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,87 @@
 import pandas as pd
-from datetime import datetime
 import os
+from videoframe import load_videos
 
 # Define paths
 data_path = '../data/'
 csv_file_path = f"{data_path}data_csv/videos_detail_20241015.csv"
 output_xlsx_path = f"{data_path}data_csv/samples/all_sample.xlsx"
 
-# Make sure the output directory exists
-os.makedirs(os.path.dirname(output_xlsx_path), exist_ok=True)
-
-# Read the CSV file
-print(f"Reading CSV file from: {csv_file_path}")
-videos_df = pd.read_csv(csv_file_path)
-
-# Display basic info about the CSV
-print(f"CSV loaded. Shape: {videos_df.shape}")
-print(f"Columns: {videos_df.columns.tolist()}")
-
-# Get unique channel IDs
-unique_channels = videos_df['channel_id'].unique()
-print(f"Found {len(unique_channels)} unique channels")
-
-# Create a new dataframe for the Excel file
-result_df = pd.DataFrame(columns=['video_id', 'channel_id', 'videoCount'])
-
-# For each channel, find a video and count videos from January 2024
-for channel_id in unique_channels:
-    # Filter videos for this channel
-    channel_videos = videos_df[videos_df['channel_id'] == channel_id]
-    
-    # Get the first video_id for this channel (or you could choose any specific criteria)
-    if not channel_videos.empty:
-        video_id = channel_videos.iloc[0]['video_id']
-        
-        # Count videos from this channel posted since January 2024
-        if 'upload_date' in videos_df.columns:
-            # Filter for videos in 2024
-            jan_2024 = datetime.strptime('2024-01-01', '%Y-%m-%d')
-            
-            # Convert upload_date to datetime for comparison
-            channel_videos['upload_date_dt'] = pd.to_datetime(channel_videos['upload_date'], errors='coerce')
-            
-            # Count videos published in 2024
-            videos_2024_count = len(channel_videos[channel_videos['upload_date_dt'] >= jan_2024])
-        else:
-            # If upload_date column doesn't exist, use total count as fallback
-            videos_2024_count = len(channel_videos)
-            print(f"Warning: 'upload_date' column not found. Using total count for channel {channel_id}")
-        
-        # Add to results dataframe
-        result_df = result_df._append({
-            'video_id': video_id,
-            'channel_id': channel_id,
-            'videoCount': videos_2024_count
-        }, ignore_index=True)
-
-# Save to Excel
-print(f"Saving Excel file to: {output_xlsx_path}")
-result_df.to_excel(output_xlsx_path, index=False)
-print(f"Excel file created successfully with {len(result_df)} rows")
-
-# Preview the result
-print("\nPreview of the created Excel file:")
-print(result_df.head())
\ No newline at end of file
+# Videos published on or after this date are counted per channel
+COUNT_SINCE = pd.Timestamp('2024-01-01')
+
+def build_channel_sample(videos_df):
+    """
+    Pick one video per channel and count the channel's videos since January 2024.
+
+    Args:
+        videos_df: Video details with channel_id, video_id and optionally upload_date
+
+    Returns:
+        DataFrame with video_id, channel_id and videoCount, one row per channel
+        in order of first appearance
+    """
+    # Group in order of first appearance so the first row is the channel's first video
+    grouped = videos_df.groupby('channel_id', sort=False, observed=True)
+    result_df = grouped['video_id'].first().reset_index()
+
+    if 'upload_date' in videos_df.columns:
+        # Parse dates once for the whole table, then count per channel
+        upload_dates = pd.to_datetime(videos_df['upload_date'], errors='coerce')
+        recent = (upload_dates >= COUNT_SINCE).groupby(videos_df['channel_id'], sort=False, observed=True).sum()
+        result_df['videoCount'] = result_df['channel_id'].map(recent).astype(int)
+    else:
+        # If upload_date column doesn't exist, use total count as fallback
+        print("Warning: 'upload_date' column not found. Using total count per channel")
+        result_df['videoCount'] = result_df['channel_id'].map(grouped.size()).astype(int)
+
+    return result_df[['video_id', 'channel_id', 'videoCount']]
+
+def save_xlsx(result_df, path):
+    """
+    Write the sample with xlsxwriter's constant-memory mode.
+
+    Constant-memory mode flushes a row as soon as the next one is started,
+    so rows have to be written whole and in order. DataFrame.to_excel
+    writes column by column and would leave every row but the last empty.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    worksheet = workbook.add_worksheet('Sheet1')
+    worksheet.write_row(0, 0, list(result_df.columns), workbook.add_format({'bold': True}))
+    # Python objects, with missing values as None so they are left blank
+    values = result_df.astype(object).where(result_df.notna(), None)
+    for row_number, row in enumerate(values.itertuples(index=False, name=None), start=1):
+        worksheet.write_row(row_number, 0, row)
+    workbook.close()
+
+def main():
+    # Make sure the output directory exists
+    os.makedirs(os.path.dirname(output_xlsx_path), exist_ok=True)
+
+    # Read the CSV file, only loading the columns the sample needs
+    print(f"Reading CSV file from: {csv_file_path}")
+    videos_df = load_videos(csv_file_path, columns=['video_id', 'channel_id', 'upload_date'])
+
+    # Display basic info about the CSV
+    print(f"CSV loaded. Shape: {videos_df.shape}")
+    print(f"Columns: {videos_df.columns.tolist()}")
+
+    # Drop rows without a channel, which the groupby would otherwise ignore silently
+    videos_df = videos_df.dropna(subset=['channel_id'])
+    print(f"Found {videos_df['channel_id'].nunique()} unique channels")
+
+    result_df = build_channel_sample(videos_df)
+
+    # Save to Excel
+    print(f"Saving Excel file to: {output_xlsx_path}")
+    save_xlsx(result_df, output_xlsx_path)
+    print(f"Excel file created successfully with {len(result_df)} rows")
+
+    # Preview the result
+    print("\nPreview of the created Excel file:")
+    print(result_df.head())
+
+if __name__ == "__main__":
+    main()
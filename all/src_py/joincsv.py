@@ -1,61 +1,170 @@
 import pandas as pd
-import os
+import argparse
+import shutil
 from pathlib import Path
+from videoframe import VIDEO_SCHEMA
+import metrics
+import profiling
 
-def combine_video_details():
+def align_chunk(df, category):
+    """Give a chunk exactly the shared columns, in order, with the shared dtypes"""
+    df['category'] = category
+    df = df.reindex(columns=list(VIDEO_SCHEMA))
+    for col, dtype in VIDEO_SCHEMA.items():
+        if dtype == 'Int64':
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+def combine_video_details(output_format='csv', chunksize=100000, base_dir=None):
+    """
+    Stream every category's videos_detail.csv into one combined output.
+
+    Each category is read chunk by chunk, aligned to VIDEO_SCHEMA and
+    appended to the output straight away, so only one chunk is in memory
+    at a time. A category that fails part way is rolled back, so the output
+    only ever holds complete categories.
+
+    Args:
+        output_format: 'csv' for combined_videos_detail.csv, or 'parquet' for a
+            combined_videos_detail/ dataset partitioned by category
+        chunksize: Number of rows read at a time
+        base_dir: Tree holding the category directories (defaults to this repository)
+
+    Returns:
+        Dictionary mapping category to number of videos written
+    """
     # Define categories to process
     categories = ['animals', 'blogs', 'comedy', 'entertainment', 'gaming']
-    
-    # Initialize an empty list to store all dataframes
-    all_dfs = []
-    
+
     # Get the base directory (YouTube folder)
-    base_dir = Path(__file__).parent.parent.parent
-    
-    for category in categories:
-        # Construct path to videos_detail.csv for each category
-        csv_path = base_dir / category / 'data_csv' / 'videos_detail.csv'
-        
-        try:
-            # Read the CSV file
-            df = pd.read_csv(csv_path)
-            
-            # Add a category column to identify the source
-            df['category'] = category
-            
-            # Append to our list of dataframes
-            all_dfs.append(df)
-            print(f"Successfully processed {category} data with {len(df)} rows")
-            
-        except FileNotFoundError:
-            print(f"Warning: Could not find videos_detail.csv for {category}")
-        except Exception as e:
-            print(f"Error processing {category}: {str(e)}")
-    
-    if not all_dfs:
-        raise Exception("No data was found to combine")
-    
-    # Combine all dataframes
-    combined_df = pd.concat(all_dfs, ignore_index=True)
-    
+    base_dir = Path(base_dir or Path(__file__).parent.parent.parent)
+
     # Create output directory if it doesn't exist
     output_dir = base_dir / 'all' / 'data' / 'data_csv'
     output_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Save combined dataset
-    output_path = output_dir / 'combined_videos_detail.csv'
-    combined_df.to_csv(output_path, index=False)
-    
+
+    if output_format == 'parquet':
+        output_path = output_dir / 'combined_videos_detail'
+        # Built from empty in a hidden sibling directory, so stale partitions
+        # don't linger, and swapped in once complete: the previous dataset
+        # stays readable until then
+        build_path = output_dir / '.combined_videos_detail.tmp'
+        if build_path.exists():
+            shutil.rmtree(build_path)
+        build_path.mkdir()
+        combined = None
+    else:
+        output_path = output_dir / 'combined_videos_detail.csv'
+        # Built under a temporary name and renamed once complete
+        tmp_path = output_path.with_name(f'{output_path.name}.tmp')
+        combined = open(tmp_path, 'w', encoding='utf-8', newline='')
+
+    counts = {}
+    header_written = False
+
+    try:
+        for category in categories:
+            # Construct path to videos_detail.csv for each category
+            csv_path = base_dir / category / 'data_csv' / 'videos_detail.csv'
+            if output_format == 'parquet':
+                # Written under a hidden name, which dataset readers skip, and
+                # renamed to the real partition once the category is complete
+                partition_dir = build_path / f'category={category}'
+                staging_dir = build_path / f'.category={category}.tmp'
+            else:
+                start = combined.tell()
+
+            try:
+                with metrics.span('category', category=category) as span:
+                    reader = pd.read_csv(csv_path, dtype='string', chunksize=chunksize)
+                    rows = 0
+                    for part, chunk in enumerate(reader):
+                        chunk = align_chunk(chunk, category)
+
+                        if output_format == 'parquet':
+                            staging_dir.mkdir(exist_ok=True)
+                            chunk.drop(columns='category').to_parquet(
+                                staging_dir / f'part-{part:05d}.parquet', index=False
+                            )
+                        else:
+                            chunk.to_csv(combined, header=not header_written and part == 0, index=False)
+
+                        rows += len(chunk)
+
+                    span['rows'] = rows
+
+                if output_format == 'parquet':
+                    if staging_dir.exists():
+                        staging_dir.rename(partition_dir)
+                else:
+                    header_written = header_written or combined.tell() > start
+                counts[category] = rows
+                metrics.inc('rows_written', rows, category=category)
+                print(f"Successfully processed {category} data with {rows} rows")
+
+            except Exception as e:
+                # Drop whatever the category wrote before it failed
+                if output_format == 'parquet':
+                    shutil.rmtree(staging_dir, ignore_errors=True)
+                else:
+                    combined.seek(start)
+                    combined.truncate()
+                if isinstance(e, FileNotFoundError):
+                    print(f"Warning: Could not find videos_detail.csv for {category}")
+                    metrics.inc('categories_missing', category=category)
+                else:
+                    print(f"Error processing {category}: {str(e)}")
+                    metrics.inc('categories_failed', category=category)
+    finally:
+        if combined is not None:
+            combined.close()
+
+    if not counts:
+        if output_format == 'csv':
+            tmp_path.unlink()
+        else:
+            shutil.rmtree(build_path)
+        raise Exception("No data was found to combine")
+    if output_format == 'csv':
+        tmp_path.replace(output_path)
+    else:
+        # A directory cannot replace another in one rename, so the old
+        # dataset is moved aside first and removed after the swap
+        old_path = output_dir / '.combined_videos_detail.old'
+        shutil.rmtree(old_path, ignore_errors=True)
+        if output_path.exists():
+            output_path.rename(old_path)
+        build_path.rename(output_path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
     print(f"\nCombined data summary:")
-    print(f"Total number of videos: {len(combined_df)}")
+    print(f"Total number of videos: {sum(counts.values())}")
     print(f"Videos per category:")
-    print(combined_df['category'].value_counts())
+    for category, rows in sorted(counts.items(), key=lambda item: item[1], reverse=True):
+        print(f"{category:<15}{rows}")
     print(f"\nSaved combined data to: {output_path}")
-    
-    return combined_df
+    if output_format == 'csv':
+        metrics.inc('bytes_written', output_path.stat().st_size)
+    else:
+        metrics.inc('bytes_written', sum(path.stat().st_size for path in output_path.rglob('*.parquet')))
+
+    return counts
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Combine every category\'s videos_detail.csv')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv', help='Output format')
+    parser.add_argument('--chunksize', type=int, default=100000, help='Rows read at a time')
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+
+    metrics.init_metrics('joincsv')
     try:
-        combine_video_details()
+        output_dir = Path(__file__).parent.parent / 'data' / 'data_csv'
+        with metrics.span('stage', format=args.format), \
+                profiling.profile_stage('joincsv', output_dir, args.profile):
+            combine_video_details(args.format, args.chunksize)
     except Exception as e:
-        print(f"Error: {str(e)}")
\ No newline at end of file
+        print(f"Error: {str(e)}")
+        metrics.event('stage_failed', error=str(e))
@@ -0,0 +1,303 @@
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Stand-in for the YouTube Data API endpoints the fetch stages call
+# (channels, playlistItems, videos). Point a category's scripts at it with
+#   YOUTUBE_API_BASE_URL=http://127.0.0.1:8080/
+# Payloads are synthetic but deterministic: the same ID always gets the same
+# channel, playlist or video back, whatever the order of requests.
+
+# Newest upload in every playlist; older ones go back from here
+LATEST_UPLOAD = datetime(2024, 11, 1, tzinfo=timezone.utc)
+TOPICS = [
+    'https://en.wikipedia.org/wiki/Pet',
+    'https://en.wikipedia.org/wiki/Animal',
+    'https://en.wikipedia.org/wiki/Lifestyle_(sociology)',
+    'https://en.wikipedia.org/wiki/Entertainment',
+    'https://en.wikipedia.org/wiki/Video_game_culture',
+    'https://en.wikipedia.org/wiki/Humour'
+]
+# Endpoints are served under the same path as on googleapis.com
+SERVICE_PATH = '/youtube/v3/'
+WORDS = ['funny', 'cute', 'challenge', 'vlog', 'reaction', 'shorts', 'cat', 'dog', 'prank',
+         'day', 'life', 'best', 'moments', 'epic', 'new', 'first', 'time', 'trying', 'tips']
+
+def _rng(*parts):
+    """Random generator seeded by the given parts, stable across runs"""
+    return random.Random(':'.join(str(part) for part in parts))
+
+def _make_id(prefix, *parts, length=22):
+    digest = hashlib.sha1(':'.join(str(part) for part in parts).encode('utf-8')).digest()
+    return prefix + base64.urlsafe_b64encode(digest).decode('ascii')[:length]
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+def channel_item(channel_id, seed=0):
+    rng = _rng(seed, 'channel', channel_id)
+    title = f"{_sentence(rng, 2)} {rng.randint(1, 999)}"
+    return {
+        'kind': 'youtube#channel',
+        'id': channel_id,
+        'snippet': {
+            'title': title,
+            'description': _sentence(rng, 12),
+            'customUrl': '@' + title.lower().replace(' ', ''),
+            'publishedAt': (LATEST_UPLOAD - timedelta(days=rng.randint(365, 5000))).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'country': rng.choice(['US', 'GB', 'KR', 'IN', 'BR'])
+        },
+        'contentDetails': {
+            'relatedPlaylists': {'likes': '', 'uploads': 'UU' + channel_id[2:]}
+        },
+        'statistics': {
+            'viewCount': str(int(rng.lognormvariate(18, 2))),
+            'subscriberCount': str(int(rng.lognormvariate(13, 1.5))),
+            'hiddenSubscriberCount': False,
+            'videoCount': str(rng.randint(20, 3000))
+        },
+        'topicDetails': {'topicCategories': rng.sample(TOPICS, 2)},
+        'status': {'privacyStatus': 'public', 'isLinked': True}
+    }
+
+def playlist_uploads(playlist_id, seed=0):
+    """(video_id, publishedAt) of every upload in a playlist, newest first"""
+    rng = _rng(seed, 'playlist', playlist_id)
+    count = rng.randint(20, 400)
+    gap_hours = rng.uniform(6, 120)
+    return [
+        (_make_id('', seed, playlist_id, i, length=11),
+         (LATEST_UPLOAD - timedelta(hours=gap_hours * i)).strftime('%Y-%m-%dT%H:%M:%SZ'))
+        for i in range(count)
+    ]
+
+def video_item(video_id, channel_id, published_at, seed=0):
+    rng = _rng(seed, 'video', video_id)
+    views = int(rng.lognormvariate(10, 2.5))
+    description = _sentence(rng, rng.randint(5, 60))
+    if rng.random() < 0.1:
+        description += f" ft. @{_sentence(rng, 2).lower().replace(' ', '')}"
+    return {
+        'kind': 'youtube#video',
+        'id': video_id,
+        'snippet': {
+            'publishedAt': published_at,
+            'channelId': channel_id,
+            'title': _sentence(rng, rng.randint(3, 10)),
+            'description': description,
+            'tags': rng.sample(WORDS, 3),
+            'categoryId': '15'
+        },
+        'contentDetails': {'duration': f'PT{rng.randint(0, 20)}M{rng.randint(0, 59)}S'},
+        'status': {'uploadStatus': 'processed', 'privacyStatus': 'public'},
+        'statistics': {
+            'viewCount': str(views),
+            'likeCount': str(int(views * rng.uniform(0.01, 0.08))),
+            'favoriteCount': '0',
+            'commentCount': str(int(views * rng.uniform(0.0005, 0.005)))
+        },
+        'topicDetails': {'topicCategories': rng.sample(TOPICS, 1)}
+    }
+
+def error_body(code, reason, message):
+    """Error payload in the format googleapiclient's HttpError parses"""
+    return {'error': {'code': code, 'message': message,
+                      'errors': [{'message': message, 'domain': 'youtube.quota' if reason == 'quotaExceeded'
+                                  else 'global', 'reason': reason}]}}
+
+class MockYouTubeHandler(BaseHTTPRequestHandler):
+    server_version = 'MockYouTube/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        server = self.server
+
+        if url.path == '/_stats':
+            self.send_json(200, server.snapshot())
+            return
+
+        # Only <SERVICE_PATH><resource> is an endpoint, so a client that gets
+        # the path wrong sees a 404 here just as it would from the real API
+        endpoint = url.path[len(SERVICE_PATH):] if url.path.startswith(SERVICE_PATH) else ''
+        handler = getattr(self, f'list_{endpoint}', None) if endpoint.isidentifier() else None
+        if handler is None:
+            self.send_json(404, error_body(404, 'notFound', f'Unknown endpoint {url.path}'))
+            return
+
+        delay, outcome = server.admit(endpoint)
+        if delay:
+            time.sleep(delay)
+        if outcome == 'quota':
+            self.send_json(403, error_body(403, 'quotaExceeded', 'The request cannot be completed because '
+                                                                  'you have exceeded your quota.'))
+        elif outcome == 'error':
+            self.send_json(500, error_body(500, 'backendError', 'Backend Error'))
+        else:
+            self.send_json(200, handler(params))
+
+    def list_channels(self, params):
+        ids = [channel_id for channel_id in params.get('id', '').split(',') if channel_id]
+        items = [channel_item(channel_id, self.server.seed) for channel_id in ids]
+        return {'kind': 'youtube#channelListResponse', 'pageInfo': {'totalResults': len(items),
+                                                                    'resultsPerPage': len(items)},
+                'items': items}
+
+    def list_playlistItems(self, params):
+        playlist_id = params.get('playlistId', '')
+        uploads = playlist_uploads(playlist_id, self.server.seed)
+        per_page = min(int(params.get('maxResults', 5)), 50)
+        start = int(params.get('pageToken') or 0)
+        page = uploads[start:start + per_page]
+        channel_id = 'UC' + playlist_id[2:]
+        self.server.remember(page, channel_id)
+
+        items = [{
+            'kind': 'youtube#playlistItem',
+            'id': _make_id('', playlist_id, video_id),
+            'snippet': {'publishedAt': published_at, 'channelId': channel_id, 'playlistId': playlist_id,
+                        'position': start + position, 'resourceId': {'kind': 'youtube#video',
+                                                                     'videoId': video_id}},
+            'contentDetails': {'videoId': video_id, 'videoPublishedAt': published_at}
+        } for position, (video_id, published_at) in enumerate(page)]
+        response = {'kind': 'youtube#playlistItemListResponse',
+                    'pageInfo': {'totalResults': len(uploads), 'resultsPerPage': per_page},
+                    'items': items}
+        if start + per_page < len(uploads):
+            response['nextPageToken'] = str(start + per_page)
+        return response
+
+    def list_videos(self, params):
+        items = []
+        for video_id in params.get('id', '').split(','):
+            if not video_id:
+                continue
+            channel_id, published_at = self.server.lookup(video_id)
+            items.append(video_item(video_id, channel_id, published_at, self.server.seed))
+        return {'kind': 'youtube#videoListResponse', 'pageInfo': {'totalResults': len(items),
+                                                                  'resultsPerPage': len(items)},
+                'items': items}
+
+class MockYouTubeServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server with configurable latency, failures and quota.
+
+    Args:
+        address: (host, port); port 0 picks a free port
+        latency: Mean added latency per request, in seconds
+        jitter: Latency varies uniformly by +/- this many seconds
+        error_rate: Share of requests answered with a 500 backendError
+        quota: Requests served before every further one gets 403 quotaExceeded
+            (each list call costs 1 unit, as in the real API)
+        seed: Seed for payloads, latency and injected errors
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), latency=0.0, jitter=0.0, error_rate=0.0,
+                 quota=None, seed=0):
+        super().__init__(address, MockYouTubeHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.quota = quota
+        self.seed = seed
+        self.lock = threading.Lock()
+        # Injected latency and errors follow the arrival order of requests
+        self.rng = random.Random(seed)
+        self.quota_used = 0
+        self.requests = Counter()
+        self.errors = Counter()
+        self.videos = {}
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def admit(self, endpoint):
+        """Decide the delay and outcome ('ok', 'error' or 'quota') of one request"""
+        with self.lock:
+            self.requests[endpoint] += 1
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+            if self.quota is not None and self.quota_used >= self.quota:
+                outcome = 'quota'
+            elif self.rng.random() < self.error_rate:
+                outcome = 'error'
+            else:
+                outcome = 'ok'
+                self.quota_used += 1
+            if outcome != 'ok':
+                self.errors[outcome] += 1
+        return delay, outcome
+
+    def remember(self, uploads, channel_id):
+        with self.lock:
+            for video_id, published_at in uploads:
+                self.videos[video_id] = (channel_id, published_at)
+
+    def lookup(self, video_id):
+        """Channel and publish date of a video served earlier, or made up for unknown IDs"""
+        with self.lock:
+            known = self.videos.get(video_id)
+        if known:
+            return known
+        rng = _rng(self.seed, 'orphan', video_id)
+        return _make_id('UC', self.seed, video_id), \
+            (LATEST_UPLOAD - timedelta(hours=rng.randint(0, 8000))).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    def snapshot(self):
+        with self.lock:
+            return {'requests': dict(self.requests), 'errors': dict(self.errors), 'quota_used': self.quota_used}
+
+def start_server(port=0, **options):
+    """Start a MockYouTubeServer on a background thread and return it"""
+    server = MockYouTubeServer(('127.0.0.1', port), **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a local stand-in for the YouTube Data API')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.0, help='Mean added latency per request (ms)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Latency jitter (+/- ms)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests failing with a 500')
+    parser.add_argument('--quota', type=int, default=None, help='Requests served before quotaExceeded errors')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for payloads and injected failures')
+    args = parser.parse_args()
+
+    server = MockYouTubeServer(('127.0.0.1', args.port), latency=args.latency / 1000,
+                               jitter=args.jitter / 1000, error_rate=args.error_rate,
+                               quota=args.quota, seed=args.seed)
+    print(f"Mock YouTube Data API listening on {server.base_url}")
+    print(f"Point the fetch stages at it with: export YOUTUBE_API_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.snapshot()))
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from aiohttp import web
+
+# Local stand-in for the us.youtubers.me pages ranking.py scrapes: the top
+# channels listing (table.top-charts), each channel's stats page
+# (div.profile-image) and the /go/ link to the YouTube channel. Run the
+# scraper against it with
+#   YOUTUBERS_BASE_URL=http://127.0.0.1:8081 RANKING_REQUEST_DELAY=0 python ranking.py
+
+# Get the absolute path of the script's directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Repository root, holding one directory per category
+BASE_DIR = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+CATEGORIES = ['animals', 'blogs', 'comedy', 'entertainment', 'gaming']
+WORDS = ['daily', 'happy', 'paws', 'gamer', 'studio', 'life', 'family', 'tv', 'crew', 'kitty',
+         'pup', 'show', 'world', 'fun', 'pro', 'club', 'official', 'vlogs', 'plays', 'zone']
+
+def _format_count(value):
+    """Counts the way the site prints them: 1.2B, 35.4M, 812K or 9,731"""
+    for suffix, scale in (('B', 1e9), ('M', 1e6), ('K', 1e3)):
+        if value >= scale * 10 or (suffix != 'K' and value >= scale):
+            return f'{value / scale:.1f}{suffix}'
+    return f'{value:,}'
+
+def _fixture_name(path):
+    """File in the fixtures directory that replays a request path"""
+    return path.strip('/').replace('/', '__') + '.html'
+
+class FixtureSite:
+    """
+    Synthetic youtubers.me with injectable latency, 429s and timeouts.
+
+    Args:
+        channels: Rows in every listing page
+        latency: Mean added latency per request, in seconds
+        jitter: Latency varies uniformly by +/- this many seconds
+        rate_429: Share of requests answered with 429 Too Many Requests
+        timeout_rate: Share of requests that stall for `hang` seconds
+            (longer than the scraper's 30 second timeout by default)
+        hang: How long a stalled request waits before answering
+        fixtures_dir: Directory of recorded pages, served instead of the
+            synthetic ones when a file matches the path (see _fixture_name)
+        seed: Seed for the synthetic pages and injected failures
+    """
+
+    def __init__(self, channels=1000, latency=0.0, jitter=0.0, rate_429=0.0, timeout_rate=0.0,
+                 hang=35.0, fixtures_dir=None, seed=0):
+        self.channels = channels
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.timeout_rate = timeout_rate
+        self.hang = hang
+        self.fixtures_dir = fixtures_dir
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.latencies = []
+        self.statuses = Counter()
+
+    def make_app(self):
+        app = web.Application(middlewares=[self.inject])
+        app.router.add_get('/go/{slug}', self.go_page)
+        app.router.add_get('/{slug}/youtuber-stats/', self.channel_page)
+        app.router.add_get('/{country}/{category}/{listing}', self.listing_page)
+        return app
+
+    def channel(self, rank):
+        """Name, slug and counts of the channel at a listing rank"""
+        rng = random.Random(f'{self.seed}:{rank}')
+        name = ' '.join(rng.choice(WORDS) for _ in range(2)).title() + f' {rank}'
+        subscribers = int(2e8 / rank ** 0.8 * rng.uniform(0.8, 1.2))
+        return {
+            'rank': rank,
+            'name': name,
+            'slug': name.lower().replace(' ', '-'),
+            'subscribers': subscribers,
+            'views': int(subscribers * rng.uniform(50, 400)),
+            'videos': rng.randint(20, 20000),
+            'started': rng.randint(2006, 2023)
+        }
+
+    @web.middleware
+    async def inject(self, request, handler):
+        start = time.perf_counter()
+        roll = self.rng.random()
+        delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+        try:
+            if roll < self.timeout_rate:
+                await asyncio.sleep(self.hang)
+            elif delay:
+                await asyncio.sleep(delay)
+
+            if self.timeout_rate <= roll < self.timeout_rate + self.rate_429:
+                response = web.Response(status=429, text='Too Many Requests', headers={'Retry-After': '1'})
+            elif self.fixtures_dir and os.path.exists(os.path.join(self.fixtures_dir, _fixture_name(request.path))):
+                with open(os.path.join(self.fixtures_dir, _fixture_name(request.path)), 'r', encoding='utf-8') as f:
+                    response = web.Response(text=f.read(), content_type='text/html')
+            else:
+                response = await handler(request)
+        except asyncio.CancelledError:
+            # The client gave up waiting
+            self.statuses['timeout'] += 1
+            raise
+        self.statuses[response.status] += 1
+        self.latencies.append(time.perf_counter() - start)
+        return response
+
+    async def listing_page(self, request):
+        category = request.match_info['category']
+        rows = []
+        for rank in range(1, self.channels + 1):
+            channel = self.channel(rank)
+            rows.append(
+                f"<tr><td>{rank}</td>"
+                f"<td><a href=\"/{channel['slug']}/youtuber-stats/\">{channel['name']}</a></td>"
+                f"<td>{_format_count(channel['subscribers'])}</td>"
+                f"<td>{_format_count(channel['views'])}</td>"
+                f"<td>{channel['videos']:,}</td>"
+                f"<td>{category.replace('-', ' ').title()}</td>"
+                f"<td>{channel['started']}</td></tr>"
+            )
+        html = ("<html><body><table class=\"top-charts\">"
+                "<tr><th>#</th><th>Youtuber</th><th>Subscribers</th><th>Video views</th>"
+                "<th>Video count</th><th>Category</th><th>Started</th></tr>"
+                + ''.join(rows) + "</table></body></html>")
+        return web.Response(text=html, content_type='text/html')
+
+    async def channel_page(self, request):
+        slug = request.match_info['slug']
+        html = (f"<html><body><div class=\"profile-image\"><a href=\"/go/{slug}\">"
+                f"<img src=\"/img/{slug}.jpg\"></a></div><h1>{slug}</h1></body></html>")
+        return web.Response(text=html, content_type='text/html')
+
+    async def go_page(self, request):
+        slug = request.match_info['slug']
+        channel_id = 'UC' + ''.join(random.Random(f'{self.seed}:{slug}').choices(
+            'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_', k=22))
+        html = f"<html><body><a href=\"https://www.youtube.com/channel/{channel_id}\">YouTube</a></body></html>"
+        return web.Response(text=html, content_type='text/html')
+
+    def report(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(q):
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else None
+
+        return {
+            'pages': len(latencies),
+            'p50_ms': percentile(0.50),
+            'p99_ms': percentile(0.99),
+            'statuses': {str(status): count for status, count in self.statuses.items()}
+        }
+
+def load_ranking(category):
+    """Import a category's ranking.py; YOUTUBERS_BASE_URL must already be set"""
+    src_dir = os.path.join(BASE_DIR, category, 'src_py')
+    if src_dir not in sys.path:
+        sys.path.insert(0, src_dir)
+    spec = importlib.util.spec_from_file_location(f'ranking_{category}', os.path.join(src_dir, 'ranking.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+async def start_site(site, port=0):
+    runner = web.AppRunner(site.make_app())
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    host, port = runner.addresses[0][:2]
+    return runner, f'http://{host}:{port}'
+
+async def run_benchmark(category='animals', **options):
+    """
+    Scrape a fixture site with a category's ranking.py and time it.
+
+    Returns:
+        Dictionary with rows scraped, wall time, pages/sec and the server-side
+        p50/p99 page latency
+    """
+    site = FixtureSite(**options)
+    runner, base_url = await start_site(site)
+    os.environ['YOUTUBERS_BASE_URL'] = base_url
+    os.environ['RANKING_REQUEST_DELAY'] = '0'
+    try:
+        ranking = load_ranking(category)
+        start = time.perf_counter()
+        # The scraper prints a line per channel
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = await ranking.scrape_youtube_channels(f'{base_url}{ranking.LISTING_PATH}')
+        elapsed = time.perf_counter() - start
+    finally:
+        await runner.cleanup()
+
+    result = site.report()
+    result.update({
+        'category': category,
+        'rows': len(data),
+        'channel_ids': sum(1 for row in data if row[8]),
+        'seconds': elapsed,
+        'pages_per_sec': result['pages'] / elapsed if elapsed else None
+    })
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline youtubers.me fixture server and scraper benchmark')
+    parser.add_argument('mode', choices=['serve', 'bench'], help='Serve the fixture site, or benchmark ranking.py')
+    parser.add_argument('--category', choices=CATEGORIES, default='animals',
+                        help='Category whose ranking.py is benchmarked')
+    parser.add_argument('--port', type=int, default=8081, help='Port to listen on (serve mode)')
+    parser.add_argument('--channels', type=int, default=1000, help='Rows per listing page')
+    parser.add_argument('--latency', type=float, default=0.0, help='Mean added latency per request (ms)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Latency jitter (+/- ms)')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Share of requests answered with 429')
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='Share of requests that stall')
+    parser.add_argument('--hang', type=float, default=35.0, help='Seconds a stalled request waits')
+    parser.add_argument('--fixtures', default=None, help='Directory of recorded pages to replay')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for pages and injected failures')
+    args = parser.parse_args()
+
+    options = dict(channels=args.channels, latency=args.latency / 1000, jitter=args.jitter / 1000,
+                   rate_429=args.rate_429, timeout_rate=args.timeout_rate, hang=args.hang,
+                   fixtures_dir=args.fixtures, seed=args.seed)
+
+    if args.mode == 'bench':
+        result = asyncio.run(run_benchmark(args.category, **options))
+        print(json.dumps(result, indent=2))
+        return
+
+    site = FixtureSite(**options)
+    print(f"Fixture youtubers.me listening on http://127.0.0.1:{args.port}")
+    print(f"Point ranking.py at it with: export YOUTUBERS_BASE_URL=http://127.0.0.1:{args.port}")
+    web.run_app(site.make_app(), host='127.0.0.1', port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
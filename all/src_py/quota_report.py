@@ -0,0 +1,118 @@
+import argparse
+import glob
+import json
+import os
+import pandas as pd
+from accounting import LEDGER_DIR
+
+# Default daily quota of a YouTube Data API project
+DAILY_QUOTA = 10000
+GROUPINGS = ['date', 'category', 'stage', 'kind', 'endpoint']
+
+def load_ledger(ledger_dir=LEDGER_DIR, since=None, until=None):
+    """
+    Read the ledger records written by accounting.py.
+
+    Args:
+        ledger_dir: Directory holding ledger_<date>.jsonl files
+        since: First quota day to include (YYYY-MM-DD)
+        until: Last quota day to include (YYYY-MM-DD)
+
+    Returns:
+        DataFrame with one row per call
+    """
+    frames = []
+    for path in sorted(glob.glob(os.path.join(ledger_dir, 'ledger_*.jsonl'))):
+        date = os.path.basename(path)[len('ledger_'):-len('.jsonl')]
+        # Skip whole files outside the range without reading them
+        if (since and date < since) or (until and date > until):
+            continue
+        frames.append(pd.read_json(path, lines=True, convert_dates=False, dtype={'date': 'string'}))
+    if not frames:
+        return pd.DataFrame(columns=['date', 'category', 'stage', 'kind', 'endpoint', 'units',
+                                     'tokens_in', 'tokens_out', 'cost_usd'])
+    df = pd.concat(frames, ignore_index=True)
+    for column in ('tokens_in', 'tokens_out', 'cost_usd'):
+        if column not in df.columns:
+            df[column] = pd.NA
+    return df
+
+def rollup(df, by=('date', 'category', 'stage', 'endpoint')):
+    """
+    Sum calls, quota units, tokens and cost per group, largest spenders first.
+
+    API quota units and LLM tokens are both reported in 'units' but kept
+    apart by the 'kind' column, since they are different budgets.
+    """
+    by = ['kind'] + [column for column in by if column != 'kind']
+    grouped = df.groupby(by, dropna=False).agg(
+        calls=('units', 'size'),
+        units=('units', 'sum'),
+        tokens_in=('tokens_in', 'sum'),
+        tokens_out=('tokens_out', 'sum'),
+        cost_usd=('cost_usd', 'sum')
+    ).reset_index()
+    # Share of its kind's total, so the biggest wins stand out
+    grouped['share'] = grouped['units'] / grouped.groupby('kind')['units'].transform('sum')
+    return grouped.sort_values(['kind', 'units'], ascending=[True, False], ignore_index=True)
+
+def daily_quota_usage(df, daily_quota=DAILY_QUOTA):
+    """API quota units spent per quota day, against the project's daily quota"""
+    api = df[df['kind'] == 'api']
+    daily = api.groupby('date').agg(calls=('units', 'size'), units=('units', 'sum')).reset_index()
+    daily['quota_used'] = daily['units'] / daily_quota
+    return daily
+
+def print_report(df, by, daily_quota, top):
+    if df.empty:
+        print("No ledger records found")
+        return
+
+    print("Daily API quota usage")
+    print("=" * 60)
+    for row in daily_quota_usage(df, daily_quota).itertuples():
+        print(f"{row.date}  {row.units:>8,} units in {row.calls:>7,} calls  ({row.quota_used:.1%} of {daily_quota:,})")
+
+    table = rollup(df, by)
+    for kind, title in (('api', 'API quota units'), ('llm', 'LLM tokens')):
+        rows = table[table['kind'] == kind].head(top)
+        if rows.empty:
+            continue
+        labels = [' / '.join(str(getattr(row, column)) for column in by if column != 'kind')
+                  for row in rows.itertuples()]
+        width = max(len(label) for label in labels)
+        print(f"\nTop {len(rows)} by {title} ({', '.join(by)})")
+        print("=" * 60)
+        for label, row in zip(labels, rows.itertuples()):
+            line = f"{label:<{width}}  {row.units:>12,} {row.share:>7.1%}  {row.calls:>7,} calls"
+            if kind == 'llm' and pd.notna(row.cost_usd):
+                line += f"  ${row.cost_usd:,.4f}"
+            print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description='Roll up API quota and LLM cost per category and stage')
+    parser.add_argument('--ledger-dir', default=LEDGER_DIR, help='Directory of ledger_<date>.jsonl files')
+    parser.add_argument('--since', help='First quota day (YYYY-MM-DD)')
+    parser.add_argument('--until', help='Last quota day (YYYY-MM-DD)')
+    parser.add_argument('--by', nargs='+', choices=GROUPINGS, default=['date', 'category', 'stage', 'endpoint'],
+                        help='Columns to group by')
+    parser.add_argument('--daily-quota', type=int, default=DAILY_QUOTA, help='Daily quota of the API project')
+    parser.add_argument('--top', type=int, default=20, help='Rows shown per table')
+    parser.add_argument('--output', help='Also write the full rollup to this CSV (or .json) file')
+    args = parser.parse_args()
+
+    df = load_ledger(args.ledger_dir, args.since, args.until)
+    print_report(df, args.by, args.daily_quota, args.top)
+
+    if args.output and not df.empty:
+        table = rollup(df, args.by)
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        if args.output.endswith('.json'):
+            with open(args.output, 'w') as f:
+                json.dump(table.to_dict(orient='records'), f, indent=4, default=str)
+        else:
+            table.to_csv(args.output, index=False)
+        print(f"\nRollup saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import argparse
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+from videoframe import load_videos
+
+# Get the absolute path of the script's directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), 'data')
+# Combined video store written by joincsv.py (CSV, or a Parquet dataset with --format parquet)
+DEFAULT_STORE = os.path.join(DATA_DIR, 'data_csv', 'combined_videos_detail.csv')
+CACHE_DIR = os.path.join(DATA_DIR, 'sample_cache')
+
+STRATA = ('category', 'channel_id', 'month')
+# Bump when the cached index layout changes
+CACHE_VERSION = 1
+
+def _store_key(path):
+    """Cache key from the store's path, size and modification time"""
+    if os.path.isdir(path):
+        files = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    else:
+        files = [path]
+    digest = hashlib.sha1(str(CACHE_VERSION).encode('utf-8'))
+    for file in files:
+        stat = os.stat(file)
+        digest.update(f'{os.path.abspath(file)}:{stat.st_size}:{stat.st_mtime_ns}'.encode('utf-8'))
+    return digest.hexdigest()
+
+def read_store(path):
+    """Read only the columns the strata need from the combined video store"""
+    columns = ['video_id', 'channel_id', 'upload_date', 'category']
+    if os.path.isdir(path) or path.endswith('.parquet'):
+        videos_df = pd.read_parquet(path, columns=columns)
+    else:
+        videos_df = load_videos(path, columns=columns)
+    videos_df['month'] = videos_df['upload_date'].astype('string').str[:7]
+    return videos_df.drop(columns='upload_date')
+
+class StratifiedSampler:
+    """
+    Seeded stratified sampling over the combined video table.
+
+    Rows are grouped once into strata (by default category x channel x
+    upload month): `order` lists the row positions sorted by stratum and
+    stratum s owns order[offsets[s]:offsets[s + 1]]. A sample only draws
+    positions from these index arrays, so the table is never scanned again.
+    """
+
+    def __init__(self, video_ids, columns, codes, labels):
+        self.video_ids = video_ids
+        self.columns = columns
+        # Stratum label arrays, one per column of `columns`
+        self.labels = labels
+        sizes = np.bincount(codes, minlength=len(labels[0]) if labels else 1)
+        self.order = np.argsort(codes, kind='stable')
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)])
+
+    @property
+    def sizes(self):
+        return np.diff(self.offsets)
+
+    @classmethod
+    def from_frame(cls, videos_df, by=STRATA):
+        by = list(by)
+        keys = videos_df[by].astype(object).fillna('')
+        # Sorted factorization keeps stratum numbering stable between runs
+        codes, uniques = pd.MultiIndex.from_frame(keys).factorize(sort=True)
+        labels = [np.asarray(uniques.get_level_values(i), dtype=str) for i in range(len(by))]
+        video_ids = np.asarray(videos_df['video_id'].astype(object).fillna(''), dtype=str)
+        return cls(video_ids, by, codes, labels)
+
+    @classmethod
+    def from_store(cls, path=DEFAULT_STORE, by=STRATA, cache_dir=CACHE_DIR, use_cache=True):
+        """Build the strata index for a store, reusing the cached one if the store is unchanged"""
+        by = list(by)
+        cache_path = os.path.join(cache_dir, f"strata_{'-'.join(by)}_{_store_key(path)}.npz")
+        if use_cache and os.path.exists(cache_path):
+            with np.load(cache_path) as cached:
+                sampler = cls.__new__(cls)
+                sampler.video_ids = cached['video_ids']
+                sampler.columns = by
+                sampler.labels = [cached[f'label_{i}'] for i in range(len(by))]
+                sampler.order = cached['order']
+                sampler.offsets = cached['offsets']
+            return sampler
+
+        sampler = cls.from_frame(read_store(path), by)
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez(cache_path, video_ids=sampler.video_ids, order=sampler.order, offsets=sampler.offsets,
+                 **{f'label_{i}': labels for i, labels in enumerate(sampler.labels)})
+        print(f"Indexed {len(sampler.video_ids)} videos into {len(sampler.sizes)} strata, cached to {cache_path}")
+        return sampler
+
+    def allocate(self, n, available, rng):
+        """
+        Split n draws across strata in proportion to size (largest remainder).
+
+        Strata with equal remainders are common (every single-video stratum
+        has the same one), so they are ranked in an order shuffled by `rng`
+        rather than by stratum number, which would favour the strata that
+        sort first.
+        """
+        total = available.sum()
+        n = min(n, total)
+        if n == 0:
+            return np.zeros_like(available)
+        exact = available * (n / total)
+        quotas = np.floor(exact).astype(np.int64)
+        remainder = n - quotas.sum()
+        if remainder:
+            shuffled = rng.permutation(len(quotas))
+            ranked = shuffled[np.argsort(-(exact - quotas)[shuffled], kind='stable')]
+            quotas[ranked[:remainder]] += 1
+        return np.minimum(quotas, available)
+
+    def sample(self, n=None, seed=0, per_stratum=None, exclude=None):
+        """
+        Draw a sample without replacement.
+
+        Args:
+            n: Total sample size, split proportionally over the strata
+            seed: Random seed; the same seed over the same store gives the same sample
+            per_stratum: Draw this many from every stratum instead of using n
+            exclude: Video IDs that must not be drawn (e.g. already labelled)
+
+        Returns:
+            DataFrame with the row position, video_id and stratum columns of
+            every drawn video
+        """
+        rng = np.random.default_rng(seed)
+        order = self.order
+        offsets = self.offsets
+        if exclude is not None and len(exclude):
+            keep = ~np.isin(self.video_ids[order], np.asarray(list(exclude), dtype=str))
+            order = order[keep]
+            # Recount strata sizes over the kept positions
+            stratum_of = np.repeat(np.arange(len(self.sizes)), self.sizes)
+            kept_sizes = np.bincount(stratum_of[keep], minlength=len(self.sizes))
+            offsets = np.concatenate([[0], np.cumsum(kept_sizes)])
+        available = np.diff(offsets)
+
+        if per_stratum is not None:
+            quotas = np.minimum(available, per_stratum)
+        else:
+            quotas = self.allocate(n or 0, available, rng)
+
+        # Give every position of the strata being drawn from a random key and
+        # keep the `quota` smallest keys of each stratum, all in one sort
+        strata = np.flatnonzero(quotas)
+        sizes = available[strata]
+        segment = np.repeat(np.arange(len(strata)), sizes)
+        segment_starts = np.cumsum(sizes) - sizes
+        positions = offsets[strata][segment] + np.arange(len(segment)) - segment_starts[segment]
+        shuffled = np.lexsort((rng.random(len(segment)), segment))
+        rank = np.arange(len(segment)) - segment_starts[segment]
+        taken = shuffled[rank < quotas[strata][segment]]
+
+        rows = order[positions[taken]]
+        stratum_of = strata[segment[taken]]
+
+        result = pd.DataFrame({'index': rows, 'video_id': self.video_ids[rows]})
+        for column, labels in zip(self.columns, self.labels):
+            result[column] = labels[stratum_of]
+        return result
+
+def main():
+    parser = argparse.ArgumentParser(description='Draw a reproducible stratified sample of videos')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='Combined video store (CSV or Parquet dataset)')
+    parser.add_argument('--n', type=int, default=1000, help='Total sample size')
+    parser.add_argument('--per-stratum', type=int, default=None, help='Draw this many from every stratum instead')
+    parser.add_argument('--by', nargs='+', default=list(STRATA), choices=STRATA, help='Stratum columns')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--exclude', default=None, help='CSV with a video_id column of videos to skip')
+    parser.add_argument('--output', default=os.path.join(DATA_DIR, 'data_csv', 'samples', 'stratified_sample.csv'),
+                        help='Where to write the sample')
+    parser.add_argument('--no-cache', action='store_true', help='Rebuild the strata index')
+    args = parser.parse_args()
+
+    sampler = StratifiedSampler.from_store(args.store, by=args.by, use_cache=not args.no_cache)
+    exclude = pd.read_csv(args.exclude, usecols=['video_id'], dtype='string')['video_id'] if args.exclude else None
+    sample = sampler.sample(args.n, seed=args.seed, per_stratum=args.per_stratum, exclude=exclude)
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    sample.to_csv(args.output, index=False)
+    print(f"Sampled {len(sample)} videos from {len(sampler.sizes)} strata (seed {args.seed}), saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+import argparse
+import csv
+import io
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+import numpy as np
+
+# Get the absolute path of the script's directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ROOT = os.path.join(os.path.dirname(SCRIPT_DIR), 'data', 'synthetic')
+
+CATEGORIES = ['animals', 'blogs', 'comedy', 'entertainment', 'gaming']
+CHANNEL_COLUMNS = ['Rank', 'Youtuber', 'Subscribers', 'Video Views', 'Video Count',
+                   'Category', 'Started', 'Channel Link', 'Channel ID']
+# Columns jsontocsv.py writes to videos_detail.csv
+VIDEO_COLUMNS = ['video_id', 'title', 'description', 'title_description', 'label1', 'label2',
+                 'upload_date', 'channel_id', 'view_count', 'like_count', 'comment_count',
+                 'duration', 'privacy_status', 'topic_categories']
+# playlist.py writes 50 playlists to each batch file
+PLAYLISTS_PER_BATCH = 50
+
+# Mixed-script vocabulary: descriptions on the real channels mix English,
+# Korean, Japanese, Spanish, emoji, hashtags and links
+VOCABULARY = (
+    'the a and my our new best funny cute first time day life vlog challenge reaction prank '
+    'cat dog puppy kitten family friends trying tips shorts live stream game play epic moments '
+    '귀여운 강아지 고양이 일상 브이로그 먹방 오늘 우리 '
+    '猫 犬 かわいい 日常 動画 今日 '
+    'perro gato divertido nuevo mejor vida familia '
+    '😂 😍 🐶 🐱 🔥 ❤️ ✨ 👉 🎮 '
+    '#shorts #fyp #viral #cute #dogsofyoutube #catsofyoutube #gaming #vlog'
+).split()
+LINKS = ['https://instagram.com/{handle}', 'https://www.tiktok.com/@{handle}',
+         'https://twitter.com/{handle}', 'https://www.patreon.com/{handle}']
+TOPICS = ['https://en.wikipedia.org/wiki/Pet', 'https://en.wikipedia.org/wiki/Animal',
+          'https://en.wikipedia.org/wiki/Lifestyle_(sociology)', 'https://en.wikipedia.org/wiki/Entertainment',
+          'https://en.wikipedia.org/wiki/Video_game_culture', 'https://en.wikipedia.org/wiki/Humour',
+          'https://en.wikipedia.org/wiki/Music']
+ID_ALPHABET = np.frombuffer(b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_', dtype=np.uint8)
+
+# Newest upload; playlist.py keeps uploads after its cutoff (2024-05-01)
+LATEST_UPLOAD = datetime(2024, 10, 15, tzinfo=timezone.utc)
+# YouTube caps descriptions at 5000 characters
+MAX_DESCRIPTION_CHARS = 5000
+
+class SynthGenerator:
+    """
+    Seeded generator of channels and their uploads.
+
+    Counts are heavy-tailed the way the real data is: uploads per channel
+    follow a Pareto split of the total, views are lognormal with likes and
+    comments as a fraction of them, and description lengths are lognormal
+    up to YouTube's 5000 character limit. The same seed always gives the
+    same channels and videos.
+
+    Args:
+        seed: Random seed
+        collab_rate: Share of videos whose description mentions another
+            creator ("ft. @handle", "with @handle")
+        dirty_rate: Share of videos_detail.csv rows damaged the way
+            cleancsv.py sees in the wild (stray quotes, extra fields)
+    """
+
+    def __init__(self, seed=0, collab_rate=0.05, dirty_rate=0.0):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.collab_rate = collab_rate
+        self.dirty_rate = dirty_rate
+
+    def ids(self, prefix, count, length):
+        # Draw all characters at once and view each row as one byte string
+        chars = ID_ALPHABET[self.rng.integers(0, len(ID_ALPHABET), size=(count, length))]
+        return [prefix + raw.decode('ascii') for raw in chars.view(f'S{length}').ravel()]
+
+    def text(self, word_counts):
+        """One string per entry of word_counts, drawn from the vocabulary"""
+        indices = self.rng.integers(0, len(VOCABULARY), size=int(word_counts.sum())).tolist()
+        words = [VOCABULARY[i] for i in indices]
+        ends = np.cumsum(word_counts).tolist()
+        return [' '.join(words[end - count:end]) for count, end in zip(word_counts.tolist(), ends)]
+
+    def channels(self, count, videos, category):
+        """
+        Ranked channels with their share of `videos` uploads.
+
+        Returns:
+            List of channel dicts, largest subscriber count first
+        """
+        subscribers = np.sort(self.rng.lognormal(13, 1.6, count))[::-1].astype(np.int64) + 1000
+        # Pareto weights give a few channels most of the uploads
+        weights = self.rng.pareto(1.2, count) + 1e-3
+        uploads = self.rng.multinomial(videos, weights / weights.sum())
+        names = self.text(self.rng.integers(1, 4, count))
+        ids = self.ids('UC', count, 22)
+        started = self.rng.integers(2006, 2024, count)
+        return [{
+            'rank': rank + 1,
+            'id': ids[rank],
+            'name': f'{names[rank]} {rank + 1}',
+            'handle': f'channel{rank + 1}_{self.seed}',
+            'category': category,
+            'subscribers': int(subscribers[rank]),
+            'views': int(subscribers[rank] * self.rng.uniform(30, 500)),
+            'uploads': int(uploads[rank]),
+            'video_count': int(uploads[rank] + self.rng.integers(0, 500)),
+            'started': int(started[rank])
+        } for rank in range(count)]
+
+    def channel_resource(self, channel):
+        """The channels().list item channel.py saves"""
+        return {
+            'kind': 'youtube#channel',
+            'id': channel['id'],
+            'snippet': {'title': channel['name'], 'description': self.text(np.array([30]))[0],
+                        'customUrl': f"@{channel['handle']}",
+                        'publishedAt': f"{channel['started']}-01-01T00:00:00Z"},
+            'contentDetails': {'relatedPlaylists': {'likes': '', 'uploads': 'UU' + channel['id'][2:]}},
+            'statistics': {'viewCount': str(channel['views']), 'subscriberCount': str(channel['subscribers']),
+                           'hiddenSubscriberCount': False, 'videoCount': str(channel['video_count'])},
+            'topicDetails': {'topicCategories': [TOPICS[channel['rank'] % len(TOPICS)]]},
+            'status': {'privacyStatus': 'public', 'isLinked': True}
+        }
+
+    def videos(self, channel, handles):
+        """The videos().list items of one channel's uploads, newest first"""
+        count = channel['uploads']
+        if count == 0:
+            return []
+        ids = self.ids('', count, 11)
+        # Uploads spread back over the 5.5 months since the playlist.py cutoff
+        ages = np.sort(self.rng.uniform(0, 165 * 24 * 3600, count)).astype(np.int64)
+        views = self.rng.lognormal(9, 2.5, count).astype(np.int64)
+        likes = (views * self.rng.beta(2, 60, count)).astype(np.int64)
+        comments = (views * self.rng.beta(1, 800, count)).astype(np.int64)
+        durations = self.rng.lognormal(5.5, 1.2, count).astype(np.int64) + 5
+        titles = self.text(self.rng.integers(3, 14, count))
+        description_words = np.minimum(self.rng.lognormal(3.5, 1.1, count).astype(np.int64), 900)
+        descriptions = self.text(description_words)
+        collabs = self.rng.random(count) < self.collab_rate
+        partners = self.rng.integers(0, len(handles), count) if handles else None
+        links = self.rng.integers(0, len(LINKS), count)
+        topics = self.rng.integers(0, len(TOPICS), count)
+
+        items = []
+        for i in range(count):
+            description = descriptions[i]
+            if collabs[i] and handles:
+                description = f"ft. @{handles[partners[i]]} {description}"
+            description = (f"{description}\n\n{LINKS[links[i]].format(handle=channel['handle'])}"
+                           f"\n{titles[i]}")[:MAX_DESCRIPTION_CHARS]
+            minutes, seconds = divmod(int(durations[i]), 60)
+            hours, minutes = divmod(minutes, 60)
+            items.append({
+                'kind': 'youtube#video',
+                'id': ids[i],
+                'snippet': {
+                    'publishedAt': (LATEST_UPLOAD - timedelta(seconds=int(ages[i]))).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    'channelId': channel['id'],
+                    'title': titles[i],
+                    'description': description,
+                    'categoryId': '15'
+                },
+                'contentDetails': {'duration': f"PT{f'{hours}H' if hours else ''}{minutes}M{seconds}S"},
+                'status': {'uploadStatus': 'processed', 'privacyStatus': 'public'},
+                'statistics': {'viewCount': str(views[i]), 'likeCount': str(likes[i]),
+                               'favoriteCount': '0', 'commentCount': str(comments[i])},
+                'topicDetails': {'topicCategories': [TOPICS[topics[i]]]}
+            })
+        return items
+
+def video_row(video, channel_id):
+    """A videos_detail.csv row, as jsontocsv.py builds it"""
+    snippet = video['snippet']
+    statistics = video['statistics']
+    return [
+        video['id'], snippet['title'], snippet['description'],
+        f"{snippet['title']} {snippet['description']}", '', '',
+        snippet['publishedAt'][:10], channel_id,
+        statistics['viewCount'], statistics['likeCount'], statistics['commentCount'],
+        video['contentDetails']['duration'], video['status']['privacyStatus'],
+        ','.join(video['topicDetails']['topicCategories'])
+    ]
+
+def format_row(row):
+    """One row as csv.writer writes it"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(row)
+    return buffer.getvalue()
+
+def damage(row, rng):
+    """
+    Break a row like the malformed records cleancsv.py quarantines.
+
+    Returns the raw line to write to the file: passing the damage through
+    csv.writer would quote it and leave a well-formed row.
+    """
+    row = list(row)
+    # The title is written raw, so it must not bring quotes or commas of its own
+    title = row[1].replace('"', '').replace(',', ' ')
+    if rng.random() < 0.5:
+        # An opening quote that is never closed
+        title = f'"unbalanced {title}'
+    else:
+        # An unquoted comma, giving the row a field too many
+        title = f'{title},stray field'
+    # Format the rest of the row normally around a placeholder the writer won't quote
+    row[1] = '\0'
+    return format_row(row).replace('\0', title, 1)
+
+def generate_category(root, category, videos, channels=None, seed=0, batch_date=None, snapshot='2024-10-15',
+                      layouts=('json', 'csv'), collab_rate=0.05, dirty_rate=0.0):
+    """
+    Write one category's synthetic data in the pipeline's file layout.
+
+    Under root/<category>/ this writes data_csv/channels_<snapshot>.csv,
+    channel_id.csv, playlist_id.csv and data_json/channels_<snapshot>.json;
+    with the json layout, data_json/batch_<batch_date>/playlists_batch_N.json
+    and videos_batch_N.json as playlist.py does, and with the csv layout,
+    data_csv/videos_detail.csv as jsontocsv.py does. Videos are generated
+    one channel at a time and written batch by batch, so memory stays flat
+    however many are asked for.
+
+    Args:
+        root: Tree root (one directory per category, like the repository)
+        category: Category name
+        videos: Total number of videos
+        channels: Number of channels (defaults to one per 100 videos)
+        seed: Random seed
+        batch_date: Date in the batch directory name (defaults to today, which combine.py reads)
+        snapshot: Date in the channel snapshot file names
+        layouts: 'json' for playlist.py batches, 'csv' for videos_detail.csv
+        collab_rate: Share of videos mentioning another channel
+        dirty_rate: Share of malformed videos_detail.csv rows
+
+    Returns:
+        Dictionary with the number of channels, videos and bytes written
+    """
+    channels = channels or max(10, videos // 100)
+    batch_date = batch_date or datetime.now().strftime('%Y-%m-%d')
+    generator = SynthGenerator(seed, collab_rate, dirty_rate)
+    category_dir = os.path.join(root, category)
+    csv_dir = os.path.join(category_dir, 'data_csv')
+    json_dir = os.path.join(category_dir, 'data_json')
+    batch_dir = os.path.join(json_dir, f'batch_{batch_date}')
+    os.makedirs(csv_dir, exist_ok=True)
+    os.makedirs(batch_dir if 'json' in layouts else json_dir, exist_ok=True)
+
+    ranked = generator.channels(channels, videos, category)
+    handles = [channel['handle'] for channel in ranked]
+    written = []
+
+    snapshot_path = os.path.join(csv_dir, f'channels_{snapshot}.csv')
+    with open(snapshot_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(CHANNEL_COLUMNS)
+        writer.writerows([c['rank'], c['name'], c['subscribers'], c['views'], c['video_count'], category,
+                          c['started'], f"https://www.youtube.com/channel/{c['id']}", c['id']] for c in ranked)
+    written.append(snapshot_path)
+    for name, column in (('channel_id.csv', 'id'), ('playlist_id.csv', None)):
+        path = os.path.join(csv_dir, name)
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerows([c['id'] if column else 'UU' + c['id'][2:]] for c in ranked)
+        written.append(path)
+    channels_json = os.path.join(json_dir, f'channels_{snapshot}.json')
+    with open(channels_json, 'w') as f:
+        f.write(json.dumps({str(i): generator.channel_resource(c) for i, c in enumerate(ranked)}))
+    written.append(channels_json)
+
+    detail_file = None
+    detail_writer = None
+    if 'csv' in layouts:
+        detail_path = os.path.join(csv_dir, 'videos_detail.csv')
+        detail_file = open(detail_path, 'w', newline='', encoding='utf-8')
+        detail_writer = csv.writer(detail_file)
+        detail_writer.writerow(VIDEO_COLUMNS)
+        written.append(detail_path)
+
+    total = 0
+    try:
+        for batch_number, start in enumerate(range(0, len(ranked), PLAYLISTS_PER_BATCH)):
+            playlists = {}
+            batch_videos = {}
+            for channel in ranked[start:start + PLAYLISTS_PER_BATCH]:
+                items = generator.videos(channel, handles)
+                if not items:
+                    continue
+                playlist_id = 'UU' + channel['id'][2:]
+                playlists[playlist_id] = [item['id'] for item in items]
+                batch_videos[playlist_id] = items
+                total += len(items)
+                if detail_writer:
+                    for item in items:
+                        row = video_row(item, playlist_id)
+                        if dirty_rate and generator.rng.random() < dirty_rate:
+                            detail_file.write(damage(row, generator.rng))
+                        else:
+                            detail_writer.writerow(row)
+
+            if 'json' in layouts and playlists:
+                for prefix, payload in (('playlists', playlists), ('videos', batch_videos)):
+                    path = os.path.join(batch_dir, f'{prefix}_batch_{batch_number}.json')
+                    # Same structure as playlist.py's files, without the indentation,
+                    # which would make the C encoder fall back to pure Python
+                    with open(path, 'w') as f:
+                        f.write(json.dumps(payload))
+                    written.append(path)
+    finally:
+        if detail_file:
+            detail_file.close()
+
+    return {
+        'category': category,
+        'channels': len(ranked),
+        'videos': total,
+        'bytes': sum(os.path.getsize(path) for path in written)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic pipeline data at any scale')
+    parser.add_argument('--root', default=DEFAULT_ROOT, help='Tree to write the category directories into')
+    parser.add_argument('--categories', nargs='+', choices=CATEGORIES, default=['animals'],
+                        help='Categories to generate')
+    parser.add_argument('--videos', type=int, default=100000, help='Videos per category')
+    parser.add_argument('--channels', type=int, default=None, help='Channels per category (default videos/100)')
+    parser.add_argument('--layouts', nargs='+', choices=['json', 'csv'], default=['json', 'csv'],
+                        help='playlist.py batch files, videos_detail.csv, or both')
+    parser.add_argument('--batch-date', default=None, help='Batch directory date (default today)')
+    parser.add_argument('--collab-rate', type=float, default=0.05, help='Share of videos mentioning another channel')
+    parser.add_argument('--dirty-rate', type=float, default=0.0, help='Share of malformed videos_detail.csv rows')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    args = parser.parse_args()
+
+    for offset, category in enumerate(args.categories):
+        start = time.perf_counter()
+        summary = generate_category(args.root, category, args.videos, args.channels, args.seed + offset,
+                                    args.batch_date, layouts=args.layouts, collab_rate=args.collab_rate,
+                                    dirty_rate=args.dirty_rate)
+        elapsed = time.perf_counter() - start
+        print(f"{category}: {summary['channels']} channels, {summary['videos']} videos, "
+              f"{summary['bytes'] / 1024 ** 2:.1f} MB in {elapsed:.1f}s "
+              f"({summary['videos'] / elapsed:.0f} videos/s)")
+    print(f"Synthetic data written under {args.root}")
+
+if __name__ == "__main__":
+    main()
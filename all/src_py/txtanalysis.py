@@ -1,54 +1,198 @@
+import argparse
+import ast
 import csv
+import glob
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
 
-# Placeholder API Key
-def get_video_url(video_id):
-    """Constructs a YouTube video URL given the video ID."""
-    return f"https://www.youtube.com/watch?v={video_id}"
+# Get the absolute path of the script's directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+TXT_DIR = os.path.join(SCRIPT_DIR, 'txt')
+OUTPUT_DIR = os.path.join(SCRIPT_DIR, 'Collaboration Spreadsheet')
+
+# Patterns are compiled once and matched against single lines of the log
+ENTRY_START = re.compile(r"^Selected index (\d+)")
+# Titles run to the last quote on the line, so apostrophes inside them survive
+ROW_DATA = re.compile(r"video_id='(.*?)', title='(.*)'\s*$")
+COLLABORATOR = re.compile(r"^Channel: (.*?), Collaborator: (.*), Collaborator ID: (.*?), video id: (\S+)\s*$")
+# Older log lines without the collaborator ID
+COLLABORATOR_NAME_ONLY = re.compile(r"^Channel: (.*?), Collaborator: ([^,\n]+)")
+TOO_MANY = re.compile(r"^Too many collaborators in video .*?: (\[.*\])\s*$")
 
-# Read and parse the input file
-input_file = 'gaming.txt'
-output_file = 'gaming.csv'
-
-data = []
-with open(input_file, 'r', encoding='utf-8') as file:
-    content = file.read()
-    entries = content.split("\nSelected index")  # Split into separate video entries
-    
-    for entry in entries:
-        match = re.search(r"video_id='(.*?)', title='(.*?)'", entry)
-        if match:
-            video_id = match.group(1)
-            video_title = match.group(2)
-            
-            # Extract collaborators from both standard format and 'Too many collaborators' format
-            collaborators_match = re.findall(r"Collaborator: ([^,\n]+)", entry)
-            too_many_collaborators_match = re.search(r"Too many collaborators in video .*?: \[(.*?)\]", entry)
-            
-            if too_many_collaborators_match:
-                collaborators_match.extend(too_many_collaborators_match.group(1).replace("'", "").split(", "))
-            
-            num_collaborators = len(collaborators_match)
-            
-            # Capture only the first 5 collaborators, but count all
-            displayed_collaborators = collaborators_match[:5] + [''] * (5 - min(5, num_collaborators))
-            
-            data.append([
-                video_id, video_title, num_collaborators,
-                *displayed_collaborators,  # Fill collaborators
-                get_video_url(video_id)  # Correct placement of link
-            ])
-
-# Write to CSV file
-headers = [
+HEADERS = [
     "video_id", "video_title", "num_collaborators",
     "collaborator_1", "collaborator_2", "collaborator_3",
     "collaborator_4", "collaborator_5", "link"
 ]
+# Long-format edge table: one row per (video, collaborator), no cap on how many
+EDGE_HEADERS = ["category", "video_id", "host_channel_id", "collaborator", "collaborator_id"]
+EDGE_DTYPES = {
+    "category": "category",
+    "video_id": "string",
+    "host_channel_id": "category",
+    "collaborator": "string",
+    "collaborator_id": "category"
+}
+
+def get_video_url(video_id):
+    """Constructs a YouTube video URL given the video ID."""
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+class Entry:
+    """Everything logged for one sampled video"""
+
+    def __init__(self):
+        self.video_id = None
+        self.title = None
+        self.collaborators = []
+        self.overflow_collaborators = []
+        self.edges = []
+
+    def to_row(self):
+        collaborators = self.collaborators + self.overflow_collaborators
+        num_collaborators = len(collaborators)
+        # The spreadsheet shows the first 5 collaborators but counts all;
+        # the edge table keeps every one of them
+        displayed_collaborators = collaborators[:5] + [''] * (5 - min(5, num_collaborators))
+        return [
+            self.video_id, self.title, num_collaborators,
+            *displayed_collaborators,
+            get_video_url(self.video_id)
+        ]
+
+def parse_name_list(text):
+    """Parse a logged Python list of names, keeping apostrophes and commas inside names"""
+    try:
+        names = ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return [name.strip(" '\"") for name in text.strip('[]').split(", ")]
+    return [str(name) for name in names]
+
+def parse_log(path):
+    """
+    Parse one collaboration log line by line.
+
+    Each "Selected index" line starts a new entry; the lines that follow fill
+    it in until the next one. Only the current entry is kept in memory.
+
+    Args:
+        path: Path to a category .txt log
+
+    Returns:
+        Tuple of (category, spreadsheet rows, edge rows)
+    """
+    category = os.path.splitext(os.path.basename(path))[0]
+    rows = []
+    edges = []
+    entry = None
+
+    def flush(entry):
+        if entry is not None and entry.video_id is not None:
+            rows.append(entry.to_row())
+            edges.extend([category, entry.video_id, *edge] for edge in entry.edges)
+            # Overflow collaborators are only logged by name, without a host channel
+            edges.extend([category, entry.video_id, None, collaborator, None]
+                         for collaborator in entry.overflow_collaborators)
+
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            if ENTRY_START.match(line):
+                flush(entry)
+                entry = Entry()
+                continue
+            if entry is None:
+                continue
+
+            if entry.video_id is None:
+                match = ROW_DATA.search(line)
+                if match:
+                    entry.video_id, entry.title = match.groups()
+                continue
+
+            match = COLLABORATOR.match(line)
+            if match:
+                channel_id, collaborator, collaborator_id, _ = match.groups()
+                entry.collaborators.append(collaborator)
+                entry.edges.append((channel_id, collaborator, collaborator_id))
+                continue
+
+            match = COLLABORATOR_NAME_ONLY.match(line)
+            if match:
+                channel_id, collaborator = match.groups()
+                entry.collaborators.append(collaborator)
+                entry.edges.append((channel_id, collaborator, None))
+                continue
+
+            match = TOO_MANY.match(line)
+            if match:
+                entry.overflow_collaborators.extend(parse_name_list(match.group(1)))
+
+    flush(entry)
+    return category, rows, edges
+
+def write_csv(path, headers, rows):
+    with open(path, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(headers)
+        writer.writerows(rows)
+
+def write_edges(path, edges):
+    """
+    Write the edge table as Parquet, falling back to CSV without pyarrow.
+
+    Returns:
+        The path actually written
+    """
+    edges_df = pd.DataFrame(edges, columns=EDGE_HEADERS).astype(EDGE_DTYPES)
+    try:
+        edges_df.to_parquet(path, index=False)
+    except ImportError:
+        path = f"{os.path.splitext(path)[0]}.csv"
+        print(f"Warning: pyarrow is not installed, writing the edge table as CSV")
+        edges_df.to_csv(path, index=False)
+    return path
+
+def load_edges(path=None):
+    """
+    Load the edge table written by this script, without re-parsing the logs.
+
+    Overflow collaborators ("Too many collaborators" lines) are logged by name
+    only, so their rows have no host_channel_id or collaborator_id. They are
+    most of the table: 92 of the 147 edges in the shipped logs. Filter on
+    host_channel_id.notna() where a host is needed, as CollabGraph does.
+    """
+    path = path or os.path.join(OUTPUT_DIR, 'collaboration_edges.parquet')
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, dtype=EDGE_DTYPES)
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract collaborators from the collaboration logs')
+    parser.add_argument('files', nargs='*', help='Log files to parse (defaults to every txt/*.txt)')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='Directory for the CSV outputs')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes')
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(TXT_DIR, '*.txt')))
+    if not files:
+        print(f"No collaboration logs found in {TXT_DIR}")
+        return
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    all_edges = []
+
+    # Each log is parsed in its own process
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for category, rows, edges in executor.map(parse_log, files):
+            output_file = os.path.join(args.output_dir, f'{category}.csv')
+            write_csv(output_file, HEADERS, rows)
+            all_edges.extend(edges)
+            print(f"CSV file saved to {output_file} ({len(rows)} videos, {len(edges)} edges)")
 
-with open(output_file, mode='w', newline='', encoding='utf-8') as file:
-    writer = csv.writer(file)
-    writer.writerow(headers)
-    writer.writerows(data)
+    edges_file = write_edges(os.path.join(args.output_dir, 'collaboration_edges.parquet'), all_edges)
+    print(f"Edge table with {len(all_edges)} edges saved to {edges_file}")
 
-print(f"CSV file saved to {output_file}")
+if __name__ == "__main__":
+    main()
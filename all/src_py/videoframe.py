@@ -0,0 +1,98 @@
+import pandas as pd
+
+# Shared schema of the combined video table: the videos_detail.csv columns
+# written by jsontocsv.py plus the source category
+VIDEO_SCHEMA = {
+    'video_id': 'string',
+    'title': 'string',
+    'description': 'string',
+    'title_description': 'string',
+    'label1': 'string',
+    'label2': 'string',
+    'upload_date': 'string',
+    'channel_id': 'string',
+    'view_count': 'Int64',
+    'like_count': 'Int64',
+    'comment_count': 'Int64',
+    'duration': 'string',
+    'privacy_status': 'string',
+    'topic_categories': 'string',
+    'category': 'string'
+}
+
+# Low-cardinality columns stored as categoricals: a few thousand channels,
+# five categories, three privacy states and a few hundred topic combinations
+# repeated over millions of videos
+CATEGORICAL_COLUMNS = ['channel_id', 'category', 'privacy_status', 'topic_categories']
+
+def has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def memory_mb(df):
+    """Deep memory usage of a DataFrame in MB"""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+def compact_frame(df, categorical_columns=CATEGORICAL_COLUMNS, arrow_strings=False):
+    """
+    Shrink a video DataFrame by replacing its default dtypes.
+
+    Low-cardinality columns become categoricals, integer columns are
+    downcast to the smallest type that holds their values (keeping nullable
+    types nullable), floats become float32 and, with arrow_strings, the
+    remaining text columns are stored as Arrow-backed strings.
+
+    Args:
+        df: DataFrame to compact
+        categorical_columns: Columns converted to categoricals when present
+        arrow_strings: Use string[pyarrow] for other text columns (needs pyarrow)
+
+    Returns:
+        The compacted DataFrame
+    """
+    if arrow_strings and not has_pyarrow():
+        print("Warning: pyarrow is not installed, keeping default string columns")
+        arrow_strings = False
+
+    for col in df.columns:
+        series = df[col]
+        if col in categorical_columns:
+            df[col] = series.astype('category')
+        elif pd.api.types.is_integer_dtype(series):
+            minimum = series.min()
+            has_negatives = pd.notna(minimum) and minimum < 0
+            df[col] = pd.to_numeric(series, downcast='integer' if has_negatives else 'unsigned')
+        elif pd.api.types.is_float_dtype(series):
+            df[col] = pd.to_numeric(series, downcast='float')
+        elif arrow_strings and (pd.api.types.is_string_dtype(series) or series.dtype == object):
+            df[col] = series.astype('string[pyarrow]')
+    return df
+
+def load_videos(path, columns=None, arrow_strings=False, report=True, **kwargs):
+    """
+    Load a video detail CSV with the shared schema and compact dtypes.
+
+    Args:
+        path: videos_detail CSV (per category, combined or normalized)
+        columns: Columns to load (all columns if None); missing ones are skipped
+        arrow_strings: Use Arrow-backed strings for the text columns
+        report: Print memory usage before and after compaction
+        **kwargs: Passed through to pd.read_csv
+
+    Returns:
+        The loaded DataFrame
+    """
+    dtype = {col: dtype for col, dtype in VIDEO_SCHEMA.items() if columns is None or col in columns}
+    # Requested columns missing from the file are skipped rather than an error
+    usecols = None if columns is None else (lambda col: col in columns)
+    df = pd.read_csv(path, usecols=usecols, dtype=dtype, **kwargs)
+
+    before = memory_mb(df) if report else None
+    df = compact_frame(df, arrow_strings=arrow_strings)
+    if report:
+        print(f"Loaded {len(df)} rows from {path}: {before:.1f} MB -> {memory_mb(df):.1f} MB "
+              f"after compacting dtypes")
+    return df
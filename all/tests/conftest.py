@@ -0,0 +1,15 @@
+import os
+import sys
+
+# Keep test runs out of the repository's metrics and accounting logs
+os.environ.setdefault('METRICS_DISABLED', '1')
+os.environ.setdefault('ACCOUNTING_DISABLED', '1')
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The scripts in all/src_py import each other as top-level modules
+sys.path.insert(0, os.path.join(REPO_DIR, 'all', 'src_py'))
+# Modules that only exist in the category directories (histogram, channel_schema)
+# are the same in every category, so they are tested from animals. Appended so
+# that all/src_py wins for the modules both have
+sys.path.append(os.path.join(REPO_DIR, 'animals', 'src_py'))
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+from channel_schema import parse_count, parse_counts
+
+CASES = [
+    ('1,234', 1234),
+    ('12.5M', 12_500_000),
+    ('3B', 3_000_000_000),
+    ('2.5k', 2500),
+    ('1.2K', 1200),
+    (' 7 ', 7),
+    ('12,345.6K', 12_345_600),
+    ('0', 0),
+    ('', None),
+    ('abc', None),
+    ('nan', None),
+    ('1.2.3', None),
+    ('-5', None),
+    ('5X', None)
+]
+
+@pytest.mark.parametrize('text, expected', CASES)
+def test_parse_count(text, expected):
+    assert parse_count(text) == expected
+
+def test_parse_count_of_missing_value():
+    assert parse_count(None) is None
+
+def test_vectorized_parse_matches_scalar():
+    texts = [text for text, _ in CASES]
+    parsed = parse_counts(pd.Series(texts + [None, np.nan]))
+    assert parsed.dtype == 'Int64'
+    assert [None if pd.isna(value) else int(value) for value in parsed] == \
+        [parse_count(text) for text in texts] + [None, None]
@@ -0,0 +1,138 @@
+import csv
+import io
+import pytest
+import pandas as pd
+from cleancsv import QuarantiningReader, normalize_csv, verify_output
+
+HEADER = 'video_id,title,description,view_count\n'
+
+def write_csv(path, text):
+    path.write_text(text, encoding='utf-8', newline='')
+    return str(path)
+
+def read_quarantine(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+def test_multiline_record_with_extra_field_is_quarantined_whole(tmp_path):
+    source = write_csv(tmp_path / 'videos.csv', HEADER +
+                       'v1,first,"one line",10\n'
+                       'v2,second,stray,"line one\nline two\nline three",20\n'
+                       'v3,third,"two\nlines",30\n')
+    quarantine = tmp_path / 'quarantine.csv'
+    reader = QuarantiningReader(source, quarantine)
+    passed = reader.read().decode('utf-8')
+    reader.close()
+
+    assert dict(reader.reasons) == {'field_count': 1}
+    assert 'v1,' in passed and 'v3,' in passed and 'line two' not in passed
+    [entry] = read_quarantine(quarantine)
+    assert entry['line_number'] == '3'
+    assert entry['actual_fields'] == '5'
+    assert entry['record'].startswith('v2,') and entry['record'].endswith('line three",20\n')
+
+def test_unterminated_quote_only_drops_its_own_line(tmp_path):
+    source = write_csv(tmp_path / 'videos.csv', HEADER +
+                       'v1,"broken title,desc,10\n'
+                       'v2,second,desc,20\n'
+                       'v3,third,desc,30\n')
+    quarantine = tmp_path / 'quarantine.csv'
+    reader = QuarantiningReader(source, quarantine)
+    passed = reader.read().decode('utf-8')
+    reader.close()
+
+    assert dict(reader.reasons) == {'unterminated_quote': 1}
+    assert passed == HEADER + 'v2,second,desc,20\nv3,third,desc,30\n'
+
+def test_stray_quote_fragments_stay_with_their_record(tmp_path):
+    # The stray quote pairs with the description's opening quote, leaving
+    # the rest of the description behind with an odd number of quotes
+    source = write_csv(tmp_path / 'videos.csv', HEADER +
+                       'v1,"unbalanced title,"first line\n'
+                       '\n'
+                       'second line",10\n'
+                       'v2,second,"two\nlines",20\n'
+                       'v3,third,plain,30\n')
+    quarantine = tmp_path / 'quarantine.csv'
+    reader = QuarantiningReader(source, quarantine)
+    passed = reader.read().decode('utf-8')
+    reader.close()
+
+    assert passed == HEADER + 'v2,second,"two\nlines",20\nv3,third,plain,30\n'
+    assert reader.quarantined == 1
+    [entry] = read_quarantine(quarantine)
+    assert entry['line_number'] == '2'
+    assert entry['record'] == 'v1,"unbalanced title,"first line\n\nsecond line",10\n'
+
+def test_normalize_and_verify(tmp_path):
+    source = write_csv(tmp_path / 'videos.csv', HEADER +
+                       'v1,first,"multi\nline",10\n'
+                       'v2,second,extra,field,20\n'
+                       'v3,third,plain,30\n')
+    output = str(tmp_path / 'out' / 'normalized.csv')
+    summary = normalize_csv(source, output, 'animals')
+
+    assert summary['quarantined'] == 1
+    assert summary['rows_read'] == summary['rows_written'] == 2
+    assert list(pd.read_csv(output)['video_id']) == ['v1', 'v3']
+    assert verify_output(output, summary)
+
+    # A file changed after writing no longer matches the recorded checksum
+    with open(output, 'a', encoding='utf-8') as f:
+        f.write('v4' + ',' * (len(summary['final_columns']) - 1) + '\n')
+    assert not verify_output(output, summary)
+
+def test_adjacent_bad_records_are_counted_separately(tmp_path):
+    source = write_csv(tmp_path / 'videos.csv', HEADER +
+                       'v1,first,extra,field,10\n'
+                       'v2,second,extra,field,20\n'
+                       'v3,"broken title,desc,30\n'
+                       'v4,fourth,extra,field,40\n'
+                       'v5,fifth,plain,50\n')
+    quarantine = tmp_path / 'quarantine.csv'
+    reader = QuarantiningReader(source, quarantine)
+    passed = reader.read().decode('utf-8')
+    reader.close()
+
+    assert passed == HEADER + 'v5,fifth,plain,50\n'
+    assert dict(reader.reasons) == {'field_count': 3, 'unterminated_quote': 1}
+    assert [entry['line_number'] for entry in read_quarantine(quarantine)] == ['2', '3', '4', '5']
+
+def test_quote_inside_a_field_is_checked_like_the_parser_reads_it(tmp_path):
+    # The quote does not open the field, so the comma after it separates fields
+    source = write_csv(tmp_path / 'videos.csv', HEADER +
+                       'v1,say "hi, there",desc,10\n'
+                       'v2,second,"desc, quoted",20\n')
+    quarantine = tmp_path / 'quarantine.csv'
+    reader = QuarantiningReader(source, quarantine)
+    passed = reader.read().decode('utf-8')
+    reader.close()
+
+    assert passed == HEADER + 'v2,second,"desc, quoted",20\n'
+    [entry] = read_quarantine(quarantine)
+    assert entry['actual_fields'] == '5'
+
+@pytest.mark.parametrize('block_bytes', [1, 40, 200])
+def test_block_size_does_not_change_the_result(tmp_path, block_bytes):
+    source = write_csv(tmp_path / 'videos.csv', HEADER +
+                       'v1,first,"multi\nline",10\n'
+                       'v2,second,extra,field,20\n'
+                       'v3,third,plain,30\n'
+                       '\n'
+                       'v4,"unbalanced title,"first line\n'
+                       'second line",40\n'
+                       'v5,fifth,"two\nlines",50\n'
+                       'v6,"broken title,desc,60\n'
+                       'v7,seventh,plain,70')
+
+    def run(quarantine, **options):
+        reader = QuarantiningReader(source, quarantine, **options)
+        passed = reader.read().decode('utf-8')
+        reader.close()
+        return passed, read_quarantine(quarantine)
+
+    passed, entries = run(tmp_path / 'whole.csv')
+    assert run(tmp_path / 'blocks.csv', block_bytes=block_bytes) == (passed, entries)
+    assert pd.read_csv(io.StringIO(passed))['video_id'].tolist() == ['v1', 'v3', 'v5', 'v7']
+    assert [(entry['line_number'], entry['reason']) for entry in entries] == [
+        ('4', 'field_count'), ('7', 'field_count'), ('11', 'unterminated_quote')]
@@ -0,0 +1,60 @@
+import json
+import pandas as pd
+import collabclassify
+from collabclassify import StubBackend, classify_videos, content_key
+
+def videos(count, title='with @guest'):
+    return pd.DataFrame({'video_id': [f'v{i}' for i in range(count)],
+                         'title': [f'{title} {i}' for i in range(count)],
+                         'description': [None] * count})
+
+def test_content_key_changes_with_any_field():
+    key = content_key('v1', 'title', 'description')
+    assert key == content_key('v1', 'title', 'description')
+    assert len({key, content_key('v2', 'title', 'description'), content_key('v1', 'other', 'description'),
+                content_key('v1', 'title', 'other')}) == 4
+    # Fields are separated, so text cannot move from one field to the next
+    assert content_key('v1', 'ab', 'c') != content_key('v1', 'a', 'bc')
+    assert content_key('v1', None, 'description') == content_key('v1', '', 'description')
+
+def test_stub_backend_batches_and_cache_is_reused(tmp_path):
+    cache = tmp_path / 'cache.jsonl'
+    backend = StubBackend()
+
+    labels = classify_videos(videos(25), backend, cache_path=cache, batch_size=10, max_workers=2)
+
+    assert backend.calls == 3
+    assert labels == {f'v{i}': ['guest'] for i in range(25)}
+    entries = [json.loads(line) for line in cache.read_text(encoding='utf-8').splitlines()]
+    assert len(entries) == 25
+    assert {entry['prompt'] for entry in entries} == {collabclassify.PROMPT_HASH}
+
+    again = StubBackend()
+    assert classify_videos(videos(25), again, cache_path=cache, batch_size=10) == labels
+    assert again.calls == 0
+
+def test_changed_video_is_relabelled(tmp_path):
+    cache = tmp_path / 'cache.jsonl'
+    classify_videos(videos(3), StubBackend(), cache_path=cache)
+
+    backend = StubBackend()
+    labels = classify_videos(videos(3, title='with @other'), backend, cache_path=cache)
+    assert backend.calls == 1
+    assert labels['v0'] == ['other']
+
+def test_stale_prompt_is_only_relabelled_when_asked(tmp_path, monkeypatch):
+    cache = tmp_path / 'cache.jsonl'
+    classify_videos(videos(3), StubBackend(), cache_path=cache)
+    monkeypatch.setattr(collabclassify, 'PROMPT_HASH', 'changed')
+
+    kept = StubBackend()
+    classify_videos(videos(3), kept, cache_path=cache)
+    assert kept.calls == 0
+
+    relabelled = StubBackend()
+    classify_videos(videos(3), relabelled, cache_path=cache, relabel_stale=True)
+    assert relabelled.calls == 1
+    # The new labels are cached under the new prompt and win from now on
+    later = StubBackend()
+    classify_videos(videos(3), later, cache_path=cache, relabel_stale=True)
+    assert later.calls == 0
@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+import collabfilter
+from collabfilter import ChannelMatcher, candidate_mask
+
+KNOWN = {'mr beast': 'UCbeast', 'mr beast gaming': 'UCbeastgaming', '@cutepets': 'UCpets', 'dude perfect': 'UCdude'}
+
+VIDEOS = pd.DataFrame({
+    'video_id': ['marker', 'other', 'own', 'word', 'none', 'handle', 'longer'],
+    'channel_id': ['UC1', 'UC1', 'UCdude', 'UC1', 'UC1', 'UC1', 'UCbeast'],
+    'title_description': [
+        'Best trick shots ft. a friend',
+        'Our trip with Dude Perfect!',
+        'Dude Perfect: overtime',
+        'mr beastly tricks',
+        'just my cat sleeping',
+        'thanks to @cutepets for the kitten',
+        'mr beast gaming stream'
+    ]
+})
+
+@pytest.fixture(params=['aho-corasick', 'regex'])
+def matcher(request, monkeypatch):
+    if request.param == 'aho-corasick':
+        pytest.importorskip('ahocorasick')
+    else:
+        monkeypatch.setattr(collabfilter, 'has_pyahocorasick', lambda: False)
+    matcher = ChannelMatcher(KNOWN)
+    assert (matcher.automaton is not None) == (request.param == 'aho-corasick')
+    return matcher
+
+def test_find_matches_whole_names(matcher):
+    assert matcher.find('Our trip with Dude Perfect!') == {'UCdude'}
+    assert matcher.find('mr beastly tricks') == set()
+    # The automaton also reports names nested in a longer one, the regex only the longest
+    assert 'UCbeastgaming' in matcher.find('mr beast gaming stream')
+    assert matcher.find('') == set()
+
+def test_candidate_mask_excludes_the_host_channel(matcher):
+    mask = candidate_mask(VIDEOS, matcher)
+    flagged = VIDEOS.loc[mask, 'video_id'].tolist()
+    assert flagged == ['marker', 'other', 'handle', 'longer']
+
+def test_markers_only_without_a_matcher():
+    mask = candidate_mask(VIDEOS)
+    assert VIDEOS.loc[mask, 'video_id'].tolist() == ['marker']
+
+def test_both_matchers_give_the_same_mask(monkeypatch):
+    pytest.importorskip('ahocorasick')
+    automaton_mask = candidate_mask(VIDEOS, ChannelMatcher(KNOWN))
+    monkeypatch.setattr(collabfilter, 'has_pyahocorasick', lambda: False)
+    regex_mask = candidate_mask(VIDEOS, ChannelMatcher(KNOWN))
+    pd.testing.assert_series_equal(automaton_mask, regex_mask)
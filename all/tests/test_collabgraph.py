@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+from collabgraph import CollabGraph, build_graph
+from txtanalysis import EDGE_HEADERS
+
+EDGES = [
+    ['animals', 'v1', 'UCa', 'Bee', 'UCb'],
+    ['animals', 'v2', 'UCa', 'Bee', 'UCb'],
+    ['animals', 'v3', 'UCb', 'Cee', 'UCc'],
+    # Logged without an ID, so keyed by name
+    ['gaming', 'v4', 'UCd', 'Eve', None],
+    # Overflow collaborator: no host channel, so no edge
+    ['gaming', 'v4', None, 'Lost', None],
+]
+
+@pytest.fixture
+def graph():
+    return CollabGraph.from_edges(pd.DataFrame(EDGES, columns=EDGE_HEADERS))
+
+def index(graph):
+    return {node: i for i, node in enumerate(graph.nodes)}
+
+def test_csr_build_sums_duplicate_edges(graph):
+    nodes = index(graph)
+    assert sorted(nodes) == ['Eve', 'UCa', 'UCb', 'UCc', 'UCd']
+    assert graph.adjacency[nodes['UCa'], nodes['UCb']] == 2
+    assert graph.adjacency[nodes['UCb'], nodes['UCc']] == 1
+    assert graph.adjacency[nodes['UCd'], nodes['Eve']] == 1
+    assert graph.adjacency.nnz == 3
+    assert graph.num_edges == 3
+    assert graph.undirected[nodes['UCb'], nodes['UCa']] == 2
+
+def test_degrees(graph):
+    nodes = index(graph)
+    degree, weighted = graph.degree(), graph.weighted_degree()
+    assert degree[nodes['UCb']] == 2
+    assert weighted[nodes['UCb']] == 3
+    assert weighted[nodes['UCa']] == 2
+
+def test_components(graph):
+    nodes = index(graph)
+    count, labels = graph.components()
+    assert count == 2
+    assert labels[nodes['UCa']] == labels[nodes['UCb']] == labels[nodes['UCc']]
+    assert labels[nodes['UCd']] == labels[nodes['Eve']] != labels[nodes['UCa']]
+
+def test_pagerank_sums_to_one(graph):
+    nodes = index(graph)
+    rank = graph.pagerank()
+    assert rank.sum() == pytest.approx(1.0)
+    # The hub of the larger component outranks everyone else
+    assert rank.argmax() == nodes['UCb']
+    # The two ends of the isolated pair are symmetric
+    assert rank[nodes['UCd']] == pytest.approx(rank[nodes['Eve']])
+
+def test_pagerank_with_an_isolated_node_sums_to_one():
+    adjacency = sparse.csr_matrix(([1.0], ([0], [1])), shape=(3, 3))
+    rank = CollabGraph(['a', 'b', 'c'], adjacency).pagerank()
+    assert rank.sum() == pytest.approx(1.0)
+    assert rank[2] < rank[0] == pytest.approx(rank[1])
+
+def test_build_graph_caches_the_result(graph, tmp_path):
+    edges = tmp_path / 'edges.csv'
+    pd.DataFrame(EDGES, columns=EDGE_HEADERS).to_csv(edges, index=False)
+    cache_dir = tmp_path / 'cache'
+
+    built = build_graph([str(edges)], cache_dir=str(cache_dir))
+    cached = build_graph([str(edges)], cache_dir=str(cache_dir))
+
+    assert len(list(cache_dir.glob('*.npz'))) == 1
+    assert list(cached.nodes) == list(built.nodes)
+    assert (cached.adjacency != built.adjacency).nnz == 0
+    np.testing.assert_allclose(cached.pagerank(), graph.pagerank())
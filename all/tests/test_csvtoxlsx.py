@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+from csvtoxlsx import save_xlsx
+
+def test_save_xlsx_round_trip(tmp_path):
+    df = pd.DataFrame({
+        'title': ['a', 'b', 'c'],
+        'channel': ['x', None, 'z'],
+        'views': [1, 2, 3],
+        'score': [0.5, np.nan, 1.25]
+    })
+    path = tmp_path / 'sample.xlsx'
+    save_xlsx(df, path)
+
+    result = pd.read_excel(path)
+    assert list(result.columns) == list(df.columns)
+    pd.testing.assert_frame_equal(result, df, check_dtype=False)
+
+def test_save_xlsx_empty_frame(tmp_path):
+    df = pd.DataFrame(columns=['title', 'views'])
+    path = tmp_path / 'empty.xlsx'
+    save_xlsx(df, path)
+
+    result = pd.read_excel(path)
+    assert list(result.columns) == ['title', 'views']
+    assert result.empty
@@ -0,0 +1,43 @@
+import math
+import numpy as np
+import pytest
+from histogram import LogHistogram
+
+def test_bin_edges():
+    hist = LogHistogram(bins_per_decade=10, max_decade=13)
+    assert len(hist.edges) == 131 and len(hist.counts) == 130
+    assert hist.edges[0] == 1 and hist.edges[10] == pytest.approx(10) and hist.edges[-1] == pytest.approx(1e13)
+
+def test_values_on_an_edge_go_to_the_bin_above():
+    hist = LogHistogram(bins_per_decade=1, max_decade=3).update([1, 10, 99, 100, 1000])
+    # The last edge itself belongs to the last bin
+    assert hist.counts.tolist() == [1, 2, 2]
+    assert hist.underflow == hist.overflow == 0
+
+def test_underflow_overflow_and_non_finite_values():
+    hist = LogHistogram(bins_per_decade=1, max_decade=3).update([0, 0.5, -3, 5, 1001, 1e9, np.nan, np.inf])
+    assert hist.underflow == 3
+    assert hist.overflow == 2
+    assert hist.counts.tolist() == [1, 0, 0]
+    assert hist.count == 6
+    assert hist.min == -3 and hist.max == 1e9
+    assert hist.mean == pytest.approx((0 + 0.5 - 3 + 5 + 1001 + 1e9) / 6)
+
+def test_merge_matches_one_pass():
+    rng = np.random.default_rng(0)
+    first, second = rng.lognormal(8, 3, 500), rng.lognormal(10, 4, 700)
+    merged = LogHistogram().update(first).merge(LogHistogram().update(second))
+    whole = LogHistogram().update(np.concatenate([first, second]))
+    assert merged.counts.tolist() == whole.counts.tolist()
+    assert (merged.underflow, merged.overflow, merged.count) == (whole.underflow, whole.overflow, whole.count)
+    assert (merged.min, merged.max) == (whole.min, whole.max)
+    assert merged.total == pytest.approx(whole.total)
+
+def test_merge_rejects_other_edges():
+    with pytest.raises(ValueError):
+        LogHistogram(bins_per_decade=10).merge(LogHistogram(bins_per_decade=5))
+
+def test_empty_histogram_round_trips():
+    hist = LogHistogram.from_dict(LogHistogram().to_dict())
+    assert hist.count == 0 and math.isnan(hist.mean)
+    assert hist.occupied_range() == (0, 0)
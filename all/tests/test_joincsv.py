@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+from joincsv import combine_video_details
+
+HEADER = 'video_id,title,upload_date,channel_id,view_count\n'
+
+def write_category(root, category, rows):
+    csv_dir = root / category / 'data_csv'
+    csv_dir.mkdir(parents=True)
+    (csv_dir / 'videos_detail.csv').write_text(HEADER + ''.join(rows), encoding='utf-8')
+
+def good_rows(prefix, count):
+    return [f'{prefix}{i},title {i},2024-06-01,UC{prefix},{i}\n' for i in range(count)]
+
+@pytest.fixture
+def tree(tmp_path):
+    write_category(tmp_path, 'animals', good_rows('a', 5))
+    # Fails on the sixth row, after two chunks of two have been written
+    write_category(tmp_path, 'blogs', good_rows('b', 5) + ['b5,one,too,many,fields,here\n'])
+    write_category(tmp_path, 'gaming', good_rows('g', 3))
+    return tmp_path
+
+def test_failed_category_is_rolled_back_from_csv(tree):
+    counts = combine_video_details('csv', chunksize=2, base_dir=tree)
+
+    assert counts == {'animals': 5, 'gaming': 3}
+    combined = pd.read_csv(tree / 'all' / 'data' / 'data_csv' / 'combined_videos_detail.csv')
+    assert combined['category'].value_counts().to_dict() == {'animals': 5, 'gaming': 3}
+    assert not (tree / 'all' / 'data' / 'data_csv' / 'combined_videos_detail.csv.tmp').exists()
+
+def test_failed_category_is_rolled_back_from_parquet(tree):
+    counts = combine_video_details('parquet', chunksize=2, base_dir=tree)
+
+    dataset = tree / 'all' / 'data' / 'data_csv' / 'combined_videos_detail'
+    assert counts == {'animals': 5, 'gaming': 3}
+    assert sorted(path.name for path in dataset.iterdir()) == ['category=animals', 'category=gaming']
+    combined = pd.read_parquet(dataset)
+    assert combined['category'].astype(str).value_counts().to_dict() == {'animals': 5, 'gaming': 3}
+
+def test_parquet_rebuild_replaces_the_previous_dataset(tree):
+    output_dir = tree / 'all' / 'data' / 'data_csv'
+    combine_video_details('parquet', chunksize=2, base_dir=tree)
+    (tree / 'gaming' / 'data_csv' / 'videos_detail.csv').unlink()
+
+    counts = combine_video_details('parquet', chunksize=2, base_dir=tree)
+
+    assert counts == {'animals': 5}
+    assert sorted(path.name for path in output_dir.iterdir()) == ['combined_videos_detail']
+    assert [path.name for path in (output_dir / 'combined_videos_detail').iterdir()] == ['category=animals']
+
+def test_parquet_dataset_is_kept_when_nothing_can_be_combined(tree):
+    dataset = tree / 'all' / 'data' / 'data_csv' / 'combined_videos_detail'
+    combine_video_details('parquet', chunksize=2, base_dir=tree)
+    for category in ('animals', 'gaming'):
+        (tree / category / 'data_csv' / 'videos_detail.csv').unlink()
+
+    with pytest.raises(Exception, match='No data'):
+        combine_video_details('parquet', chunksize=2, base_dir=tree)
+
+    assert len(pd.read_parquet(dataset)) == 8
+    assert not (dataset.parent / '.combined_videos_detail.tmp').exists()
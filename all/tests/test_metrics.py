@@ -0,0 +1,34 @@
+import json
+import os
+import metrics
+from metrics import Metrics
+
+def test_prometheus_label_values_are_escaped(tmp_path):
+    stage = Metrics('joincsv', 'animals', metrics_dir=tmp_path, prometheus_dir=tmp_path, enabled=True)
+    stage.inc('rows_written', 3, path='C:\\data\\"new"\nfile')
+    stage.close()
+
+    lines = (tmp_path / 'animals_joincsv.prom').read_text().splitlines()
+    assert 'youtube_pipeline_rows_written_total{stage="joincsv",category="animals",' \
+           'path="C:\\\\data\\\\\\"new\\"\\nfile"} 3' in lines
+
+def test_summary_is_written_on_close(tmp_path):
+    stage = Metrics('cleancsv', 'gaming', metrics_dir=tmp_path, prometheus_dir=None, enabled=True)
+    stage.inc('rows_written', 2)
+    stage.close()
+
+    [path] = tmp_path.iterdir()
+    [summary] = [json.loads(line) for line in path.read_text().splitlines()]
+    assert summary['type'] == 'summary'
+    assert {'name': 'rows_written', 'value': 2} in summary['counters']
+
+def test_uninitialised_metrics_record_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, '_metrics', None)
+    monkeypatch.setattr(metrics._disabled, 'metrics_dir', str(tmp_path))
+    metrics.inc('rows_written', 5)
+    metrics.event('stage_failed', error='boom')
+    with metrics.span('normalize') as span:
+        span['rows'] = 5
+
+    assert metrics._metrics is None
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,31 @@
+import json
+import urllib.error
+import urllib.request
+import pytest
+from mock_youtube_api import start_server
+
+@pytest.fixture
+def server():
+    server = start_server()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_base_url_is_the_server_root(server):
+    assert server.base_url.endswith(':%d/' % server.server_address[1])
+    status, body = get(f'{server.base_url}youtube/v3/videos?part=snippet&id=abc')
+    assert status == 200
+    assert [item['id'] for item in body['items']] == ['abc']
+
+@pytest.mark.parametrize('path', ['videos', 'youtube/v3/youtube/v3/videos', 'other/v3/videos', 'youtube/v3/'])
+def test_unknown_paths_are_rejected(server, path):
+    status, body = get(f'{server.base_url}{path}?part=snippet&id=abc')
+    assert status == 404
+    assert body['error']['errors'][0]['reason'] == 'notFound'
@@ -0,0 +1,35 @@
+import pandas as pd
+from sampler import StratifiedSampler
+
+CATEGORIES = ['animals', 'blogs', 'comedy', 'entertainment', 'gaming']
+
+def balanced_frame(channels=40, videos_per_channel=1):
+    """Same number of channels and videos in every category"""
+    rows = []
+    for category in CATEGORIES:
+        for channel in range(channels):
+            for video in range(videos_per_channel):
+                rows.append({'video_id': f'{category}-{channel}-{video}', 'channel_id': f'{category}-{channel}',
+                             'category': category, 'month': '2024-01'})
+    return pd.DataFrame(rows)
+
+def test_allocation_is_proportional_on_balanced_frame():
+    # Single-video strata all have the same remainder, so every draw beyond
+    # the floor is decided by tie-breaking
+    sampler = StratifiedSampler.from_frame(balanced_frame(), by=['category', 'channel_id'])
+    for seed in range(5):
+        counts = sampler.sample(100, seed=seed)['category'].value_counts()
+        assert counts.sum() == 100
+        for category in CATEGORIES:
+            assert 10 <= counts.get(category, 0) <= 30, (seed, counts.to_dict())
+
+def test_exact_allocation_when_shares_divide_evenly():
+    sampler = StratifiedSampler.from_frame(balanced_frame(videos_per_channel=4), by=['category'])
+    counts = sampler.sample(50, seed=3)['category'].value_counts()
+    assert counts.to_dict() == {category: 10 for category in CATEGORIES}
+
+def test_tie_breaking_follows_the_seed():
+    sampler = StratifiedSampler.from_frame(balanced_frame(), by=['category', 'channel_id'])
+    first = sampler.sample(100, seed=1)
+    assert first.equals(sampler.sample(100, seed=1))
+    assert set(first['channel_id']) != set(sampler.sample(100, seed=2)['channel_id'])
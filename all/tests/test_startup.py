@@ -0,0 +1,16 @@
+import pytest
+from benchmark import SCRIPT_DIR, STARTUP_BUDGETS, startup_dirs, time_startup
+
+# The category scripts only differ in their paths, so one category stands in for all
+CATEGORY = 'animals'
+
+@pytest.fixture(scope='module')
+def interpreter():
+    return time_startup(['-c', 'pass'], SCRIPT_DIR)
+
+@pytest.mark.parametrize('name, where, argv, budget', STARTUP_BUDGETS, ids=[entry[0] for entry in STARTUP_BUDGETS])
+def test_startup_within_budget(interpreter, name, where, argv, budget):
+    seconds = time_startup(argv, startup_dirs(CATEGORY)[where])
+    assert seconds is not None, f'{name} exited with an error'
+    overhead = seconds - interpreter
+    assert overhead <= budget, f'{name} took {overhead * 1000:.0f} ms over a bare start, budget {budget * 1000:.0f} ms'
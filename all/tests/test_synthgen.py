@@ -0,0 +1,19 @@
+import csv
+import io
+import numpy as np
+from synthgen import VIDEO_COLUMNS, damage, format_row
+
+ROW = ['abc', 'a title', 'first line\nsecond line', 'a title first line', '', '', '2024-05-16', 'UUabc',
+       '10', '1', '0', 'PT1M', 'public', 'https://en.wikipedia.org/wiki/Pet']
+
+def test_damaged_rows_are_malformed():
+    rng = np.random.default_rng(0)
+    lines = [damage(ROW, rng) for _ in range(20)]
+    assert any('"unbalanced' in line for line in lines)
+    assert any('stray field' in line for line in lines)
+    for line in lines:
+        rows = list(csv.reader(io.StringIO(line, newline='')))
+        assert [len(row) for row in rows] != [len(VIDEO_COLUMNS)], line
+
+def test_format_row_matches_csv_writer():
+    assert list(csv.reader(io.StringIO(format_row(ROW), newline=''))) == [ROW]
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+from txtanalysis import EDGE_HEADERS, load_edges, parse_log, write_edges
+
+LOG = """Selected index 12
+Row data: video_id='v1', title='Gumball's car, at 10 and 90'
+Video details preview: Gumball's car ...
+Channel: UChost, Collaborator: Bee, Collaborator ID: UCbee, video id: v1
+Channel: UChost, Collaborator: Old Name
+Processed iteration 1: video v1 (index 12)
+
+Selected index 34
+Video details preview: {}...
+
+Selected index 56
+Row data: video_id='v2', title='Too many friends'
+Too many collaborators in video v2: ['a', "lana's life", 'b, c', 'd', 'e', 'f']
+Processed iteration 2: video v2 (index 56)
+"""
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / 'gaming.txt'
+    path.write_text(LOG, encoding='utf-8')
+    return str(path)
+
+def test_parse_log_rows(log):
+    category, rows, _ = parse_log(log)
+
+    assert category == 'gaming'
+    # The entry without row data is dropped
+    assert [row[0] for row in rows] == ['v1', 'v2']
+    assert rows[0][1] == "Gumball's car, at 10 and 90"
+    assert rows[0][2:8] == [2, 'Bee', 'Old Name', '', '', '']
+    # Every collaborator is counted, the first five are shown
+    assert rows[1][2:8] == [6, 'a', "lana's life", 'b, c', 'd', 'e']
+    assert rows[1][8] == 'https://www.youtube.com/watch?v=v2'
+
+def test_parse_log_edges(log):
+    _, _, edges = parse_log(log)
+
+    assert edges[:2] == [
+        ['gaming', 'v1', 'UChost', 'Bee', 'UCbee'],
+        ['gaming', 'v1', 'UChost', 'Old Name', None],
+    ]
+    # Overflow collaborators have neither a host nor an ID, and are not capped
+    assert edges[2:] == [['gaming', 'v2', None, name, None]
+                         for name in ['a', "lana's life", 'b, c', 'd', 'e', 'f']]
+
+@pytest.mark.parametrize('suffix', ['.parquet', '.csv'])
+def test_load_edges_round_trip(log, tmp_path, suffix):
+    _, _, edges = parse_log(log)
+    expected = pd.DataFrame(edges, columns=EDGE_HEADERS)
+    path = str(tmp_path / f'edges{suffix}')
+    if suffix == '.parquet':
+        path = write_edges(path, edges)
+    else:
+        expected.to_csv(path, index=False)
+
+    loaded = load_edges(path)
+
+    assert list(loaded.columns) == EDGE_HEADERS
+    assert loaded['host_channel_id'].isna().sum() == 6
+    assert loaded.astype(object).where(loaded.notna(), None).values.tolist() == \
+        expected.astype(object).where(expected.notna(), None).values.tolist()
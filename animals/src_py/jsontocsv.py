@@ -2,6 +2,8 @@ import os
 import json
 import pandas as pd
 from datetime import datetime
+import metrics
+import profiling
 
 # Get the absolute path of the script's directory
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -43,6 +45,7 @@ def convert_json_to_csv():
                 all_videos.append(video_data)
             except Exception as e:
                 print(f"Error processing video: {e}")
+                metrics.inc('videos_skipped')
                 continue
     
     # Convert to DataFrame
@@ -55,6 +58,11 @@ def convert_json_to_csv():
     df.to_csv(output_csv, index=False)
     print(f"CSV file saved to: {output_csv}")
     print(f"Total videos processed: {len(df)}")
+    metrics.inc('videos_converted', len(df))
+    metrics.inc('bytes_written', os.path.getsize(output_csv))
+    return len(df)
 
 if __name__ == "__main__":
-    convert_json_to_csv()
\ No newline at end of file
+    metrics.init_metrics('jsontocsv', os.path.basename(CATEGORY_DIR))
+    with metrics.span('stage') as span, profiling.profile_stage('jsontocsv', os.path.join(CATEGORY_DIR, 'data_csv')):
+        span['rows'] = convert_json_to_csv()
\ No newline at end of file
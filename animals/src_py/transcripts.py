@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+
+# Get the absolute path of the script's directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Get the category directory (one level up from the script)
+CATEGORY_DIR = os.path.dirname(SCRIPT_DIR)
+
+# One JSON file per video ID, shared by every batch and rerun
+CACHE_DIR = os.path.join(CATEGORY_DIR, 'data_json', 'transcripts')
+# Video ID -> time we learned it has no transcript
+MISSING_FILE = os.path.join(CACHE_DIR, '_missing.json')
+
+# Videos without a transcript are not retried for this long
+MISSING_TTL = 7 * 24 * 3600
+MAX_WORKERS = 5
+LANGUAGES = ('en',)
+
+# YouTubeTranscriptApi keeps a requests.Session, which is not thread-safe,
+# so each worker thread gets its own instance
+_local = threading.local()
+
+def cache_path(video_id, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f'{video_id}.json')
+
+def load_missing(path=MISSING_FILE, ttl=MISSING_TTL):
+    """Negative cache entries that have not expired yet"""
+    try:
+        with open(path, 'r') as f:
+            missing = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    now = time.time()
+    return {video_id: seen for video_id, seen in missing.items() if now - seen < ttl}
+
+def save_missing(missing, path=MISSING_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(missing, f)
+    os.replace(tmp_path, path)
+
+def save_transcript(transcript, path):
+    # Written to a temporary file first, so a crash never leaves a torn entry
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(transcript, f)
+    os.replace(tmp_path, path)
+
+def fetch_transcript(video_id, languages=LANGUAGES):
+    """
+    Fetch one transcript from YouTube.
+
+    Returns:
+        List of {'text', 'start', 'duration'} segments, or None if the video
+        has no transcript
+    """
+    from youtube_transcript_api import CouldNotRetrieveTranscript, YouTubeTranscriptApi
+
+    api = getattr(_local, 'api', None)
+    if api is None:
+        api = _local.api = YouTubeTranscriptApi()
+    print(f"Fetching transcript for video {video_id}")
+    try:
+        return api.fetch(video_id, languages=list(languages)).to_raw_data()
+    except CouldNotRetrieveTranscript:
+        print(f"No transcript available for video {video_id}")
+        return None
+
+def fetch_transcripts(video_ids, cache_dir=CACHE_DIR, max_workers=MAX_WORKERS, ttl=MISSING_TTL):
+    """
+    Get transcripts for many videos, fetching only the ones not cached yet.
+
+    Transcripts already on disk are read back, videos recorded as having no
+    transcript within the TTL are skipped, and the rest are fetched with at
+    most max_workers requests in flight. Network errors are not cached, so
+    those videos are retried on the next run, and neither are cache files
+    that cannot be read back.
+
+    Args:
+        video_ids: Video IDs to get transcripts for
+        cache_dir: Directory holding one JSON file per video and the negative cache
+        max_workers: Maximum number of concurrent requests
+        ttl: Seconds a "no transcript" result is trusted
+
+    Returns:
+        Dictionary mapping video ID to its transcript segments, or None when
+        the video has no transcript (or could not be fetched)
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    missing_file = os.path.join(cache_dir, os.path.basename(MISSING_FILE))
+    missing = load_missing(missing_file, ttl)
+
+    transcripts = {}
+    to_fetch = []
+    for video_id in dict.fromkeys(video_ids):
+        path = cache_path(video_id, cache_dir)
+        if video_id in missing:
+            transcripts[video_id] = None
+            metrics.inc('transcript_cache', result='negative_hit')
+        elif os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    transcripts[video_id] = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                # A torn or unreadable entry counts as a miss and is fetched again
+                print(f"Ignoring unreadable cached transcript {path}: {e}")
+                to_fetch.append(video_id)
+                metrics.inc('transcript_cache', result='corrupt')
+            else:
+                metrics.inc('transcript_cache', result='hit')
+        else:
+            to_fetch.append(video_id)
+            metrics.inc('transcript_cache', result='miss')
+
+    print(f"Transcripts: {len(transcripts)} cached, {len(to_fetch)} to fetch")
+    if not to_fetch:
+        return transcripts
+
+    def fetch(video_id):
+        try:
+            return video_id, fetch_transcript(video_id), None
+        except (AttributeError, TypeError):
+            # A programming error or an incompatible youtube-transcript-api,
+            # not a network problem; retrying next run would not help
+            raise
+        except Exception as e:
+            return video_id, None, e
+
+    # Keep the videos found to have no transcript even if the run stops early
+    try:
+        with metrics.span('transcripts', workers=max_workers) as span, \
+                ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for video_id, transcript, error in executor.map(fetch, to_fetch):
+                transcripts[video_id] = transcript
+                if error is not None:
+                    print(f"Error fetching transcript for video {video_id}: {error}")
+                    metrics.inc('transcripts_fetched', result='error')
+                elif transcript is None:
+                    missing[video_id] = time.time()
+                    metrics.inc('transcripts_fetched', result='unavailable')
+                else:
+                    save_transcript(transcript, cache_path(video_id, cache_dir))
+                    metrics.inc('transcripts_fetched', result='ok')
+            span['rows'] = len(to_fetch)
+    finally:
+        save_missing(missing, missing_file)
+
+    return transcripts
@@ -0,0 +1,110 @@
+import atexit
+import json
+import os
+import threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import metrics
+
+# Get the absolute path of the script's directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Repository root (this file sits in <category>/src_py or all/src_py)
+REPO_DIR = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+
+# One record per billable call in <LEDGER_DIR>/ledger_<date>.jsonl;
+# all/src_py/quota_report.py rolls them up
+LEDGER_DIR = os.getenv('ACCOUNTING_DIR', os.path.join(REPO_DIR, 'logs', 'accounting'))
+ACCOUNTING_DISABLED = os.getenv('ACCOUNTING_DISABLED', '') not in ('', '0')
+
+# The YouTube Data API quota resets at midnight Pacific time, so records are
+# dated in that time zone to line up with the quota day
+QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+# Quota cost of each call, by method (https://developers.google.com/youtube/v3/determine_quota_cost)
+QUOTA_COSTS = {'list': 1, 'search': 100, 'insert': 50, 'update': 50, 'delete': 50}
+# USD per million input and output tokens
+MODEL_PRICES = {
+    'gpt-4o-mini': (0.15, 0.60),
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4.1-mini': (0.40, 1.60),
+    'gpt-4.1': (2.00, 8.00)
+}
+
+def quota_cost(endpoint):
+    """Quota units charged for one call, e.g. 'youtube.videos.list' -> 1"""
+    return QUOTA_COSTS.get(endpoint.rsplit('.', 1)[-1], 1)
+
+def llm_cost(model, tokens_in, tokens_out):
+    """Estimated USD cost of one completion, or None for an unknown model"""
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        # Dated snapshots, e.g. gpt-4o-mini-2024-07-18
+        prices = next((price for name, price in sorted(MODEL_PRICES.items(), key=lambda item: -len(item[0]))
+                       if model.startswith(name)), None)
+    if prices is None:
+        return None
+    return (tokens_in * prices[0] + tokens_out * prices[1]) / 1e6
+
+class Ledger:
+    """
+    Append-only record of every API and LLM call a stage makes.
+
+    Each call is attributed to the category and stage of the running
+    process (as passed to metrics.init_metrics), the endpoint or model, and
+    the quota day. Safe to use from several threads.
+    """
+
+    def __init__(self, ledger_dir=LEDGER_DIR, enabled=not ACCOUNTING_DISABLED):
+        self.ledger_dir = ledger_dir
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.file = None
+        self.file_date = None
+
+    def record(self, kind, endpoint, units, **fields):
+        if not self.enabled:
+            return
+        now = datetime.now(QUOTA_TIMEZONE)
+        date = now.strftime('%Y-%m-%d')
+        stage = metrics.get_metrics()
+        record = {'ts': now.isoformat(timespec='milliseconds'), 'date': date,
+                  'category': stage.category or 'all', 'stage': stage.stage or 'unknown',
+                  'kind': kind, 'endpoint': endpoint, 'units': units, **fields}
+        line = json.dumps(record) + '\n'
+        with self.lock:
+            if self.file_date != date:
+                # A new quota day starts a new file
+                self.close_file()
+                os.makedirs(self.ledger_dir, exist_ok=True)
+                # Line buffered, so every record is on disk as soon as it is
+                # written even if the process is killed
+                self.file = open(os.path.join(self.ledger_dir, f'ledger_{date}.jsonl'), 'a', encoding='utf-8',
+                                 buffering=1)
+                self.file_date = date
+            self.file.write(line)
+
+    def close_file(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.file_date = None
+
+    def close(self):
+        with self.lock:
+            self.close_file()
+
+_ledger = Ledger()
+atexit.register(_ledger.close)
+
+def record_api_call(endpoint, status=200):
+    """Charge one YouTube Data API call to the current stage; returns its quota units"""
+    units = quota_cost(endpoint)
+    # Failed calls are still charged against the quota
+    _ledger.record('api', endpoint, units, status=status)
+    return units
+
+def record_llm_call(model, tokens_in, tokens_out, backend='openai'):
+    """Charge one LLM completion to the current stage; returns its estimated USD cost"""
+    cost = llm_cost(model, tokens_in, tokens_out)
+    _ledger.record('llm', f'{backend}.{model}', tokens_in + tokens_out, tokens_in=tokens_in,
+                   tokens_out=tokens_out, cost_usd=cost)
+    return cost
@@ -3,6 +3,8 @@ import glob
 import os
 from typing import Dict, Any, Iterator, Tuple
 from datetime import datetime
+import metrics
+import profiling
 
 # Get absolute path to the script's directory (gaming/src_py/)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -76,30 +78,36 @@ def combine_batch_files(
     for batch_file in batch_files:
         current_chunk = {}
         chunk_count = 0
+        batch_entries = total_entries
         
-        # Process entries from the current batch file
-        for key, value in process_batch_file(batch_file):
-            current_chunk[key] = value
-            chunk_count += 1
+        with metrics.span('combine_batch', file=os.path.basename(batch_file)) as span:
+            # Process entries from the current batch file
+            for key, value in process_batch_file(batch_file):
+                current_chunk[key] = value
+                chunk_count += 1
+                
+                # Write chunk when it reaches the specified size
+                if chunk_count >= chunk_size:
+                    write_chunk_to_file(output_file, current_chunk, is_first_entry)
+                    is_first_entry = False
+                    total_entries += chunk_count
+                    current_chunk = {}
+                    chunk_count = 0
             
-            # Write chunk when it reaches the specified size
-            if chunk_count >= chunk_size:
+            # Write any remaining entries in the current batch
+            if current_chunk:
                 write_chunk_to_file(output_file, current_chunk, is_first_entry)
                 is_first_entry = False
                 total_entries += chunk_count
-                current_chunk = {}
-                chunk_count = 0
-        
-        # Write any remaining entries in the current batch
-        if current_chunk:
-            write_chunk_to_file(output_file, current_chunk, is_first_entry)
-            is_first_entry = False
-            total_entries += chunk_count
+            span['rows'] = total_entries - batch_entries
     
     # Close the JSON object
     with open(output_file, 'a', encoding='utf-8') as f:
         f.write('\n}')
     
+    metrics.inc('batch_files', len(batch_files))
+    metrics.inc('entries_combined', total_entries)
+    metrics.inc('bytes_written', os.path.getsize(output_file))
     print(f"\nSuccessfully combined {len(batch_files)} batch files into {output_file}")
     print(f"Combined data contains {total_entries} entries")
 
@@ -119,13 +127,15 @@ def write_chunk_to_file(output_file: str, chunk: Dict[str, Any], is_first_entry:
         f.write(chunk_json)
 
 if __name__ == "__main__":
+    metrics.init_metrics('combine', os.path.basename(BASE_DIR))
     try:
         # For videos
-        combine_batch_files(
-            input_dir=os.path.join(BASE_DIR, "data_json", f"batch_{timestamp}"),
-            output_file=os.path.join(BASE_DIR, "data_json", f"videos_{timestamp}.json"),
-            file_pattern="videos_batch_*.json"
-        )
+        with metrics.span('stage'), profiling.profile_stage('combine', os.path.join(BASE_DIR, "data_json")):
+            combine_batch_files(
+                input_dir=os.path.join(BASE_DIR, "data_json", f"batch_{timestamp}"),
+                output_file=os.path.join(BASE_DIR, "data_json", f"videos_{timestamp}.json"),
+                file_pattern="videos_batch_*.json"
+            )
         
         # For playlists
         # combine_batch_files(
@@ -135,3 +145,4 @@ if __name__ == "__main__":
         # )
     except Exception as e:
         print(f"An error occurred: {str(e)}")
+        metrics.event('stage_failed', error=str(e))
@@ -0,0 +1,197 @@
+import glob
+import json
+import os
+import numpy as np
+from channel_schema import load_channels
+
+# Get the absolute path of the script's directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Get the category directory (one level up from the script)
+CATEGORY_DIR = os.path.dirname(SCRIPT_DIR)
+# Get the repository root holding every category directory
+BASE_DIR = os.path.dirname(CATEGORY_DIR)
+
+METRICS = ['Subscribers', 'Video Views', 'Video Count']
+
+# Every histogram shares the same edges (1 to 10^13, 10 bins per decade) so
+# histograms built from different chunks, categories and snapshots can be
+# merged by adding their counts
+BINS_PER_DECADE = 10
+MAX_DECADE = 13
+
+# Bump when the cached histogram layout changes
+CACHE_VERSION = 1
+
+class LogHistogram:
+    """
+    Histogram with log-spaced bins that can be built incrementally.
+
+    Values below 1 (including zero) are counted in `underflow` and values
+    above the last edge in `overflow`, so nothing is silently dropped.
+    """
+
+    def __init__(self, bins_per_decade=BINS_PER_DECADE, max_decade=MAX_DECADE):
+        self.bins_per_decade = bins_per_decade
+        self.max_decade = max_decade
+        self.edges = np.logspace(0, max_decade, max_decade * bins_per_decade + 1)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    @property
+    def count(self):
+        """Number of values added, including under- and overflow"""
+        return int(self.counts.sum()) + self.underflow + self.overflow
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else float('nan')
+
+    def update(self, values):
+        """Add a chunk of values; NaNs and infinities are ignored"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return self
+
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        below = values < self.edges[0]
+        above = values > self.edges[-1]
+        self.underflow += int(below.sum())
+        self.overflow += int(above.sum())
+
+        in_range = values[~below & ~above]
+        idx = np.searchsorted(self.edges, in_range, side='right') - 1
+        # The last edge itself belongs to the last bin
+        idx = np.minimum(idx, len(self.counts) - 1)
+        self.counts += np.bincount(idx, minlength=len(self.counts))
+        return self
+
+    def merge(self, other):
+        """Add another histogram's counts to this one"""
+        if (other.bins_per_decade, other.max_decade) != (self.bins_per_decade, self.max_decade):
+            raise ValueError("Cannot merge histograms with different bin edges")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def occupied_range(self):
+        """Return (start, stop) bin indices spanning the non-empty bins"""
+        nonzero = np.nonzero(self.counts)[0]
+        if len(nonzero) == 0:
+            return 0, 0
+        return int(nonzero[0]), int(nonzero[-1]) + 1
+
+    def to_dict(self):
+        return {
+            'bins_per_decade': self.bins_per_decade,
+            'max_decade': self.max_decade,
+            'counts': self.counts.tolist(),
+            'underflow': self.underflow,
+            'overflow': self.overflow,
+            'total': self.total,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        hist = cls(data['bins_per_decade'], data['max_decade'])
+        hist.counts = np.asarray(data['counts'], dtype=np.int64)
+        hist.underflow = data['underflow']
+        hist.overflow = data['overflow']
+        hist.total = data['total']
+        if data['min'] is not None:
+            hist.min = data['min']
+            hist.max = data['max']
+        return hist
+
+def build_histograms(chunks, metrics=METRICS):
+    """
+    Build one LogHistogram per metric from an iterable of DataFrame chunks.
+
+    Args:
+        chunks: Iterable of DataFrames holding the metric columns
+        metrics: Metric columns to histogram
+
+    Returns:
+        Dictionary mapping metric name to LogHistogram
+    """
+    histograms = {metric: LogHistogram() for metric in metrics}
+    for chunk in chunks:
+        for metric in metrics:
+            histograms[metric].update(chunk[metric].astype('float64'))
+    return histograms
+
+def _cache_path(csv_path):
+    category_dir = os.path.dirname(os.path.dirname(csv_path))
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(category_dir, 'data_graph', 'hist_cache', f'{name}.json')
+
+def partition_histograms(csv_path, chunksize=100000):
+    """
+    Return the per-metric histograms of one snapshot CSV.
+
+    Only the metric columns of the CSV are read, in chunks, and the result
+    is cached under data_graph/hist_cache; the cache is reused as long as
+    the CSV's size and modification time are unchanged.
+
+    Args:
+        csv_path: Path to a channels_<date>.csv ranking snapshot
+        chunksize: Number of rows read at a time
+    """
+    stat = os.stat(csv_path)
+    signature = f'{CACHE_VERSION}:{stat.st_size}:{stat.st_mtime_ns}'
+    cache_path = _cache_path(csv_path)
+
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached['signature'] == signature:
+            return {metric: LogHistogram.from_dict(data) for metric, data in cached['histograms'].items()}
+    except (OSError, ValueError, KeyError):
+        pass
+
+    chunks = load_channels(csv_path, columns=METRICS, chunksize=chunksize)
+    histograms = build_histograms(chunks)
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'signature': signature,
+            'histograms': {metric: hist.to_dict() for metric, hist in histograms.items()}
+        }, f)
+    return histograms
+
+def fleet_histograms(categories, snapshot=None):
+    """
+    Merge the cached per-partition histograms of several categories.
+
+    Args:
+        categories: Category directory names, e.g. ['animals', 'gaming']
+        snapshot: Only include this date (YYYY-MM-DD); all snapshots otherwise
+
+    Returns:
+        Tuple of (histograms by metric, number of partitions merged)
+    """
+    pattern = f'channels_{snapshot}.csv' if snapshot else 'channels_*.csv'
+    fleet = {metric: LogHistogram() for metric in METRICS}
+    partitions = 0
+
+    for category in categories:
+        for csv_path in sorted(glob.glob(os.path.join(BASE_DIR, category, 'data_csv', pattern))):
+            for metric, hist in partition_histograms(csv_path).items():
+                fleet[metric].merge(hist)
+            partitions += 1
+
+    return fleet, partitions
@@ -0,0 +1,188 @@
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Get the absolute path of the script's directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Repository root (this file sits in <category>/src_py or all/src_py)
+REPO_DIR = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+
+# Every stage appends its events to <METRICS_DIR>/metrics_<date>.jsonl
+METRICS_DIR = os.getenv('METRICS_DIR', os.path.join(REPO_DIR, 'logs', 'metrics'))
+# If set, each stage also writes <dir>/<category>_<stage>.prom for the
+# node_exporter textfile collector when it finishes
+PROMETHEUS_DIR = os.getenv('METRICS_PROMETHEUS_DIR')
+METRICS_DISABLED = os.getenv('METRICS_DISABLED', '') not in ('', '0')
+PROMETHEUS_PREFIX = 'youtube_pipeline_'
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _label_value(value):
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class Metrics:
+    """
+    Counters, gauges, events and timed spans for one run of one stage.
+
+    Events and span timings are appended to a JSON-lines file as they happen;
+    counter and gauge totals are written as a final 'summary' event (and to
+    the Prometheus textfile, if configured) when the stage exits. Safe to use
+    from several threads.
+
+    Args:
+        stage: Stage name, e.g. 'playlist'
+        category: Category the stage runs for, e.g. 'gaming'
+    """
+
+    def __init__(self, stage, category=None, metrics_dir=METRICS_DIR, prometheus_dir=PROMETHEUS_DIR,
+                 enabled=not METRICS_DISABLED):
+        self.stage = stage
+        self.category = category
+        self.run_id = f'{stage}-{os.getpid()}-{int(time.time())}'
+        self.metrics_dir = metrics_dir
+        self.prometheus_dir = prometheus_dir
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.file = None
+        self.closed = False
+
+    def _write(self, record):
+        if not self.enabled:
+            return
+        record = {'ts': datetime.now().isoformat(timespec='milliseconds'), 'run': self.run_id,
+                  'stage': self.stage, 'category': self.category, **record}
+        line = json.dumps(record, default=str) + '\n'
+        with self.lock:
+            if self.file is None:
+                os.makedirs(self.metrics_dir, exist_ok=True)
+                path = os.path.join(self.metrics_dir, f"metrics_{datetime.now().strftime('%Y-%m-%d')}.jsonl")
+                self.file = open(path, 'a', encoding='utf-8', buffering=1)
+            self.file.write(line)
+
+    def inc(self, name, value=1, **labels):
+        """Add to a counter, e.g. inc('api_calls', endpoint='videos.list')"""
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name, value, **labels):
+        """Set a gauge to its current value, e.g. a queue depth"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+    def event(self, name, **fields):
+        """Record a one-off structured event"""
+        self._write({'type': 'event', 'name': name, **fields})
+
+    @contextmanager
+    def span(self, name, **labels):
+        """
+        Time a block and record it as a span event.
+
+        Yields a dict the block can fill in; a 'rows' entry also records
+        rows_per_sec, and a 'bytes' entry is added to the bytes_written counter.
+        """
+        fields = {}
+        start = time.perf_counter()
+        status = 'ok'
+        try:
+            yield fields
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            if fields.get('rows') and seconds > 0:
+                fields['rows_per_sec'] = round(fields['rows'] / seconds, 1)
+            if fields.get('bytes'):
+                self.inc('bytes_written', fields['bytes'])
+            self.inc('span_seconds', seconds, span=name)
+            self.inc('span_count', 1, span=name)
+            self._write({'type': 'span', 'name': name, 'seconds': round(seconds, 6), 'status': status,
+                         **labels, **fields})
+
+    def snapshot(self):
+        with self.lock:
+            return ([(name, dict(labels), value) for (name, labels), value in self.counters.items()],
+                    [(name, dict(labels), value) for (name, labels), value in self.gauges.items()])
+
+    def write_prometheus(self, counters, gauges):
+        base = {'stage': self.stage, 'category': self.category or 'all'}
+        lines = []
+        for kind, series in (('counter', counters), ('gauge', gauges)):
+            seen = set()
+            for name, labels, value in sorted(series, key=lambda item: item[0]):
+                metric = PROMETHEUS_PREFIX + name + ('_total' if kind == 'counter' else '')
+                if metric not in seen:
+                    lines.append(f'# TYPE {metric} {kind}')
+                    seen.add(metric)
+                label_text = ','.join(f'{key}="{_label_value(value)}"' for key, value in {**base, **labels}.items())
+                lines.append(f'{metric}{{{label_text}}} {value}')
+        os.makedirs(self.prometheus_dir, exist_ok=True)
+        path = os.path.join(self.prometheus_dir, f"{base['category']}_{self.stage}.prom")
+        # Write then rename, so the collector never reads a half-written file
+        with open(f'{path}.tmp', 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(f'{path}.tmp', path)
+
+    def close(self):
+        """Write the summary event and Prometheus textfile; called automatically at exit"""
+        if self.closed:
+            return
+        self.closed = True
+        if not self.counters and not self.gauges and self.file is None:
+            return  # nothing was recorded
+        self.inc('stage_seconds', time.perf_counter() - self.started)
+        counters, gauges = self.snapshot()
+        self._write({'type': 'summary',
+                     'counters': [{'name': name, **labels, 'value': value} for name, labels, value in counters],
+                     'gauges': [{'name': name, **labels, 'value': value} for name, labels, value in gauges]})
+        if self.enabled and self.prometheus_dir:
+            self.write_prometheus(counters, gauges)
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+_metrics = None
+# Used until a stage calls init_metrics, so that code shared with scripts
+# that never do records nothing rather than a stray 'unknown' stage
+_disabled = Metrics(None, enabled=False)
+
+def init_metrics(stage, category=None):
+    """Start collecting metrics for this process's stage"""
+    global _metrics
+    if _metrics is not None:
+        _metrics.close()
+    _metrics = Metrics(stage, category)
+    atexit.register(_metrics.close)
+    return _metrics
+
+def get_metrics():
+    """The current stage's Metrics, or a disabled one if the stage didn't start any"""
+    return _metrics if _metrics is not None else _disabled
+
+def inc(name, value=1, **labels):
+    get_metrics().inc(name, value, **labels)
+
+def gauge(name, value, **labels):
+    get_metrics().gauge(name, value, **labels)
+
+def event(name, **fields):
+    get_metrics().event(name, **fields)
+
+def span(name, **labels):
+    return get_metrics().span(name, **labels)
@@ -1,4 +1,5 @@
 import aiohttp
+import argparse
 import asyncio
 from bs4 import BeautifulSoup
 import csv
@@ -7,6 +8,9 @@ from urllib.parse import urlparse, parse_qs
 import os
 import random
 from datetime import datetime
+from channel_schema import CHANNEL_COLUMNS, parse_count, write_schema
+import metrics
+import profiling
 
 # List of user agents to rotate
 USER_AGENTS = [
@@ -20,6 +24,12 @@ USER_AGENTS = [
 BASE_DIR = os.path.expanduser('~/YouTube/blogs')
 DATA_CSV_DIR = os.path.join(BASE_DIR, 'data_csv')
 
+# Site to scrape; point at all/src_py/mock_youtubers.py to run offline
+YOUTUBERS_BASE_URL = os.getenv('YOUTUBERS_BASE_URL', 'https://us.youtubers.me').rstrip('/')
+LISTING_PATH = '/united-states/people-blogs/top-1000-most-subscribed-youtube-channels-in-united-states'
+# Pause between collected rows, to go easy on the live site
+REQUEST_DELAY = float(os.getenv('RANKING_REQUEST_DELAY', '1'))
+
 now = datetime.now()
 timestamp = now.strftime("%Y-%m-%d")
 
@@ -28,6 +38,7 @@ async def get_channel_data(session, channel_url, retries=3):
         try:
             headers = {'User-Agent': random.choice(USER_AGENTS)}
             async with session.get(channel_url, headers=headers, timeout=30) as response:
+                metrics.inc('pages_fetched', page='channel', status=response.status)
                 content = await response.text()
                 soup = BeautifulSoup(content, 'html.parser')
                 
@@ -35,13 +46,15 @@ async def get_channel_data(session, channel_url, retries=3):
                 if profile_image_div:
                     link_tag = profile_image_div.find('a')
                     if link_tag and 'href' in link_tag.attrs:
-                        indirect_url = f"https://us.youtubers.me{link_tag['href']}"
+                        indirect_url = f"{YOUTUBERS_BASE_URL}{link_tag['href']}"
                         return await get_direct_youtube_url(session, indirect_url)
             return None
         except asyncio.TimeoutError:
             print(f"Timeout occurred for {channel_url}. Retrying... (Attempt {attempt + 1}/{retries})")
+            metrics.inc('page_retries', page='channel', reason='timeout')
             await asyncio.sleep(5)  # Wait for 5 seconds before retrying
     print(f"Failed to retrieve data for {channel_url} after {retries} attempts.")
+    metrics.inc('pages_failed', page='channel')
     return None
 
 async def get_direct_youtube_url(session, indirect_url, retries=3):
@@ -49,6 +62,7 @@ async def get_direct_youtube_url(session, indirect_url, retries=3):
         try:
             headers = {'User-Agent': random.choice(USER_AGENTS)}
             async with session.get(indirect_url, headers=headers, allow_redirects=True, timeout=30) as response:
+                metrics.inc('pages_fetched', page='go', status=response.status)
                 if 'youtube.com' in str(response.url):
                     return str(response.url)
                 
@@ -66,8 +80,10 @@ async def get_direct_youtube_url(session, indirect_url, retries=3):
             return None
         except asyncio.TimeoutError:
             print(f"Timeout occurred for {indirect_url}. Retrying... (Attempt {attempt + 1}/{retries})")
+            metrics.inc('page_retries', page='go', reason='timeout')
             await asyncio.sleep(5)  # Wait for 5 seconds before retrying
     print(f"Failed to retrieve direct YouTube URL for {indirect_url} after {retries} attempts.")
+    metrics.inc('pages_failed', page='go')
     return None
 
 def extract_channel_id(channel_link):
@@ -85,6 +101,7 @@ def extract_channel_id(channel_link):
 async def scrape_youtube_channels(url):
     async with aiohttp.ClientSession() as session:
         async with session.get(url) as response:
+            metrics.inc('pages_fetched', page='listing', status=response.status)
             content = await response.text()
             soup = BeautifulSoup(content, 'html.parser')
             
@@ -101,29 +118,35 @@ async def scrape_youtube_channels(url):
                 if len(columns) < 7:
                     continue
                 
-                rank = columns[0].text.strip()
+                # Store counts as integers so downstream loaders get typed columns
+                rank = parse_count(columns[0].text)
                 youtuber = columns[1].text.strip()
-                subscribers = columns[2].text.strip()
-                video_views = columns[3].text.strip()
-                video_count = columns[4].text.strip()
+                subscribers = parse_count(columns[2].text)
+                video_views = parse_count(columns[3].text)
+                video_count = parse_count(columns[4].text)
                 category = columns[5].text.strip()
-                started = columns[6].text.strip()
+                started = parse_count(columns[6].text)
                 
                 channel_page_link = columns[1].find('a')['href']
-                channel_page_url = f"https://us.youtubers.me{channel_page_link}"
+                channel_page_url = f"{YOUTUBERS_BASE_URL}{channel_page_link}"
                 
                 task = asyncio.create_task(get_channel_data(session, channel_page_url))
                 tasks.append((rank, youtuber, subscribers, video_views, video_count, category, started, task))
             
             data = []
-            for rank, youtuber, subscribers, video_views, video_count, category, started, task in tasks:
-                channel_link = await task
-                channel_id = extract_channel_id(channel_link)
-                
-                data.append([rank, youtuber, subscribers, video_views, video_count, category, started, channel_link, channel_id])
-                print(f"Scraped data for {youtuber}")
+            with metrics.span('scrape_channels') as span:
+                for index, (rank, youtuber, subscribers, video_views, video_count, category, started, task) in enumerate(tasks):
+                    # Channel pages still being waited on
+                    metrics.gauge('channel_queue_depth', len(tasks) - index)
+                    channel_link = await task
+                    channel_id = extract_channel_id(channel_link)
                     
-                await asyncio.sleep(1)  # Add a delay between requests
+                    data.append([rank, youtuber, subscribers, video_views, video_count, category, started, channel_link, channel_id])
+                    print(f"Scraped data for {youtuber}")
+                        
+                    await asyncio.sleep(REQUEST_DELAY)  # Add a delay between requests
+                metrics.gauge('channel_queue_depth', 0)
+                span['rows'] = len(data)
     
     return data
 
@@ -132,8 +155,10 @@ def save_to_csv(data, filename):
     os.makedirs(DATA_CSV_DIR, exist_ok=True)  # Ensure directory exists
     with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
         writer = csv.writer(csvfile)
-        writer.writerow(['Rank', 'Youtuber', 'Subscribers', 'Video Views', 'Video Count', 'Category', 'Started', 'Channel Link', 'Channel ID'])
+        writer.writerow(CHANNEL_COLUMNS)
         writer.writerows(data)
+    write_schema(filepath)
+    metrics.inc('bytes_written', os.path.getsize(filepath))
 
 def save_channel_ids_to_csv(data, filename):
     filepath = os.path.join(DATA_CSV_DIR, filename)
@@ -143,9 +168,10 @@ def save_channel_ids_to_csv(data, filename):
         for row in data:
             channel_id = row[8] if len(row) > 8 else ''  # Use empty string if channel_id is missing
             writer.writerow([channel_id])
+    metrics.inc('bytes_written', os.path.getsize(filepath))
 
-async def main():
-    url = 'https://us.youtubers.me/united-states/people-blogs/top-1000-most-subscribed-youtube-channels-in-united-states'
+async def scrape_and_save():
+    url = f'{YOUTUBERS_BASE_URL}{LISTING_PATH}'
     youtube_data = await scrape_youtube_channels(url)
 
     if youtube_data:
@@ -161,9 +187,23 @@ async def main():
         # Count non-empty channel IDs
         non_empty_channel_ids = sum(1 for row in youtube_data if row[8])
         print(f"Number of non-empty channel IDs: {non_empty_channel_ids}")
+        metrics.inc('channels_scraped', len(youtube_data))
+        metrics.inc('channel_ids_found', non_empty_channel_ids)
 
     else:
         print("No data was scraped. Please check the website and the script.")
+        metrics.event('no_data', url=url)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=f'Scrape the {os.path.basename(BASE_DIR)} channel ranking from {YOUTUBERS_BASE_URL} '
+                    f'into {DATA_CSV_DIR}')
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+
+    metrics.init_metrics('ranking', os.path.basename(BASE_DIR))
+    with metrics.span('stage'), profiling.profile_stage('ranking', DATA_CSV_DIR, args.profile):
+        asyncio.run(scrape_and_save())
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
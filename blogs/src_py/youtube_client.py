@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+import time
+from dotenv import load_dotenv
+import accounting
+import metrics
+
+load_dotenv()
+
+DEVELOPER_KEY = os.getenv('API_KEY')
+YOUTUBE_API_SERVICE_NAME = 'youtube'
+YOUTUBE_API_VERSION = 'v3'
+# Send every request to another server instead of googleapis.com. Give the
+# server root, e.g. http://127.0.0.1:8080/ for all/src_py/mock_youtube_api.py;
+# request paths already start with youtube/v3/
+BASE_URL_ENV = 'YOUTUBE_API_BASE_URL'
+# Discovery document to build clients from. When unset, the copy bundled with
+# googleapiclient is used; when set to a file that doesn't exist yet, the live
+# document is downloaded into it once and reused from then on
+DISCOVERY_FILE_ENV = 'YOUTUBE_DISCOVERY_FILE'
+DISCOVERY_URL = 'https://www.googleapis.com/discovery/v1/apis/youtube/v3/rest'
+
+_discovery_text = None
+_discovery_lock = threading.Lock()
+# Per-thread httplib2 connection and client, see thread_http and get_youtube
+_local = threading.local()
+
+_request_class = None
+
+def instrumented_request_class():
+    """
+    The requestBuilder passed to googleapiclient.
+
+    Defined on first use, like the googleapiclient import itself, so that
+    importing this module (and running a stage with --help) stays fast.
+    """
+    global _request_class
+    if _request_class is None:
+        from googleapiclient.errors import HttpError
+        from googleapiclient.http import HttpRequest
+
+        class ChargedHttp:
+            """Wraps the http object of one request so every attempt, retries included, is charged"""
+
+            def __init__(self, http, endpoint):
+                self.http = http
+                self.endpoint = endpoint
+
+            def request(self, *args, **kwargs):
+                status = 'error'
+                try:
+                    response, content = self.http.request(*args, **kwargs)
+                    status = response.status
+                    return response, content
+                finally:
+                    # Failed attempts are still charged against the quota
+                    metrics.inc('quota_units', accounting.record_api_call(self.endpoint, status),
+                                endpoint=self.endpoint)
+
+            def __getattr__(self, name):
+                return getattr(self.http, name)
+
+        class InstrumentedRequest(HttpRequest):
+            """HttpRequest that counts calls, latency and quota units per endpoint, and charges them to the ledger"""
+
+            def execute(self, http=None, num_retries=0):
+                endpoint = self.methodId or 'unknown'
+                start = time.perf_counter()
+                status = 200
+                try:
+                    return super().execute(http=ChargedHttp(http or self.http, endpoint), num_retries=num_retries)
+                except HttpError as e:
+                    status = e.resp.status
+                    raise
+                except Exception:
+                    status = 'error'
+                    raise
+                finally:
+                    metrics.inc('api_calls', endpoint=endpoint, status=status)
+                    metrics.inc('api_seconds', time.perf_counter() - start, endpoint=endpoint)
+
+        _request_class = InstrumentedRequest
+    return _request_class
+
+def download_discovery_document(path, url=DISCOVERY_URL):
+    """Fetch the live discovery document and save it to path"""
+    from googleapiclient.http import build_http
+
+    response, content = build_http().request(url)
+    if response.status != 200:
+        raise RuntimeError(f"Could not download the discovery document: HTTP {response.status}")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+def load_discovery_document():
+    """
+    The YouTube discovery document as JSON text, read once per process.
+
+    Comes from YOUTUBE_DISCOVERY_FILE if set (downloading it the first
+    time), otherwise from the copy bundled with googleapiclient. Either way
+    building a client needs no network round trip.
+    """
+    global _discovery_text
+    with _discovery_lock:
+        if _discovery_text is None:
+            path = os.getenv(DISCOVERY_FILE_ENV)
+            if path:
+                if not os.path.exists(path):
+                    download_discovery_document(path)
+                with open(path, 'r', encoding='utf-8') as f:
+                    _discovery_text = f.read()
+            else:
+                from googleapiclient import discovery_cache
+                _discovery_text = discovery_cache.get_static_doc(YOUTUBE_API_SERVICE_NAME, YOUTUBE_API_VERSION)
+    return _discovery_text
+
+def thread_http():
+    """
+    This thread's HTTP connection pool.
+
+    httplib2.Http is not thread-safe, so each thread keeps its own, and
+    every client built in that thread reuses its open connections.
+    """
+    http = getattr(_local, 'http', None)
+    if http is None:
+        from googleapiclient.http import build_http
+        http = _local.http = build_http()
+    return http
+
+def api_root(base_url):
+    """
+    The server root to pass as googleapiclient's api_endpoint.
+
+    The endpoint replaces the document's rootUrl, and every method path in
+    the document already starts with youtube/v3/, so a base URL that ends
+    with it as well would have it twice; it is dropped.
+    """
+    root = base_url.rstrip('/')
+    service_path = f'/{YOUTUBE_API_SERVICE_NAME}/{YOUTUBE_API_VERSION}'
+    if root.endswith(service_path):
+        root = root[:-len(service_path)]
+    return root + '/'
+
+def build_youtube(developer_key=None, base_url=None, http=None):
+    """
+    Build the YouTube Data API client used by the fetch stages.
+
+    Args:
+        developer_key: API key (defaults to API_KEY from the environment)
+        base_url: Server root to use instead of the real one, e.g.
+            http://127.0.0.1:8080/ (defaults to YOUTUBE_API_BASE_URL from
+            the environment)
+        http: httplib2.Http to send requests with (defaults to this thread's)
+
+    Returns:
+        A googleapiclient service object; use it from one thread only
+    """
+    base_url = base_url or os.getenv(BASE_URL_ENV)
+    client_options = {'api_endpoint': api_root(base_url)} if base_url else None
+    from googleapiclient.discovery import build_from_document
+
+    # Every client gets its own parsed copy of the document: googleapiclient
+    # writes into it while building resources, so it can't be shared across threads
+    return build_from_document(json.loads(load_discovery_document()),
+                               developerKey=developer_key or DEVELOPER_KEY,
+                               http=http or thread_http(), client_options=client_options,
+                               requestBuilder=instrumented_request_class())
+
+def get_youtube():
+    """This thread's client, built on first use; call it from each worker thread"""
+    youtube = getattr(_local, 'youtube', None)
+    if youtube is None:
+        youtube = _local.youtube = build_youtube()
+    return youtube
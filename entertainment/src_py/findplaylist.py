@@ -2,6 +2,8 @@ import json
 import csv
 from datetime import datetime
 import os
+import metrics
+import profiling
 
 # Get the absolute path of the script's directory
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -47,6 +49,11 @@ def extract_playlist_ids(json_file, csv_file):
             writer.writerow([playlist_id])
     
     print(f"Playlist IDs have been written to {csv_file}")
+    metrics.inc('channels_read', len(data))
+    metrics.inc('playlists_extracted', len(playlist_ids))
+    metrics.inc('channels_skipped', skipped_channels, reason='unexpected_data')
+    metrics.inc('channels_skipped', missing_keys, reason='missing_keys')
+    metrics.inc('bytes_written', os.path.getsize(csv_file))
     print(f"Total channels processed: {len(data)}")
     print(f"Playlist IDs extracted: {len(playlist_ids)}")
     print(f"Channels skipped due to unexpected data: {skipped_channels}")
@@ -57,4 +64,6 @@ json_file = os.path.join(CATEGORY_DIR, 'data_json', f'channels_{timestamp}.json'
 csv_file = os.path.join(CATEGORY_DIR, 'data_csv', 'playlist_id.csv')
 
 # Run the extraction
-extract_playlist_ids(json_file, csv_file)
+metrics.init_metrics('findplaylist', os.path.basename(CATEGORY_DIR))
+with metrics.span('stage'), profiling.profile_stage('findplaylist', os.path.dirname(csv_file)):
+    extract_playlist_ids(json_file, csv_file)
@@ -1,5 +1,8 @@
+import argparse
 import subprocess
 import os
+import metrics
+import profiling
 
 # Get the directory where your script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,11 +15,24 @@ scripts = [
     "combine.py"
 ]
 
+parser = argparse.ArgumentParser(description='Run the collection stages in order')
+profiling.add_profile_argument(parser)
+args = parser.parse_args()
+
+# Every stage profiles itself when PIPELINE_PROFILE is set
+env = dict(os.environ)
+if args.profile:
+    env[profiling.PROFILE_ENV] = args.profile
+
+# Each script records its own counters; this run records how long each one took
+metrics.init_metrics('main', os.path.basename(os.path.dirname(SCRIPT_DIR)))
+
 for script in scripts:
     script_path = os.path.join(SCRIPT_DIR, script)
     print(f"Running {script}...")
     # Use the same Python interpreter that's running this script
-    subprocess.run(["python3", script_path], check=True)
+    with metrics.span('script', script=script):
+        subprocess.run(["python3", script_path], check=True, env=env)
     print(f"Finished running {script}\n")
 
 print("All scripts have been executed.")
\ No newline at end of file
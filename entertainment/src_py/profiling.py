@@ -0,0 +1,119 @@
+import cProfile
+import io
+import os
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# Set to profile every stage without touching its command line, e.g.
+#   PIPELINE_PROFILE=1 python main.py
+# '1' (or 'all') records both CPU and memory, 'cpu' only runs cProfile and
+# 'memory' only runs tracemalloc
+PROFILE_ENV = 'PIPELINE_PROFILE'
+MODES = {'1': {'cpu', 'memory'}, 'all': {'cpu', 'memory'}, 'cpu': {'cpu'}, 'memory': {'memory'}}
+# Lines kept in the text reports
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+# Frames kept per allocation, so reports point at the caller and not just pandas
+TRACEMALLOC_FRAMES = 10
+
+def profile_modes(enabled=None):
+    """
+    What to profile: the --profile flag if given, else PIPELINE_PROFILE.
+
+    Args:
+        enabled: True, False, a mode name, or None to read the environment
+
+    Returns:
+        Set containing 'cpu' and/or 'memory' (empty when profiling is off)
+    """
+    if enabled is None:
+        enabled = os.getenv(PROFILE_ENV, '')
+    if enabled is True:
+        enabled = '1'
+    if not enabled or enabled == '0':
+        return set()
+    if enabled not in MODES:
+        raise ValueError(f"Unknown profile mode {enabled!r}, expected one of {', '.join(MODES)}")
+    return MODES[enabled]
+
+def add_profile_argument(parser):
+    """Add the --profile [cpu|memory] switch to a stage's argument parser"""
+    parser.add_argument('--profile', nargs='?', const='1', default=None, choices=list(MODES),
+                        help=f'Write CPU and memory profiles next to the outputs (same as {PROFILE_ENV}=1)')
+
+def write_cpu_report(profiler, path):
+    """Save the raw cProfile stats and a text summary sorted by cumulative time"""
+    profiler.dump_stats(f'{path}.prof')
+    text = io.StringIO()
+    stats = pstats.Stats(profiler, stream=text)
+    stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+    stats.sort_stats('tottime').print_stats(TOP_FUNCTIONS)
+    with open(f'{path}_cpu.txt', 'w', encoding='utf-8') as f:
+        f.write(text.getvalue())
+
+def write_memory_report(snapshot, peak, path):
+    """Save the largest allocations still live at the end, by line and by call stack"""
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, cProfile.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>')
+    ])
+    lines = [f'Peak traced memory: {peak / 1024 ** 2:.1f} MiB', '', f'Top {TOP_ALLOCATIONS} allocations by line:']
+    for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+        lines.append(f'  {stat}')
+    lines += ['', f'Top {TOP_ALLOCATIONS // 5} allocations by call stack:']
+    for stat in snapshot.statistics('traceback')[:TOP_ALLOCATIONS // 5]:
+        lines.append(f'  {stat.size / 1024:.1f} KiB in {stat.count} blocks')
+        lines += [f'    {line}' for line in stat.traceback.format()]
+    with open(f'{path}_memory.txt', 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+@contextmanager
+def profile_stage(stage, output_dir, enabled=None):
+    """
+    Profile a block and write the reports to <output_dir>/profiles.
+
+    Does nothing unless profiling is switched on by `enabled` or
+    PIPELINE_PROFILE. Produces <stage>_<time>.prof (open with snakeviz or
+    pstats), <stage>_<time>_cpu.txt and <stage>_<time>_memory.txt. Only the
+    calling thread is profiled by cProfile; tracemalloc sees every thread,
+    but not worker processes.
+
+    Args:
+        stage: Stage name used in the report file names
+        output_dir: Directory the stage writes its outputs to
+        enabled: True/False or a mode name; None reads PIPELINE_PROFILE
+    """
+    modes = profile_modes(enabled)
+    if not modes:
+        yield
+        return
+
+    profiler = cProfile.Profile() if 'cpu' in modes else None
+    started_tracing = 'memory' in modes and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if 'memory' in modes:
+            # Taken before writing the CPU report, which allocates plenty itself
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+        profile_dir = os.path.join(output_dir, 'profiles')
+        os.makedirs(profile_dir, exist_ok=True)
+        path = os.path.join(profile_dir, f"{stage}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        if profiler is not None:
+            write_cpu_report(profiler, path)
+        if 'memory' in modes:
+            write_memory_report(snapshot, peak, path)
+        print(f"Profile for {stage} written to {path}*")
@@ -2,13 +2,12 @@
 
 import argparse
 import json
-import numpy as np
-import pprint
 import csv
 import os
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from dotenv import load_dotenv
+from youtube_client import get_youtube
+import metrics
+import profiling
 from datetime import datetime
 
 # Get the absolute path of the script's directory
@@ -16,18 +15,12 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 # Get the gaming directory (one level up from the script)
 CATEGORY_DIR = os.path.dirname(SCRIPT_DIR)
 
-load_dotenv() 
-
-DEVELOPER_KEY = os.getenv('API_KEY')
-YOUTUBE_API_SERVICE_NAME = 'youtube'
-YOUTUBE_API_VERSION = 'v3'
 now = datetime.now()
 timestamp = now.strftime("%Y-%m-%d") 
 
 
 def youtube_search(options):
-    youtube = build(YOUTUBE_API_SERVICE_NAME, YOUTUBE_API_VERSION,
-    developerKey=DEVELOPER_KEY)
+    youtube = get_youtube()
 
     channels = {}
     
@@ -43,6 +36,8 @@ def youtube_search(options):
                 part='brandingSettings,contentDetails,contentOwnerDetails,id,localizations,snippet,statistics,status,topicDetails'
             ).execute()
             channels[i] = search_response.get('items',[i+1])[0]
+            if not search_response.get('items'):
+                metrics.inc('channels_missing')
             i = i+1    
     
     # Create the data_json directory if it doesn't exist
@@ -56,6 +51,9 @@ def youtube_search(options):
        json_object = json.dumps(channels, indent = 4)
        z = json.loads(json_object)
        json.dump(z, f, indent = 4)
+    metrics.event('written', path=file_path, rows=len(channels), bytes=os.path.getsize(file_path))
+    metrics.inc('bytes_written', os.path.getsize(file_path))
+    metrics.inc('channels_fetched', len(channels))
     print(f"Data saved to {file_path}")
     print(type(channels[1]))
     print('file dumped')
@@ -65,9 +63,12 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('--q', help='Search term', default='ft.')
     parser.add_argument('--max-results', help='Max results', default=25)
+    profiling.add_profile_argument(parser)
     args = parser.parse_args()
 
-try:
-    youtube_search(args)
-except HttpError as e:
-    print('An HTTP error %d occurred:\n%s' % (e.resp.status, e.content))
+    metrics.init_metrics('channel', os.path.basename(CATEGORY_DIR))
+    try:
+        with metrics.span('stage'), profiling.profile_stage('channel', os.path.join(CATEGORY_DIR, 'data_json'), args.profile):
+            youtube_search(args)
+    except HttpError as e:
+        print('An HTTP error %d occurred:\n%s' % (e.resp.status, e.content))
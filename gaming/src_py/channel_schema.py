@@ -0,0 +1,102 @@
+import json
+import os
+import re
+
+# pandas is imported by the functions that need it: ranking.py only uses
+# parse_count and write_schema and should not pay for it on every run
+
+# Columns of the channels_<date>.csv ranking snapshot, in file order
+CHANNEL_COLUMNS = ['Rank', 'Youtuber', 'Subscribers', 'Video Views', 'Video Count',
+                   'Category', 'Started', 'Channel Link', 'Channel ID']
+
+# Typed schema written next to every snapshot by ranking.py
+CHANNEL_SCHEMA = {
+    'Rank': 'Int64',
+    'Youtuber': 'string',
+    'Subscribers': 'Int64',
+    'Video Views': 'Int64',
+    'Video Count': 'Int64',
+    'Category': 'string',
+    'Started': 'Int64',
+    'Channel Link': 'string',
+    'Channel ID': 'string'
+}
+
+# Count columns that youtubers.me shows as text like "1,234" or "12.5M"
+COUNT_COLUMNS = ['Rank', 'Subscribers', 'Video Views', 'Video Count', 'Started']
+
+SUFFIXES = {'': 1, 'K': 10**3, 'M': 10**6, 'B': 10**9}
+COUNT_PATTERN = re.compile(r'^\s*([0-9][0-9,]*(?:\.[0-9]+)?)\s*([KMB]?)\s*$', re.IGNORECASE)
+
+def parse_count(text):
+    """
+    Parse a youtubers.me count such as "1,234", "12.5M" or "3B".
+
+    Returns:
+        The count as an int, or None if the text is empty or not a count
+    """
+    match = COUNT_PATTERN.match(text or '')
+    if not match:
+        return None
+    number, suffix = match.groups()
+    return int(round(float(number.replace(',', '')) * SUFFIXES[suffix.upper()]))
+
+def parse_counts(series):
+    """Vectorized parse_count for a column of count strings"""
+    import pandas as pd
+
+    parts = series.astype('string').str.extract(COUNT_PATTERN.pattern, flags=re.IGNORECASE)
+    numbers = pd.to_numeric(parts[0].str.replace(',', ''), errors='coerce')
+    multipliers = parts[1].str.upper().map(SUFFIXES).astype('float64')
+    return (numbers * multipliers).round().astype('Int64')
+
+def schema_path(csv_path):
+    """Path of the schema file stored next to a snapshot CSV"""
+    return f'{os.path.splitext(csv_path)[0]}.schema.json'
+
+def write_schema(csv_path):
+    """Write the typed schema for a snapshot CSV produced by ranking.py"""
+    with open(schema_path(csv_path), 'w', encoding='utf-8') as f:
+        json.dump(CHANNEL_SCHEMA, f, indent=4)
+
+def read_schema(csv_path):
+    """Return the stored schema of a snapshot CSV, or None for older snapshots"""
+    try:
+        with open(schema_path(csv_path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def load_channels(csv_path, columns=None, **kwargs):
+    """
+    Load a ranking snapshot with typed columns.
+
+    Snapshots written with a schema are read straight into their stored
+    dtypes, and only the requested columns are parsed. Older snapshots that
+    still hold count strings are converted with parse_counts.
+
+    Args:
+        csv_path: Path to a channels_<date>.csv ranking snapshot
+        columns: Columns to load (all columns if None)
+        **kwargs: Passed through to pd.read_csv (e.g. chunksize)
+
+    Returns:
+        A DataFrame, or an iterator of DataFrames when chunksize is given
+    """
+    import pandas as pd
+
+    schema = read_schema(csv_path)
+    if schema is not None:
+        dtype = {col: schema[col] for col in (columns or schema) if col in schema}
+        return pd.read_csv(csv_path, usecols=columns, dtype=dtype, **kwargs)
+
+    reader = pd.read_csv(csv_path, usecols=columns, dtype='string', **kwargs)
+    if 'chunksize' in kwargs:
+        return (_convert_counts(chunk) for chunk in reader)
+    return _convert_counts(reader)
+
+def _convert_counts(df):
+    for col in COUNT_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_counts(df[col])
+    return df
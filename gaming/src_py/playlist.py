@@ -4,28 +4,24 @@ import argparse
 import json
 import csv
 import os
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from datetime import datetime, timezone
-from dotenv import load_dotenv
+from youtube_client import get_youtube
+from transcripts import fetch_transcripts
+import metrics
+import profiling
 
 # Get the absolute path of the script's directory
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 # Get the category directory (one level up from the script)
 CATEGORY_DIR = os.path.dirname(SCRIPT_DIR)
 
-load_dotenv()
-
-DEVELOPER_KEY = os.getenv('API_KEY')
-YOUTUBE_API_SERVICE_NAME = 'youtube'
-YOUTUBE_API_VERSION = 'v3'
 CUTOFF_DATE = datetime(2024, 5, 1, tzinfo=timezone.utc)
 now = datetime.now()
 timestamp = now.strftime("%Y-%m-%d") 
 
 # Create timestamp directory with absolute path
 timestamp_dir = os.path.join(CATEGORY_DIR, 'data_json', f'batch_{timestamp}')
-os.makedirs(timestamp_dir, exist_ok=True)
 
 # Add counters for logging
 class Stats:
@@ -72,6 +68,7 @@ def get_video_ids(youtube, playlist_id):
 
     except HttpError as e:
         print(f"An HTTP error occurred for playlist {playlist_id}: {e.resp.status} {e.content}")
+        metrics.inc('playlist_errors', status=e.resp.status)
         return None
 
     return video_ids
@@ -89,26 +86,38 @@ def process_video_batch(youtube, video_ids_chunk):
         
         videos = response.get('items', [])
         stats.total_videos += len(videos)
+        metrics.inc('videos_fetched', len(videos))
+        # Ids the API no longer returns (deleted or private videos)
+        metrics.inc('videos_missing', len(video_ids_chunk) - len(videos))
         
         return videos
         
     except HttpError as e:
         print(f"An HTTP error occurred while fetching video details: {e.resp.status} {e.content}")
+        metrics.inc('video_batch_errors', status=e.resp.status)
         return []
 
-def process_playlist_batch(youtube, batch_data, batch_number):
+def process_playlist_batch(youtube, batch_data, batch_number, with_transcripts=False):
     """
-    Process a batch of playlists
+    Process a batch of playlists, optionally fetching the videos' transcripts
     """
+    with metrics.span('playlist_batch', batch=batch_number) as span:
+        processed = _process_playlist_batch(youtube, batch_data, batch_number, with_transcripts, span)
+    return processed
+
+def _process_playlist_batch(youtube, batch_data, batch_number, with_transcripts, span):
     current_playlists = {}
     current_videos = {}
     
-    for row in batch_data:
+    for index, row in enumerate(batch_data):
         playlist_id = row[0]
         print(f"\nProcessing playlist: {playlist_id}")
+        # Playlists still waiting in this batch
+        metrics.gauge('playlist_queue_depth', len(batch_data) - index)
         
         video_ids = get_video_ids(youtube, playlist_id)
         if not video_ids:
+            metrics.inc('playlists_empty')
             continue
             
         current_playlists[playlist_id] = video_ids
@@ -126,12 +135,17 @@ def process_playlist_batch(youtube, batch_data, batch_number):
             
         current_videos[playlist_id] = all_videos
         stats.processed_playlists += 1
+        metrics.inc('playlists_processed')
         
         # Print progress after each playlist
         print(f"\nProgress Update:")
         print(f"Videos processed: {stats.total_videos}")
         print(f"Playlists processed: {stats.processed_playlists}")
     
+    metrics.gauge('playlist_queue_depth', 0)
+    span['playlists'] = len(current_playlists)
+    span['rows'] = sum(len(videos) for videos in current_videos.values())
+
     # Save results with absolute paths
     if current_playlists:
         playlists_file = os.path.join(timestamp_dir, f'playlists_batch_{batch_number}.json')
@@ -143,12 +157,21 @@ def process_playlist_batch(youtube, batch_data, batch_number):
         with open(videos_file, 'w') as f:
             json.dump(current_videos, f, indent=4)
         print(f'Videos batch {batch_number} dumped')
+        span['bytes'] = os.path.getsize(playlists_file) + os.path.getsize(videos_file)
+
+        if with_transcripts:
+            video_ids = [video['id'] for videos in current_videos.values() for video in videos]
+            transcripts = fetch_transcripts(video_ids)
+            transcripts_file = os.path.join(timestamp_dir, f'transcripts_batch_{batch_number}.json')
+            with open(transcripts_file, 'w') as f:
+                json.dump(transcripts, f)
+            print(f'Transcripts batch {batch_number} dumped')
+            span['bytes'] += os.path.getsize(transcripts_file)
         
     return len(current_playlists)
 
 def youtube_search(options, start_batch):
-    youtube = build(YOUTUBE_API_SERVICE_NAME, YOUTUBE_API_VERSION,
-                   developerKey=DEVELOPER_KEY)
+    youtube = get_youtube()
     
     batch_size = 50
     batch_number = start_batch
@@ -161,6 +184,7 @@ def youtube_search(options, start_batch):
         all_rows = list(datareader)[total_processed:]
     
     while all_rows:
+        metrics.gauge('playlists_pending', len(all_rows))
         current_batch = all_rows[:batch_size]
         all_rows = all_rows[batch_size:]
         
@@ -168,13 +192,14 @@ def youtube_search(options, start_batch):
             break
             
         print(f"\nProcessing batch {batch_number}")
-        processed = process_playlist_batch(youtube, current_batch, batch_number)
+        processed = process_playlist_batch(youtube, current_batch, batch_number, options.transcripts)
         
         if processed > 0:
             total_processed += processed
             print(f"\nBatch Summary:")
             print(f"Total playlists processed so far: {total_processed}")
             batch_number += 1
+    metrics.gauge('playlists_pending', 0)
     
     print(f"\nFinal Summary:")
     print(f"Total playlists processed: {total_processed}")
@@ -186,9 +211,15 @@ if __name__ == '__main__':
     parser.add_argument('--q', help='Search term', default='ft.')
     parser.add_argument('--max-results', help='Max results', default=25)
     parser.add_argument('--start-batch', type=int, default=0, help='Batch number to start from')
+    parser.add_argument('--transcripts', action='store_true', help='Also fetch video transcripts')
+    profiling.add_profile_argument(parser)
     args = parser.parse_args()
+    os.makedirs(timestamp_dir, exist_ok=True)
 
+    metrics.init_metrics('playlist', os.path.basename(CATEGORY_DIR))
     try:
-        youtube_search(args, args.start_batch)
+        with metrics.span('stage'), profiling.profile_stage('playlist', timestamp_dir, args.profile):
+            youtube_search(args, args.start_batch)
     except Exception as e:
         print(f"An error occurred: {str(e)}")
+        metrics.event('stage_failed', error=str(e))
@@ -1,7 +1,53 @@
-import pandas as pd
+import argparse
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
-from scipy import stats
-import matplotlib.pyplot as plt
+from channel_schema import load_channels
+from histogram import METRICS, LogHistogram, fleet_histograms
+import metrics
+import profiling
+
+# Get the absolute path of the script's directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Get the category directory (one level up from the script)
+CATEGORY_DIR = os.path.dirname(SCRIPT_DIR)
+# Get the repository root holding every category directory
+BASE_DIR = os.path.dirname(CATEGORY_DIR)
+
+CATEGORIES = ['animals', 'blogs', 'comedy', 'entertainment', 'gaming']
+
+# Bump when the plot layout changes so unchanged inputs are re-rendered
+RENDER_VERSION = 2
+RENDER_MANIFEST = 'render_manifest.json'
+
+# Fitted parameters keyed by a hash of the input data and of how it is
+# fitted, one file per category next to its render manifest
+FIT_CACHE = 'fit_cache.json'
+# Bump when estimate_params or the choice of best fit changes, so cached fits are redone
+FIT_VERSION = 1
+# Generic MLE fits are run on at most this many points
+MAX_FIT_SAMPLES = 10000
+
+# scipy.stats distributions tried by fit_distribution
+DISTRIBUTIONS = ('norm', 'lognorm', 'expon')
+
+_figure_template = None
+
+# scipy and matplotlib take most of this script's start-up time, so they are
+# only imported once something is fitted or drawn (not for --help, or when
+# every plot is up to date)
+def get_distribution(name):
+    from scipy import stats
+    return getattr(stats, name)
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use('Agg')  # Render without a display, also inside worker processes
+    import matplotlib.pyplot as plt
+    return plt
 
 def format_axis_labels(value, pos):
     """Format axis labels to be more readable"""
@@ -14,27 +60,95 @@ def format_axis_labels(value, pos):
     else:
         return f'{value:.1f}'
 
-def fit_distribution(data):
-    """Fit statistical distributions and return the best fit"""
-    # Remove zeros and infinities
-    data = data[~np.isinf(data)]
+def _fit_tag():
+    """What besides the data decides a fit: estimator version, candidates and library versions"""
+    import scipy
+    return f"{FIT_VERSION}:{','.join(DISTRIBUTIONS)}:{MAX_FIT_SAMPLES}:scipy {scipy.__version__}:numpy {np.__version__}"
+
+def _data_key(data):
+    """Hash the values of a metric and the fit setup so fits can be reused across runs"""
+    values = np.ascontiguousarray(data, dtype=np.float64)
+    digest = hashlib.sha1(_fit_tag().encode('utf-8'))
+    digest.update(values.tobytes())
+    return digest.hexdigest()
+
+def _load_fit_cache(category):
+    """Load a category's fit cache, starting fresh if it is missing or unreadable"""
+    cache_path = os.path.join(BASE_DIR, category, 'data_graph', FIT_CACHE)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_fit_cache(category, cache):
+    cache_path = os.path.join(BASE_DIR, category, 'data_graph', FIT_CACHE)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f'{cache_path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=4)
+    os.replace(tmp_path, cache_path)
+
+def estimate_params(dist_name, data, max_samples=MAX_FIT_SAMPLES):
+    """
+    Estimate distribution parameters.
+
+    norm, expon and lognorm use closed-form estimators; any other
+    distribution falls back to MLE on a seeded subsample of the data.
+    """
+    if dist_name == 'norm':
+        return (float(np.mean(data)), float(np.std(data)))
+    if dist_name == 'expon':
+        loc = float(np.min(data))
+        return (loc, float(np.mean(data)) - loc)
+    if dist_name == 'lognorm':
+        # Log-moment estimators with the location fixed at zero
+        log_data = np.log(data[data > 0])
+        return (float(np.std(log_data)), 0.0, float(np.exp(np.mean(log_data))))
+    if len(data) > max_samples:
+        rng = np.random.default_rng(0)
+        data = rng.choice(data, size=max_samples, replace=False)
+    return tuple(float(p) for p in get_distribution(dist_name).fit(data))
+
+def fit_distribution(data, cache=None):
+    """
+    Fit statistical distributions and return the best fit.
+
+    Args:
+        data: Values to fit
+        cache: Dictionary of earlier fits by _data_key; a new fit is added to it
+    """
+    # Remove zeros, NaNs and infinities
+    data = np.asarray(data, dtype=np.float64)
+    data = data[np.isfinite(data)]
     data = data[data != 0]
     
-    distributions = {
-        'norm': stats.norm,
-        'lognorm': stats.lognorm,
-        'expon': stats.expon
-    }
-    
     best_fit = {'name': None, 'params': None, 'sse': float('inf')}
+    if len(data) == 0:
+        return best_fit
+    
+    if cache is None:
+        cache = {}
+    key = _data_key(data)
+    cached = cache.get(key)
+    if cached and cached['name'] in DISTRIBUTIONS:
+        return {
+            'name': cached['name'],
+            'params': tuple(cached['params']),
+            'sse': cached['sse'],
+            'dist': get_distribution(cached['name'])
+        }
     
-    for dist_name, dist in distributions.items():
+    # The histogram only depends on the data, so compute it once for all candidates
+    hist, bins = np.histogram(data, bins=50, density=True)
+    bin_centers = (bins[:-1] + bins[1:]) / 2
+    
+    for dist_name in DISTRIBUTIONS:
+        dist = get_distribution(dist_name)
         try:
-            params = dist.fit(data)
+            params = estimate_params(dist_name, data)
             # Calculate error
-            hist, bins = np.histogram(data, bins=50, density=True)
-            bin_centers = (bins[:-1] + bins[1:]) / 2
-            sse = np.sum((hist - dist.pdf(bin_centers, *params)) ** 2)
+            sse = float(np.sum((hist - dist.pdf(bin_centers, *params)) ** 2))
             
             if sse < best_fit['sse']:
                 best_fit = {
@@ -45,58 +159,120 @@ def fit_distribution(data):
                 }
         except Exception as e:
             continue
+    
+    if best_fit['name']:
+        cache[key] = {
+            'name': best_fit['name'],
+            'params': list(best_fit['params']),
+            'sse': best_fit['sse']
+        }
             
     return best_fit
 
-def create_raw_distribution_plots(df_channels):
+def create_figure_template():
+    """Create the 3-panel figure that every snapshot report is drawn on"""
+    plt = _pyplot()
+    plt.rcParams['figure.figsize'] = [15, 15]
+    plt.rcParams['axes.grid'] = True
+    plt.rcParams['grid.alpha'] = 0.3
+    
+    fig, axes = plt.subplots(3, 1)
+    return fig
+
+def get_figure_template():
+    """Return this process's figure template, creating it on first use"""
+    global _figure_template
+    if _figure_template is None:
+        _figure_template = create_figure_template()
+    return _figure_template
+
+def plot_log_histogram(ax, hist, color, label='Actual Distribution'):
+    """Draw the occupied bins of a LogHistogram on a log-scaled x axis"""
+    start, stop = hist.occupied_range()
+    counts = hist.counts[start:stop]
+    edges = hist.edges[start:stop + 1]
+    ax.stairs(counts, edges, fill=True, color=color, alpha=0.6, label=label)
+    ax.set_xscale('log')
+    return counts, edges
+
+def create_raw_distribution_plots(df_channels, fig=None, fit_cache=None):
     """Create distribution plots showing raw frequency counts with best fit line"""
-    metrics = {
+    plt = _pyplot()
+    metric_columns = {
         'Subscribers': {'data': df_channels['Subscribers'], 'color': '#87CEEB'},
         'Video Views': {'data': df_channels['Video Views'], 'color': '#90EE90'},
         'Video Count': {'data': df_channels['Video Count'], 'color': '#FA8072'}
     }
     
-    plt.rcParams['figure.figsize'] = [15, 15]
-    plt.rcParams['axes.grid'] = True
-    plt.rcParams['grid.alpha'] = 0.3
+    if fig is None:
+        fig = create_figure_template()
     
-    fig = plt.figure()
-    
-    for idx, (metric_name, metric_info) in enumerate(metrics.items(), 1):
-        data = metric_info['data']
+    for ax, (metric_name, metric_info) in zip(fig.axes, metric_columns.items()):
+        data = metric_info['data'].dropna()
         
-        # Create subplot
-        ax = plt.subplot(3, 1, idx)
+        # Reset the subplot left over from the previous snapshot
+        ax.cla()
         
-        # Plot histogram with raw counts
-        counts, bins, _ = plt.hist(data, bins=50, color=metric_info['color'], 
-                                 alpha=0.6, label='Actual Distribution')
+        # Plot histogram with raw counts on log-spaced bins, since the
+        # metrics are too heavy-tailed for linear bins
+        hist = LogHistogram().update(data)
+        counts, bins = plot_log_histogram(ax, hist, metric_info['color'])
         
         # Fit distribution
-        best_fit = fit_distribution(data)
+        best_fit = fit_distribution(data, fit_cache)
         
-        if best_fit['name']:
-            # Convert fitted probability density to frequency
-            bin_width = bins[1] - bins[0]
-            x = np.linspace(min(data), max(data), 100)
-            y = best_fit['dist'].pdf(x, *best_fit['params'])
-            # Scale the density to match the frequency scale
-            y = y * len(data) * bin_width
+        if best_fit['name'] and len(counts):
+            # Expected number of channels in each bin under the fitted distribution
+            x = np.sqrt(bins[:-1] * bins[1:])
+            y = np.diff(best_fit['dist'].cdf(bins, *best_fit['params'])) * len(data)
             
-            plt.plot(x, y, 'r-', lw=2, 
+            ax.plot(x, y, 'r-', lw=2, 
                     label=f'Best Fit ({best_fit["name"]})\nSSE: {best_fit["sse"]:.2e}')
         
         # Add statistical annotations
         add_statistical_annotations(ax, data, counts)
         
         # Format axes
-        plt.gca().xaxis.set_major_formatter(plt.FuncFormatter(format_axis_labels))
-        plt.title(f'{metric_name} Distribution (Raw Counts)\n', fontsize=12, pad=20)
-        plt.xlabel(f'{metric_name}', fontsize=10)
-        plt.ylabel('Frequency (Number of Channels)', fontsize=10)
-        plt.legend(fontsize=8)
+        ax.xaxis.set_major_formatter(plt.FuncFormatter(format_axis_labels))
+        ax.set_title(f'{metric_name} Distribution (Raw Counts, Log Bins)\n', fontsize=12, pad=20)
+        ax.set_xlabel(f'{metric_name}', fontsize=10)
+        ax.set_ylabel('Frequency (Number of Channels)', fontsize=10)
+        ax.legend(fontsize=8)
     
-    plt.tight_layout(pad=3.0)
+    fig.tight_layout(pad=3.0)
+    return fig
+
+def create_fleet_distribution_plots(histograms, fig=None):
+    """Create distribution plots from merged per-partition histograms"""
+    plt = _pyplot()
+    colors = {'Subscribers': '#87CEEB', 'Video Views': '#90EE90', 'Video Count': '#FA8072'}
+    
+    if fig is None:
+        fig = create_figure_template()
+    
+    for ax, (metric_name, color) in zip(fig.axes, colors.items()):
+        hist = histograms[metric_name]
+        ax.cla()
+        plot_log_histogram(ax, hist, color)
+        
+        stats_text = (
+            f'Mean: {format_axis_labels(hist.mean, None)}\n'
+            f'Below 1: {hist.underflow:,}\n'
+            f'Total Channels: {hist.count:,}'
+        )
+        ax.text(0.95, 0.95, stats_text,
+                transform=ax.transAxes,
+                verticalalignment='top',
+                horizontalalignment='right',
+                bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+        
+        ax.xaxis.set_major_formatter(plt.FuncFormatter(format_axis_labels))
+        ax.set_title(f'{metric_name} Distribution, All Partitions (Log Bins)\n', fontsize=12, pad=20)
+        ax.set_xlabel(f'{metric_name}', fontsize=10)
+        ax.set_ylabel('Frequency (Number of Channels)', fontsize=10)
+        ax.legend(fontsize=8)
+    
+    fig.tight_layout(pad=3.0)
     return fig
 
 def add_statistical_annotations(ax, data, counts):
@@ -107,35 +283,197 @@ def add_statistical_annotations(ax, data, counts):
         f'Total Channels: {len(data):,}'
     )
     
-    plt.text(0.95, 0.95, stats_text,
-             transform=ax.transAxes,
-             verticalalignment='top',
-             horizontalalignment='right',
-             bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+    ax.text(0.95, 0.95, stats_text,
+            transform=ax.transAxes,
+            verticalalignment='top',
+            horizontalalignment='right',
+            bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
 
-def main():
-    try:
-        # Load data
-        df_channels = pd.read_csv('../data_csv/channels_2024-10-15.csv')
-        
-        # Convert string columns to numeric
-        df_channels['Subscribers'] = pd.to_numeric(df_channels['Subscribers'].str.replace(',', ''), errors='coerce')
-        df_channels['Video Views'] = pd.to_numeric(df_channels['Video Views'].str.replace(',', ''), errors='coerce')
-        df_channels['Video Count'] = pd.to_numeric(df_channels['Video Count'].str.replace(',', ''), errors='coerce')
-        
-        # Create raw distribution plots with best fit
-        fig = create_raw_distribution_plots(df_channels)
-        
-        # Save the figure
-        save_path = '../data_graph/2024-10-15/raw_distributions_with_fit.png'
-        fig.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.close(fig)
+def render_snapshot(csv_path, save_path, dpi=300, fit_cache=None):
+    """
+    Render the distribution report for one snapshot.
+    
+    Runs inside a worker process and draws on that process's figure template.
+    
+    Args:
+        csv_path: Path to a channels_<date>.csv ranking snapshot
+        save_path: Path of the PNG to write
+        dpi: Output resolution
+        fit_cache: The category's earlier fits, see fit_distribution
         
+    Returns:
+        Tuple of the path the figure was saved to and the fits that were
+        not in fit_cache, for the caller to save
+    """
+    fit_cache = fit_cache or {}
+    fits = dict(fit_cache)
+    df_channels = load_channels(csv_path, columns=METRICS)
+    fig = create_raw_distribution_plots(df_channels, get_figure_template(), fits)
+    
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    fig.savefig(save_path, dpi=dpi, bbox_inches='tight')
+    return save_path, {key: fit for key, fit in fits.items() if key not in fit_cache}
+
+def file_hash(path, extra=''):
+    """Hash a file's contents together with the render settings"""
+    digest = hashlib.sha1(extra.encode('utf-8'))
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def find_snapshots(category, snapshot=None):
+    """
+    List (csv_path, save_path) pairs for a category's ranking snapshots.
+    
+    Args:
+        category: Category directory name, e.g. 'gaming'
+        snapshot: Only include this date (YYYY-MM-DD) if given
+    """
+    category_dir = os.path.join(BASE_DIR, category)
+    pattern = f'channels_{snapshot}.csv' if snapshot else 'channels_*.csv'
+    jobs = []
+    for csv_path in sorted(glob.glob(os.path.join(category_dir, 'data_csv', pattern))):
+        date = os.path.basename(csv_path)[len('channels_'):-len('.csv')]
+        save_path = os.path.join(category_dir, 'data_graph', date, 'raw_distributions_with_fit.png')
+        jobs.append((csv_path, save_path))
+    return jobs
+
+def _load_manifest(category):
+    manifest_path = os.path.join(BASE_DIR, category, 'data_graph', RENDER_MANIFEST)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_manifest(category, manifest):
+    manifest_path = os.path.join(BASE_DIR, category, 'data_graph', RENDER_MANIFEST)
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4)
+
+def generate_reports(categories, snapshot=None, dpi=300, workers=None, force=False):
+    """
+    Render distribution reports for every snapshot of the given categories.
+    
+    Plots are rendered in a process pool, or in this process when workers
+    is 1. A plot is skipped when the hash of its input CSV (and the render
+    settings) matches the one recorded the last time it was written.
+    Distribution fits are cached per category and saved once at the end.
+    
+    Args:
+        categories: Category directory names to process
+        snapshot: Only render this date (YYYY-MM-DD) if given
+        dpi: Output resolution
+        workers: Number of worker processes (defaults to the CPU count; 1
+            renders in this process)
+        force: Re-render even if the input is unchanged
+    """
+    manifests = {category: _load_manifest(category) for category in categories}
+    fit_caches = {}
+    pending = []
+    skipped = 0
+    
+    for category in categories:
+        for csv_path, save_path in find_snapshots(category, snapshot):
+            input_hash = file_hash(csv_path, f'{RENDER_VERSION}:{dpi}')
+            key = os.path.relpath(save_path, os.path.join(BASE_DIR, category))
+            if not force and manifests[category].get(key) == input_hash and os.path.exists(save_path):
+                skipped += 1
+                continue
+            pending.append((category, key, input_hash, csv_path, save_path))
+    
+    print(f"{len(pending)} plots to render, {skipped} unchanged plots skipped")
+    metrics.inc('plots_skipped', skipped)
+    metrics.gauge('render_queue_depth', len(pending))
+    if not pending:
+        return
+    
+    def record(category, key, input_hash, render):
+        try:
+            save_path, fits = render()
+        except Exception as e:
+            print(f"Error rendering {category}/{key}: {str(e)}")
+            metrics.inc('plots_failed', category=category)
+            return
+        manifests[category][key] = input_hash
+        fit_caches[category].update(fits)
+        metrics.inc('plots_rendered', category=category)
+        metrics.inc('bytes_written', os.path.getsize(save_path))
         print(f"Raw distribution plots with best fit lines saved to {save_path}")
-        
+    
+    for category in {job[0] for job in pending}:
+        fit_caches[category] = _load_fit_cache(category)
+    
+    if workers == 1:
+        # No pool: rendering in this process lets --profile see it
+        for category, key, input_hash, csv_path, save_path in pending:
+            record(category, key, input_hash,
+                   lambda: render_snapshot(csv_path, save_path, dpi, fit_caches[category]))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(render_snapshot, csv_path, save_path, dpi, fit_caches[category]):
+                    (category, key, input_hash)
+                for category, key, input_hash, csv_path, save_path in pending
+            }
+            for future in as_completed(futures):
+                record(*futures[future], future.result)
+    
+    for category in fit_caches:
+        _save_manifest(category, manifests[category])
+        _save_fit_cache(category, fit_caches[category])
+
+def generate_fleet_report(categories, snapshot=None, dpi=300):
+    """
+    Render one report over every snapshot of the given categories.
+    
+    Built from the cached per-partition histograms, so unchanged snapshot
+    CSVs are not reloaded.
+    """
+    histograms, partitions = fleet_histograms(categories, snapshot)
+    if not partitions:
+        print("No snapshots found for the fleet report")
+        return
+    
+    fig = create_fleet_distribution_plots(histograms, get_figure_template())
+    name = f'fleet_distributions_{snapshot}.png' if snapshot else 'fleet_distributions.png'
+    save_path = os.path.join(BASE_DIR, 'all', 'data_graph', name)
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    fig.savefig(save_path, dpi=dpi, bbox_inches='tight')
+    print(f"Fleet distribution plots from {partitions} snapshots saved to {save_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Render channel distribution reports')
+    parser.add_argument('--categories', nargs='+', default=[os.path.basename(CATEGORY_DIR)],
+                        help='Categories to render (defaults to this script\'s category)')
+    parser.add_argument('--all-categories', action='store_true', help='Render every category')
+    parser.add_argument('--snapshot', help='Only render this snapshot date (YYYY-MM-DD)')
+    parser.add_argument('--dpi', type=int, default=300, help='Output resolution')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes (1 renders in this process)')
+    parser.add_argument('--force', action='store_true', help='Re-render unchanged plots')
+    parser.add_argument('--fleet', action='store_true',
+                        help='Also render one report merged across all selected categories and snapshots')
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+    
+    categories = CATEGORIES if args.all_categories else args.categories
+    
+    metrics.init_metrics('stats', os.path.basename(CATEGORY_DIR))
+    # Plots are rendered in worker processes, which the profile does not cover,
+    # unless --workers 1 renders them in this process
+    try:
+        with profiling.profile_stage('stats', os.path.join(CATEGORY_DIR, 'data_graph'), args.profile):
+            with metrics.span('reports', categories=','.join(categories)):
+                generate_reports(categories, args.snapshot, args.dpi, args.workers, args.force)
+            if args.fleet:
+                with metrics.span('fleet_report'):
+                    generate_fleet_report(categories, args.snapshot, args.dpi)
     except Exception as e:
         print(f"An error occurred: {str(e)}")
+        metrics.event('stage_failed', error=str(e))
         raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()